@@ -3,9 +3,18 @@ Streamlit app for running data validation tests
 """
 import streamlit as st
 import os
+import time
+import pyarrow as pa
 from loguru import logger
 from kbc_automated_tests.data_validator import DataValidator
 from kbc_automated_tests.config.configuration import Configuration
+from kbc_automated_tests.database.connection_pool import SnowflakeConnectionPool
+from kbc_automated_tests.api.keboola_client import KeboolaClient
+from kbc_automated_tests.execution.results import to_display_frame
+from kbc_automated_tests.utils.log_buffer import LogBuffer
+
+# Minimum seconds between redraws of the results table while tests run
+RESULTS_REFRESH_SECONDS = 2.0
 
 # Configure Streamlit page
 st.set_page_config(
@@ -14,24 +23,32 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_configuration() -> Configuration:
+    """Load the configuration once per app process"""
+    return Configuration()
+
+@st.cache_resource
+def get_keboola_client() -> KeboolaClient:
+    """Keboola API client whose HTTP connections are kept alive across reruns and runs"""
+    config = get_configuration()
+    return KeboolaClient(
+        config,
+        pool_maxsize=int(config.get("validation", "discovery", "max_concurrency", default=16))
+    )
+
+@st.cache_resource
+def get_connection_pool() -> SnowflakeConnectionPool:
+    """Snowflake sessions shared by every run for the lifetime of the app process"""
+    return SnowflakeConnectionPool.from_config(get_configuration())
+
 def main():
     """Main Streamlit app function"""
     st.title("Keboola Data Validation Tests")
     
-    # Initialize Keboola client
-    from kbc_automated_tests.api.keboola_client import KeboolaClient
-    
-    # Configure logging to capture in Streamlit
-    class StreamlitSink:
-        def write(self, message):
-            st.text(message)
-            
-    streamlit_sink = StreamlitSink()
-    logger.add(streamlit_sink, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}")
-    
     try:
         # Get list of branches
-        client = KeboolaClient()
+        client = get_keboola_client()
         branches = client.list_branches()
         
         # Create selectbox for branches
@@ -42,22 +59,91 @@ def main():
             format_func=lambda x: next(name for id, name in branch_options if id == x)
         )
         
+        run_mode = st.radio(
+            "Run mode",
+            options=["Full", "Preview (sampled)"],
+            horizontal=True,
+            help="Preview runs read a small deterministic sample of every table, run a full validation afterwards"
+        )
+        preview = run_mode == "Preview (sampled)"
+        
+        incremental = st.checkbox(
+            "Only re-run tests whose tables changed",
+            value=bool(get_configuration().get("validation", "incremental", "enabled", default=False)),
+            help="Reuse the previous results of tests whose DEV, PROD and source tables were not rebuilt"
+        )
+        refresh_baseline = st.checkbox(
+            "Refresh PROD baseline cache",
+            help="Recompute production values even if the tables have not changed since the last run"
+        )
+        
         # Button to run tests
         if st.button("Run Validation Tests"):
             if selected_branch:
-                with st.spinner("Running validation tests..."):
-                    # Initialize validator
-                    validator = DataValidator(str(selected_branch))
+                # Initialize validator
+                validator = DataValidator(
+                    str(selected_branch),
+                    config=get_configuration(),
+                    pool=get_connection_pool(),
+                    keboola_client=client,
+                    refresh_baseline=refresh_baseline,
+                    incremental=incremental,
+                    preview=preview
+                )
+                
+                progress_bar = st.progress(0.0, text="Running validation tests...")
+                results_table = st.empty()
+                log_pane = st.expander("Logs").empty()
+                
+                # Log lines are buffered and rendered in one pane when the progress changes
+                log_buffer = LogBuffer()
+                sink_id = logger.add(
+                    log_buffer.write,
+                    level=get_configuration().get("logging", "ui_level", default="INFO"),
+                    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+                    enqueue=True
+                )
+                
+                def show_progress(completed: int, total: int):
+                    progress_bar.progress(completed / total, text=f"Tested {completed} of {total} tables")
+                    log_pane.code(log_buffer.text(), language=None)
+                    
+                # Show results as they arrive, redrawing at most every few seconds
+                # so long runs do not rebuild the whole table for every result
+                results = []
+                last_refresh = time.monotonic()
+                try:
+                    for result in validator.iter_results(progress_callback=show_progress):
+                        results.append(result)
+                        if len(results) == 1 or time.monotonic() - last_refresh >= RESULTS_REFRESH_SECONDS:
+                            results_table.dataframe(to_display_frame(pa.concat_tables(results)))
+                            last_refresh = time.monotonic()
+                finally:
+                    # Removing the sink waits for queued messages
+                    logger.remove(sink_id)
+                    log_pane.code(log_buffer.text(), language=None)
+                    
+                if results:
+                    results_table.dataframe(to_display_frame(pa.concat_tables(results)))
                     
-                    # Run tests
-                    results = validator.run_tests()
+                progress_bar.empty()
+                if results and preview:
+                    st.info("Preview run on a sample of every table: counts and sums are estimates, "
+                            "switch the run mode to Full for exact values")
+                elif results:
+                    st.success("Tests completed successfully!")
+                else:
+                    st.warning("No test results found")
                     
-                    # Display results
-                    if not results.empty:
-                        st.success("Tests completed successfully!")
-                        st.dataframe(results)
-                    else:
-                        st.warning("No test results found")
+                metrics = validator.metrics
+                if not metrics.empty:
+                    with st.expander("Query metrics"):
+                        st.dataframe(metrics)
+                        st.download_button(
+                            "Download metrics (OpenMetrics)",
+                            validator.query_executor.metrics.to_openmetrics(),
+                            file_name="query_metrics.prom"
+                        )
             else:
                 st.error("Please select a branch first")
                 
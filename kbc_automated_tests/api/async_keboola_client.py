@@ -0,0 +1,141 @@
+"""
+Asyncio Keboola API client for fetching metadata in parallel
+"""
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from loguru import logger
+
+from .keboola_client import KeboolaClient
+from kbc_automated_tests.config.configuration import Configuration
+
+class AsyncKeboolaClient:
+    """Asyncio counterpart of KeboolaClient with bounded concurrency
+    
+    Requests run on worker threads through the pooled session of a
+    KeboolaClient, so they share its keep-alive connections and retry
+    policy. Fan-outs run on their own thread pool of max_concurrency
+    workers rather than the event loop's default executor, whose worker
+    count would otherwise cap the concurrency below the configured value.
+    At most max_concurrency requests are in flight at once.
+    """
+    
+    def __init__(self, config: Optional[Configuration] = None, max_concurrency: int = 16,
+                 client: Optional[KeboolaClient] = None):
+        """Initialize the async Keboola client
+        
+        Args:
+            config: Configuration object providing validation.retry settings
+            max_concurrency: Maximum number of requests in flight
+            client: Synchronous client to send requests with, defaults to a new
+                client with one pooled connection per concurrent request
+        """
+        self.max_concurrency = max_concurrency
+        self.client = client or KeboolaClient(config, pool_maxsize=max_concurrency)
+        logger.info(f"Initialized async Keboola API client (max_concurrency: {max_concurrency})")
+    
+    async def _call(self, semaphore: asyncio.Semaphore, executor: Executor,
+                    method: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking client method on a worker thread once a slot is free"""
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(method, *args))
+    
+    async def _gather(self, method: Callable[..., Any], arguments: Iterable[Any]) -> Dict[Any, Any]:
+        """Call a client method once per argument with bounded concurrency
+        
+        Failed calls are logged and left out, so one bad bucket or table does
+        not fail the whole fan-out.
+        """
+        arguments = list(arguments)
+        if not arguments:
+            return {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # One worker thread per request slot, released once the fan-out is done
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(arguments)), thread_name_prefix="keboola-api"
+        ) as executor:
+            results = await asyncio.gather(
+                *(self._call(semaphore, executor, method, argument) for argument in arguments),
+                return_exceptions=True
+            )
+        
+        gathered = {}
+        for argument, result in zip(arguments, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching {argument}: {result}")
+                continue
+            gathered[argument] = result
+        return gathered
+    
+    async def list_branches(self) -> List[Dict]:
+        """
+        List all development branches
+        
+        Returns:
+            List of branch dictionaries containing branch information
+        """
+        return await asyncio.to_thread(self.client.list_branches)
+    
+    async def list_buckets(self) -> List[Dict]:
+        """
+        List all storage buckets
+        
+        Returns:
+            List of bucket dictionaries containing bucket information
+        """
+        return await asyncio.to_thread(self.client.list_buckets)
+    
+    async def list_tables(self, bucket_id: str) -> List[Dict]:
+        """
+        List all tables in a bucket
+        
+        Args:
+            bucket_id: ID of the bucket to list tables from
+        
+        Returns:
+            List of table dictionaries containing table information
+        """
+        return await asyncio.to_thread(self.client.list_tables, bucket_id)
+    
+    async def get_table(self, table_id: str) -> Dict:
+        """
+        Get the detail of a table
+        
+        Args:
+            table_id: ID of the table
+        
+        Returns:
+            Table dictionary including metadata
+        """
+        return await asyncio.to_thread(self.client.get_table, table_id)
+    
+    async def list_tables_for_buckets(self, bucket_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        List the tables of many buckets concurrently
+        
+        Args:
+            bucket_ids: IDs of the buckets to list tables from
+        
+        Returns:
+            Dictionary of bucket ID to the tables in that bucket, buckets that
+            could not be listed are left out
+        """
+        return await self._gather(self.client.list_tables, bucket_ids)
+    
+    async def get_tables(self, table_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get the detail of many tables concurrently
+        
+        Args:
+            table_ids: IDs of the tables
+        
+        Returns:
+            Dictionary of table ID to table detail, tables that could not be
+            fetched are left out
+        """
+        return await self._gather(self.client.get_table, table_ids)
+    
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.client.close()
\ No newline at end of file
@@ -2,24 +2,110 @@
 Keboola API client for handling API interactions
 """
 import os
+import json
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, List, Dict, Optional
 from loguru import logger
 from kbc_automated_tests.config.config import KBC_TOKEN, KBC_URL
+from kbc_automated_tests.config.configuration import Configuration
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
 class KeboolaClient:
-    """Client for interacting with Keboola API"""
+    """Client for interacting with Keboola API
+    
+    All requests go through one pooled requests.Session, so connections are
+    kept alive between calls. Failed requests are retried with exponential
+    backoff following validation.retry, honouring Retry-After on 429/503.
+    """
     
-    def __init__(self):
-        """Initialize the Keboola client"""
+    def __init__(self, config: Optional[Configuration] = None, pool_maxsize: int = 10):
+        """Initialize the Keboola client
+        
+        Args:
+            config: Configuration object providing validation.retry settings,
+                defaults to 3 attempts with a 5 second base delay
+            pool_maxsize: Number of connections kept alive for concurrent requests
+        """
         self.api_token = KBC_TOKEN
         self.base_url = KBC_URL
         self.headers = {
             "X-StorageApi-Token": self.api_token,
             "Content-Type": "application/json"
         }
+        
+        max_attempts = 3
+        delay_seconds = 5
+        if config is not None:
+            max_attempts = int(config.get("validation", "retry", "max_attempts", default=max_attempts))
+            delay_seconds = float(config.get("validation", "retry", "delay_seconds", default=delay_seconds))
+        self.session = self._create_session(max_attempts, delay_seconds, pool_maxsize)
         logger.info("Initialized Keboola API client")
     
+    def _create_session(self, max_attempts: int, delay_seconds: float, pool_maxsize: int) -> requests.Session:
+        """
+        Create the pooled HTTP session used for all requests
+        
+        Args:
+            max_attempts: Total number of attempts per request
+            delay_seconds: Base delay of the exponential backoff between attempts
+            pool_maxsize: Number of connections kept alive per host
+        
+        Returns:
+            Configured session
+        """
+        retry = Retry(
+            total=max(0, max_attempts - 1),
+            backoff_factor=delay_seconds,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a GET request and decode the JSON response
+        
+        The body is decoded straight from the response stream. List responses
+        paginated with a "next" Link header are followed and concatenated.
+        
+        Args:
+            endpoint: Full URL of the endpoint
+            params: Query string parameters
+        
+        Returns:
+            Decoded JSON response
+        """
+        result = None
+        url = endpoint
+        while url:
+            with self.session.get(url, params=params, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                page = json.load(response.raw)
+                url = response.links.get("next", {}).get("url")
+            
+            # The next link carries its own query string
+            params = None
+            if result is None:
+                result = page
+            elif isinstance(result, list) and isinstance(page, list):
+                result.extend(page)
+            else:
+                break
+        return result
+    
     def list_branches(self) -> List[Dict]:
         """
         List all development branches
@@ -31,9 +117,7 @@ class KeboolaClient:
         logger.info("Fetching list of branches")
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(endpoint)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching branches: {e}")
             raise
@@ -49,9 +133,7 @@ class KeboolaClient:
         logger.info("Fetching list of buckets")
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(endpoint)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching buckets: {e}")
             raise
@@ -62,7 +144,7 @@ class KeboolaClient:
         
         Args:
             bucket_id: ID of the bucket to list tables from
-            
+        
         Returns:
             List of table dictionaries containing table information
         """
@@ -70,9 +152,50 @@ class KeboolaClient:
         logger.info(f"Fetching tables from bucket: {bucket_id}")
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(endpoint)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching tables: {e}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def list_all_tables(self, include: str = "buckets") -> List[Dict]:
+        """
+        List all tables in the project with a single request
+        
+        Args:
+            include: Comma separated related resources to embed, e.g. "buckets"
+                adds the bucket of every table under the "bucket" key
+        
+        Returns:
+            List of table dictionaries containing table information
+        """
+        endpoint = f"{self.base_url}/v2/storage/tables"
+        logger.info("Fetching list of all tables")
+        
+        try:
+            return self._get(endpoint, params={"include": include})
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching tables: {e}")
+            raise
+    
+    def get_table(self, table_id: str) -> Dict:
+        """
+        Get the detail of a table
+        
+        Args:
+            table_id: ID of the table, e.g. out.c-bucket.TABLE
+        
+        Returns:
+            Table dictionary including metadata such as rowsCount and lastChangeDate
+        """
+        endpoint = f"{self.base_url}/v2/storage/tables/{table_id}"
+        logger.info(f"Fetching table detail: {table_id}")
+        
+        try:
+            return self._get(endpoint)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching table detail: {e}")
+            raise
+    
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.session.close()
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""
+Persistent caches shared between runs
+"""
+from .disk_cache import DiskCache
+
+__all__ = ['DiskCache']
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Size-bounded persistent key/value cache backed by SQLite
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+from loguru import logger
+
+def _to_json(value: Any) -> Any:
+    """Convert numpy and Decimal values returned by Snowflake to JSON types"""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Value of type {type(value).__name__} is not JSON serializable")
+
+class DiskCache:
+    """Persistent JSON value cache with least-recently-used eviction
+    
+    Entries survive app restarts and are shared by every run on the same
+    machine. Once more than max_entries are stored in a namespace, the
+    least recently used entries are evicted.
+    """
+    
+    def __init__(self, path: str, namespace: str, max_entries: int = 10000):
+        """Initialize the cache, creating the database file if needed
+        
+        Args:
+            path: Path of the SQLite database file
+            namespace: Name separating this cache from others in the same file
+            max_entries: Maximum number of entries kept in the namespace
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+        logger.info(f"Initialized disk cache {namespace} at {path}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, one per call keeps the cache safe to use from threads"""
+        return sqlite3.connect(self.path, timeout=30)
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Look up many keys at once
+        
+        Args:
+            keys: Keys to look up
+        
+        Returns:
+            Dictionary of the keys found to their values
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        
+        found = {}
+        with self._lock, closing(self._connect()) as conn, conn:
+            # Stay below SQLite's limit on bound variables
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT key, value FROM entries WHERE namespace = ? AND key IN ({placeholders})",
+                    [self.namespace, *chunk]
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+            
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                    [(now, self.namespace, key) for key in found]
+                )
+        return found
+    
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """Store many values at once, evicting the least recently used entries
+        
+        Args:
+            items: Dictionary of key to JSON serializable value
+        """
+        if not items:
+            return
+        
+        now = time.time()
+        rows = [
+            (self.namespace, key, json.dumps(value, default=_to_json), now)
+            for key, value in items.items()
+        ]
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key NOT IN ("
+                "SELECT key FROM entries WHERE namespace = ? ORDER BY last_used DESC LIMIT ?)",
+                (self.namespace, self.namespace, self.max_entries)
+            )
+    
+    def clear(self) -> None:
+        """Remove every entry of the namespace"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+        logger.info(f"Cleared disk cache {self.namespace}")
+    
+    def __len__(self) -> int:
+        """Number of entries in the namespace"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
\ No newline at end of file
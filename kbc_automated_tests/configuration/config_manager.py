@@ -3,13 +3,82 @@ Configuration manager for handling test configurations and matching
 """
 import pandas as pd
 import os
-from typing import List, Tuple
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from loguru import logger
 
 from ..config.configuration import Configuration
 
+@dataclass(frozen=True)
+class TestSpec:
+    """One configured test from data_test_parametrics.csv
+    
+    Values are normalized once at load time: 'n/a', empty cells and NaN
+    are None and everything else is a stripped string.
+    """
+    __test__ = False  # Not a pytest test class
+    
+    storage_bucket_id: str
+    storage_table_id: str
+    test_name: str
+    source_bucket: Optional[str] = None
+    source_table: Optional[str] = None
+    parameter_1: Optional[str] = None
+    parameter_2: Optional[str] = None
+    parameter_3: Optional[str] = None
+    parameter_4: Optional[str] = None
+    
+    @cached_property
+    def query_params(self) -> Dict[str, str]:
+        """Quoted PARAMETER_1..4 query parameters, built once per spec
+        
+        Returns:
+            Dictionary of parameter_N_object (identifier) and parameter_N_string
+            (string literal) values, NULL where the parameter is not set, and
+            parameter_1_columns, PARAMETER_1 as a comma separated column list
+            (* where it is not set)
+        """
+        params = {}
+        for number, value in enumerate(
+            (self.parameter_1, self.parameter_2, self.parameter_3, self.parameter_4), start=1
+        ):
+            params[f"parameter_{number}_object"] = f'"{value}"' if value else "NULL"
+            params[f"parameter_{number}_string"] = f"'{value}'" if value else "NULL"
+        params["parameter_1_columns"] = column_list(self.parameter_1)
+        return params
+
+def column_list(value: Optional[str]) -> str:
+    """Quote a comma separated list of column names for a SELECT list
+    
+    Args:
+        value: Column names, e.g. "ID, AMOUNT", None for all columns
+        
+    Returns:
+        Quoted identifiers, e.g. "ID", "AMOUNT", or * for all columns
+    """
+    if not value:
+        return "*"
+    columns = [column.strip() for column in value.split(",") if column.strip()]
+    return ", ".join('"{}"'.format(column.replace('"', '""')) for column in columns)
+    
+def _normalize(value) -> Optional[str]:
+    """Normalize a parametrics cell, mapping 'n/a', empty and NaN to None"""
+    if value is None or pd.isna(value):
+        return None
+    value = str(value).strip()
+    if not value or value.lower() == "n/a":
+        return None
+    return value
+
 class ConfigurationManager:
-    """Handles loading and managing test configurations"""
+    """Handles loading and managing test configurations
+    
+    The parametrics are compiled once into an immutable index keyed on
+    (STORAGE_BUCKET_ID, STORAGE_TABLE_ID), so looking up the tests of a
+    table does not scan the DataFrame.
+    """
     
     def __init__(self, config: Configuration):
         """Initialize configuration manager
@@ -20,6 +89,7 @@ class ConfigurationManager:
         self.config = config
         # Load test configurations
         self.test_parametrics = self._load_test_parametrics()
+        self.test_index = self._build_test_index(self.test_parametrics)
         
     def _validate_path(self, path: str) -> bool:
         """Validate if a path exists and is accessible
@@ -58,7 +128,7 @@ class ConfigurationManager:
             raise FileNotFoundError(f"Test parametrics file not found or not accessible: {csv_path}")
             
         try:
-            df = pd.read_csv(csv_path)
+            df = pd.read_csv(csv_path, dtype=str)
             logger.info(f"Successfully loaded test parametrics with {len(df)} rows")
             logger.debug(f"Columns in test parametrics: {list(df.columns)}")
             return df
@@ -72,6 +142,53 @@ class ConfigurationManager:
             logger.error(f"Unexpected error loading test parametrics: {e}")
             raise
         
+    def _build_test_index(self, test_parametrics: pd.DataFrame) -> Mapping[Tuple[str, str], Tuple[TestSpec, ...]]:
+        """Compile the parametrics into an index of test specs per table
+        
+        Args:
+            test_parametrics: Test parametrics DataFrame
+            
+        Returns:
+            Read-only mapping of (bucket ID, table ID) to the table's test specs in file order
+        """
+        columns = {
+            "storage_bucket_id": "STORAGE_BUCKET_ID",
+            "storage_table_id": "STORAGE_TABLE_ID",
+            "test_name": "TEST_NAME",
+            "source_bucket": "SOURCE_BUCKET",
+            "source_table": "SOURCE_TABLE",
+            "parameter_1": "PARAMETER_1",
+            "parameter_2": "PARAMETER_2",
+            "parameter_3": "PARAMETER_3",
+            "parameter_4": "PARAMETER_4",
+        }
+        
+        index: Dict[Tuple[str, str], List[TestSpec]] = {}
+        for record in test_parametrics.to_dict("records"):
+            values = {field: _normalize(record.get(column)) for field, column in columns.items()}
+            if not values["storage_bucket_id"] or not values["storage_table_id"] or not values["test_name"]:
+                logger.warning(f"Skipping incomplete test parametrics row: {record}")
+                continue
+            spec = TestSpec(**values)
+            index.setdefault((spec.storage_bucket_id, spec.storage_table_id), []).append(spec)
+            
+        logger.info(f"Indexed tests for {len(index)} tables")
+        return MappingProxyType({key: tuple(specs) for key, specs in index.items()})
+        
+    def get_test_specs(self, prod_bucket: str, prod_table: str) -> Tuple[TestSpec, ...]:
+        """Get the test specs configured for a production table
+        
+        Args:
+            prod_bucket: Production bucket name
+            prod_table: Production table name (full name including bucket)
+            
+        Returns:
+            Tuple of test specs, empty if no tests are configured
+        """
+        # Extract just the table ID from the full table name
+        table_id = prod_table.split('.')[-1]
+        return self.test_index.get((prod_bucket, table_id), ())
+        
     def find_matching_tests(self, prod_bucket: str, prod_table: str) -> List[Tuple[str, str]]:
         """Find all matching tests for production bucket and table
         
@@ -82,25 +199,16 @@ class ConfigurationManager:
         Returns:
             List of tuples (test_name, parameter_1) for each matching test
         """
-        # Extract just the table ID from the full table name
         table_id = prod_table.split('.')[-1]
+        specs = self.get_test_specs(prod_bucket, prod_table)
         
-        # Find all matching rows in test parametrics
-        matching_rows = self.test_parametrics[
-            (self.test_parametrics['STORAGE_BUCKET_ID'] == prod_bucket) &
-            (self.test_parametrics['STORAGE_TABLE_ID'] == table_id)
-        ]
-        
-        if matching_rows.empty:
-            logger.info(f"No tests found for {prod_bucket}.{table_id}")
+        if not specs:
+            logger.debug(f"No tests found for {prod_bucket}.{table_id}")
             return []
             
         tests = []
-        for _, row in matching_rows.iterrows():
-            test_name = row['TEST_NAME']
-            parameter_1 = row['PARAMETER_1']
-            
-            logger.info(f"Found test {test_name} for {prod_bucket}.{table_id}")
-            tests.append((test_name, parameter_1))
+        for spec in specs:
+            logger.debug(f"Found test {spec.test_name} for {prod_bucket}.{table_id}")
+            tests.append((spec.test_name, spec.parameter_1))
             
         return tests 
\ No newline at end of file
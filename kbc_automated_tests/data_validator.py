@@ -6,25 +6,53 @@ This module handles the execution of data validation tests by:
 3. Executing validation queries
 4. Compiling results into a standardized format
 """
-from typing import List, Dict, Optional
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Optional, Tuple
 import pandas as pd
+import pyarrow as pa
 import os
 from loguru import logger
 
+from .api.keboola_client import KeboolaClient
+from .api.async_keboola_client import AsyncKeboolaClient
 from .configuration.config_manager import ConfigurationManager
 from .execution.query_executor import QueryExecutor
 from .storage.bucket_manager import BucketManager
 from .config.configuration import Configuration
+from .database.connection_pool import SnowflakeConnectionPool
+from .queries.query_planner import table_id
+from .execution.incremental import IncrementalResults, input_tables
+from .execution.results import has_differences
+from .execution.schema_diff import diff_schemas, known_columns, missing_reference, schema_results
+from .queries.sampling import SamplingSpec
+from .cache import DiskCache
 
 class DataValidator:
     """Handles reading test configurations and executing data validation tests"""
     
-    def __init__(self, branch_id: str, config: Optional[Configuration] = None):
+    def __init__(self, branch_id: str, config: Optional[Configuration] = None,
+                 max_workers: Optional[int] = None,
+                 pool: Optional[SnowflakeConnectionPool] = None,
+                 refresh_baseline: bool = False,
+                 incremental: Optional[bool] = None,
+                 preview: bool = False,
+                 keboola_client: Optional[KeboolaClient] = None):
         """Initialize data validator
         
         Args:
             branch_id: Branch ID to run tests for
             config: Configuration object, defaults to loading from default location
+            max_workers: Number of tests to execute in parallel, defaults to
+                validation.concurrency.max_workers (1 runs tests serially)
+            pool: Shared Snowflake connection pool, defaults to a dedicated connection per run
+            refresh_baseline: Recompute PROD values instead of reading them from the baseline cache
+            incremental: Only run tests whose input tables changed since the previous
+                run, defaults to validation.incremental.enabled
+            preview: Run fused tests on a deterministic sample of every table (validation.preview),
+                counts and sums are scaled to estimates and their results are labelled as sampled
+            keboola_client: Shared Keboola API client, defaults to a new client (and HTTP
+                session) per run sized for validation.discovery.max_concurrency
         
         Raises:
             ValueError: If branch_id is empty or None
@@ -34,12 +62,44 @@ class DataValidator:
             
         self.branch_id = branch_id
         self.config = config or Configuration()
-        self.query_executor = QueryExecutor(self.config)
+        self.query_executor = QueryExecutor(self.config, pool=pool)
         self.config_manager = ConfigurationManager(self.config)
-        self.bucket_manager = BucketManager()
+        self.refresh_baseline = refresh_baseline
+        self.discovery_mode = self.config.get("validation", "discovery", "mode", default="per_bucket")
+        max_concurrency = int(self.config.get("validation", "discovery", "max_concurrency", default=16))
+        keboola_client = keboola_client or KeboolaClient(self.config, pool_maxsize=max_concurrency)
+        async_client = None
+        if self.discovery_mode == "async":
+            async_client = AsyncKeboolaClient(max_concurrency=max_concurrency, client=keboola_client)
+        self.bucket_manager = BucketManager(
+            cache_ttl_seconds=float(self.config.get("validation", "metadata_cache", "ttl_seconds", default=300)),
+            client=keboola_client,
+            async_client=async_client
+        )
+        self.preview = preview
+        if preview:
+            self.query_executor.set_sampling(SamplingSpec.from_config(self.config))
+            
+        self.incremental_results: Optional[IncrementalResults] = None
+        if incremental is None:
+            incremental = bool(self.config.get("validation", "incremental", "enabled", default=False))
+        # Sampled results must not replace or be replaced by full results
+        if incremental and not preview:
+            self.incremental_results = IncrementalResults(
+                DiskCache(
+                    self.config.get("validation", "incremental", "path", default="cache/test_results.sqlite"),
+                    "test_results",
+                    max_entries=int(self.config.get("validation", "incremental", "max_entries", default=10000))
+                ),
+                self.config.get("validation", "required_columns")
+            )
+        self.schema_diff = bool(self.config.get("validation", "schema_diff", "enabled", default=False))
+        self.max_workers = max(1, int(
+            max_workers or self.config.get("validation", "concurrency", "max_workers", default=1)
+        ))
         
         # Log initialization
-        logger.info(f"Initialized DataValidator with branch_id: {branch_id}")
+        logger.info(f"Initialized DataValidator with branch_id: {branch_id} (max_workers: {self.max_workers})")
         
     def _validate_environment(self) -> bool:
         """Validate the environment setup
@@ -115,15 +175,15 @@ class DataValidator:
             
         return full_table_id.split('.')[-1]
         
-    def _process_table(self, bucket_id: str, table: Dict) -> Optional[pd.DataFrame]:
-        """Process a single table and run all applicable tests
+    def _build_table_tests(self, bucket_id: str, table: Dict) -> List[Tuple[str, Dict[str, str]]]:
+        """Build the query parameters for every test configured for a table
         
         Args:
             bucket_id: ID of the bucket containing the table
             table: Dictionary containing table information
             
         Returns:
-            DataFrame containing test results, or None if no tests found
+            List of tuples (test_name, test_params), empty if no tests found
             
         Raises:
             ValueError: If required parameters are missing
@@ -136,93 +196,410 @@ class DataValidator:
         prod_bucket = self._parse_prod_bucket(bucket_id)
         
         # Find all matching tests
-        tests = self.config_manager.find_matching_tests(prod_bucket, table_id)
-        if not tests:
-            logger.info(f"No tests found for table {table_id}")
-            return None
+        specs = self.config_manager.get_test_specs(prod_bucket, table_id)
+        if not specs:
+            logger.debug(f"No tests found for table {table_id}")
+            return []
             
-        # Construct table variables with proper quoting (for object references)
-        dev_table = f'"{bucket_id}"."{table_name}"'
-        prod_table = f'"{prod_bucket}"."{table_name}"'
+        # Parameters shared by all tests of the table
+        table_params = {
+            # Table references with proper quoting (for object references)
+            "dev_table": f'"{bucket_id}"."{table_name}"',
+            "prod_table": f'"{prod_bucket}"."{table_name}"',
+            # Table name with single quotes (for string literals)
+            "table_name_string": f"'{table_name}'",
+        }
         
-        # Construct table variables with single quotes (for string literals)
-        table_name_string = f"'{table_name}'"
-        
-        results = []
-        for test_name, parameter_1 in tests:
+        table_tests = []
+        for spec in specs:
+            test_name = spec.test_name
             try:
-                # Get test parameters from configuration
-                test_config = self.config_manager.test_parametrics[
-                    (self.config_manager.test_parametrics['TEST_NAME'] == test_name) &
-                    (self.config_manager.test_parametrics['STORAGE_TABLE_ID'] == table_name) &
-                    (self.config_manager.test_parametrics['STORAGE_BUCKET_ID'] == prod_bucket)
-                ].iloc[0]
-                
                 # Handle source bucket/table references
-                source_bucket_object = "NULL"
-                source_bucket_string = "NULL"
-                source_table_object = "NULL"
-                source_table_string = "NULL"
+                source_params = {
+                    "source_bucket_object": "NULL",
+                    "source_bucket_string": "NULL",
+                    "source_table_object": "NULL",
+                    "source_table_string": "NULL",
+                }
 
-                if pd.notna(test_config["SOURCE_BUCKET"]) and test_config["SOURCE_BUCKET"] != "n/a":
-                    bucket_name = test_config["SOURCE_BUCKET"].split('.')[1]
+                if spec.source_bucket:
+                    bucket_name = spec.source_bucket.split('.')[1]
                     dev_bucket_name = f"out.c-{self.branch_id}-{bucket_name}"
-                    source_bucket = dev_bucket_name if self.bucket_manager.bucket_exists(dev_bucket_name) else test_config["SOURCE_BUCKET"]
-                    source_bucket_object = f'"{source_bucket}"'
-                    source_bucket_string = f"'{source_bucket}'"
+                    source_bucket = dev_bucket_name if self.bucket_manager.bucket_exists(dev_bucket_name) else spec.source_bucket
+                    source_params["source_bucket_object"] = f'"{source_bucket}"'
+                    source_params["source_bucket_string"] = f"'{source_bucket}'"
                     
-                    if pd.notna(test_config["SOURCE_TABLE"]) and test_config["SOURCE_TABLE"] != "n/a":
-                        source_table_object = f'"{test_config["SOURCE_TABLE"]}"'
-                        source_table_string = f"'{test_config['SOURCE_TABLE']}'"
+                    if spec.source_table:
+                        source_params["source_table_object"] = f'"{spec.source_table}"'
+                        source_params["source_table_string"] = f"'{spec.source_table}'"
                 
-                # Regular parameter handling
-                parameter_1_object = f'"{test_config["PARAMETER_1"]}"' if pd.notna(test_config["PARAMETER_1"]) and test_config["PARAMETER_1"] != "n/a" else "NULL"
-                parameter_2_object = f'"{test_config["PARAMETER_2"]}"' if pd.notna(test_config["PARAMETER_2"]) and test_config["PARAMETER_2"] != "n/a" else "NULL"
-                parameter_3_object = f'"{test_config["PARAMETER_3"]}"' if pd.notna(test_config["PARAMETER_3"]) and test_config["PARAMETER_3"] != "n/a" else "NULL"
-                parameter_4_object = f'"{test_config["PARAMETER_4"]}"' if pd.notna(test_config["PARAMETER_4"]) and test_config["PARAMETER_4"] != "n/a" else "NULL"
+                # PARAMETER_1..4 are quoted once per spec and reused across runs
+                test_params = {**table_params, **source_params, **spec.query_params}
                 
-                parameter_1_string = f"'{test_config['PARAMETER_1']}'" if pd.notna(test_config["PARAMETER_1"]) and test_config["PARAMETER_1"] != "n/a" else "NULL"
-                parameter_2_string = f"'{test_config['PARAMETER_2']}'" if pd.notna(test_config["PARAMETER_2"]) and test_config["PARAMETER_2"] != "n/a" else "NULL"
-                parameter_3_string = f"'{test_config['PARAMETER_3']}'" if pd.notna(test_config["PARAMETER_3"]) and test_config["PARAMETER_3"] != "n/a" else "NULL"
-                parameter_4_string = f"'{test_config['PARAMETER_4']}'" if pd.notna(test_config["PARAMETER_4"]) and test_config["PARAMETER_4"] != "n/a" else "NULL"
+                table_tests.append((test_name, test_params))
                 
-                # Execute test
-                test_params = {
-                    "dev_table": dev_table,
-                    "prod_table": prod_table,
-                    "table_name_string": table_name_string,
-                    "source_bucket_object": source_bucket_object,
-                    "source_bucket_string": source_bucket_string,
-                    "source_table_object": source_table_object,
-                    "source_table_string": source_table_string,
-                    "parameter_1_object": parameter_1_object,
-                    "parameter_2_object": parameter_2_object,
-                    "parameter_3_object": parameter_3_object,
-                    "parameter_4_object": parameter_4_object,
-                    "parameter_1_string": parameter_1_string,
-                    "parameter_2_string": parameter_2_string,
-                    "parameter_3_string": parameter_3_string,
-                    "parameter_4_string": parameter_4_string
-                }
-                
-                result = self.query_executor.execute_tests(test_params, test_name)
-                if not result.empty:
-                    results.append(result)
-                    
             except Exception as e:
-                logger.error(f"Error executing test {test_name} for table {table_id}: {e}")
+                logger.error(f"Error preparing test {test_name} for table {table_id}: {e}")
                 continue
                 
+        return table_tests
+        
+    def _execute_table_tests(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> Optional[pa.Table]:
+        """Run prepared tests of a single table
+        
+        Drill-down tests run only if the other tests of the table found a
+        difference between DEV and PROD.
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) for one table
+            
+        Returns:
+            Table containing test results, or None if no results
+        """
+        regular, drill_down = self.query_executor.split_drill_down(table_tests)
+        results = self._run_jobs(self.query_executor.build_jobs(regular))
+        if drill_down and results and has_differences(pa.concat_tables(results)):
+            results.extend(self._run_jobs(self.query_executor.build_jobs(drill_down)))
+                
         if not results:
             return None
             
-        return pd.concat(results, ignore_index=True)
+        return pa.concat_tables(results)
         
-    def run_tests(self) -> pd.DataFrame:
-        """Run all applicable tests for the branch
+    def _run_jobs(self, jobs: List[Callable[[], pa.Table]]) -> List[pa.Table]:
+        """Run execution jobs one after another
         
+        Args:
+            jobs: Jobs built by QueryExecutor.build_jobs
+            
         Returns:
-            DataFrame containing all test results with standardized columns
+            Non-empty result tables of the jobs
+        """
+        results = []
+        for job in jobs:
+            # Jobs isolate errors per test and return an empty table on failure
+            result = job()
+            if result.num_rows > 0:
+                results.append(result)
+        return results
+        
+    def _process_table(self, bucket_id: str, table: Dict) -> Optional[pa.Table]:
+        """Process a single table and run all applicable tests
+        
+        Args:
+            bucket_id: ID of the bucket containing the table
+            table: Dictionary containing table information
+            
+        Returns:
+            Table containing test results, or None if no tests found
+            
+        Raises:
+            ValueError: If required parameters are missing
+        """
+        return self._execute_table_tests(self._build_table_tests(bucket_id, table))
+        
+    def _prepare_tests(self, table_jobs: List[Tuple[str, Dict]]) -> List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]:
+        """Build the tests of every discovered table before anything is executed
+        
+        Args:
+            table_jobs: List of tuples (bucket_id, table) to process
+            
+        Returns:
+            List of tuples (table_id, table_tests) for tables with at least one test
+        """
+        prepared = []
+        for bucket_id, table in table_jobs:
+            try:
+                table_tests = self._build_table_tests(bucket_id, table)
+            except Exception as e:
+                logger.error(f"Error processing table {table.get('id')} in bucket {bucket_id}: {e}")
+                continue
+            if table_tests:
+                prepared.append((table['id'], table_tests))
+        return prepared
+        
+    def _iter_serially(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> Iterator[Tuple[str, Optional[pa.Table]]]:
+        """Run the tests of many tables one table after another
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) to execute
+            
+        Yields:
+            Tuples (table_id, result table or None if the table has no results)
+        """
+        for prepared_table_id, table_tests in prepared:
+            yield prepared_table_id, self._execute_table_tests(table_tests)
+            
+    def _iter_concurrently(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> Iterator[Tuple[str, Optional[pa.Table]]]:
+        """Run the tests of many tables on a pool of worker threads
+        
+        Every job (a fused scan or a single test) is submitted on its own, so a slow
+        table does not hold up the tests of other tables. Drill-down tests of a
+        table are submitted once its other jobs finished with a difference. A
+        table is yielded as soon as all of its jobs finished.
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) to execute
+            
+        Yields:
+            Tuples (table_id, result table or None if the table has no results)
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kbc-test")
+        try:
+            table_of_future = {}
+            pending_jobs = {}
+            drill_down_by_table = {}
+            for index, (_, table_tests) in enumerate(prepared):
+                regular, drill_down = self.query_executor.split_drill_down(table_tests)
+                if drill_down:
+                    drill_down_by_table[index] = drill_down
+                jobs = self.query_executor.build_jobs(regular)
+                pending_jobs[index] = len(jobs)
+                for job in jobs:
+                    table_of_future[pool.submit(job)] = index
+                if not jobs:
+                    # Only drill-down tests, nothing can flag a difference
+                    yield prepared[index][0], None
+                    
+            results_by_table: Dict[int, List[pa.Table]] = {}
+            while table_of_future:
+                done, _ = wait(table_of_future, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = table_of_future.pop(future)
+                    result = future.result()
+                    if result.num_rows > 0:
+                        results_by_table.setdefault(index, []).append(result)
+                    pending_jobs[index] -= 1
+                    if pending_jobs[index] > 0:
+                        continue
+                        
+                    # Drill down into tables whose regular tests found a difference
+                    drill_down = drill_down_by_table.pop(index, None)
+                    results = results_by_table.get(index)
+                    if drill_down and results and has_differences(pa.concat_tables(results)):
+                        jobs = self.query_executor.build_jobs(drill_down)
+                        pending_jobs[index] = len(jobs)
+                        for job in jobs:
+                            table_of_future[pool.submit(job)] = index
+                        continue
+                        
+                    results = results_by_table.pop(index, None)
+                    yield prepared[index][0], pa.concat_tables(results) if results else None
+        finally:
+            # Stop queued jobs if the consumer stops early
+            pool.shutdown(wait=True, cancel_futures=True)
+            
+    def _skip_unchanged(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> Tuple[List[Tuple[str, List[Tuple[str, Dict[str, str]]]]], List[Tuple[str, pa.Table]]]:
+        """Reuse the previous results of tests whose input tables did not change
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) of the run
+            
+        Returns:
+            Tuple of the tests left to run and the reused results as tuples
+            (table_id, result table)
+        """
+        table_ids = {
+            input_table_id
+            for _, table_tests in prepared
+            for _, test_params in table_tests
+            for input_table_id in input_tables(test_params)
+        }
+        try:
+            tables = self.bucket_manager.get_tables_by_id(list(table_ids))
+        except Exception as e:
+            logger.warning(f"Could not look up table changes, running every test: {e}")
+            tables = {}
+        # A baseline refresh has to recompute the reused results as well
+        return self.incremental_results.split(prepared, tables, force=self.refresh_baseline)
+        
+    def _load_baseline_tables(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> None:
+        """Look up when the production tables read by the tests last changed
+        
+        PROD values of those tables are then served from the baseline cache as
+        long as the table has not changed since they were computed.
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) to execute
+        """
+        if self.query_executor.baseline_cache is None or self.preview:
+            return
+            
+        relations = set()
+        for _, table_tests in prepared:
+            relations.update(self.query_executor.prod_relations(table_tests))
+            
+        # Only production tables are shared between branches
+        table_ids = {
+            relation: table_id(relation) for relation in relations
+            if f"c-{self.branch_id}-" not in relation
+        }
+        try:
+            tables = self.bucket_manager.get_tables_by_id(list(table_ids.values()))
+        except Exception as e:
+            logger.warning(f"Could not look up production table changes, skipping baseline cache: {e}")
+            tables = {}
+            
+        self.query_executor.set_baseline_tables(
+            {
+                relation: tables[prod_table_id]["lastChangeDate"]
+                for relation, prod_table_id in table_ids.items()
+                if tables.get(prod_table_id, {}).get("lastChangeDate")
+            },
+            refresh=self.refresh_baseline
+        )
+        
+    def _check_schemas(self, table_jobs: List[Tuple[str, Dict]],
+                       prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> Tuple[Optional[pa.Table], List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]]:
+        """Diff the columns of the DEV tables against PROD and drop tests that cannot run
+        
+        The columns of every DEV and PROD bucket are read with one
+        INFORMATION_SCHEMA query per bucket before any data query runs. Tests
+        reading a table or a PARAMETER_1 column that does not exist are skipped.
+        
+        Args:
+            table_jobs: List of tuples (bucket_id, table) of the run
+            prepared: List of tuples (table_id, table_tests) to execute
+            
+        Returns:
+            Tuple of the check_schema results (None if no schema changed) and the tests left to run
+        """
+        prod_schemas = {bucket_id: self._parse_prod_bucket(bucket_id) for bucket_id, _ in table_jobs}
+        dev_tables = [f'"{bucket_id}"."{self._extract_table_name(table["id"])}"' for bucket_id, table in table_jobs]
+        try:
+            columns = self.query_executor.load_schema_columns(list(set(prod_schemas) | set(prod_schemas.values())))
+        except Exception as e:
+            logger.warning(f"Could not load table schemas, skipping schema diff: {e}")
+            return None, prepared
+            
+        changes = diff_schemas(columns, prod_schemas, dev_tables)
+        logger.info(f"Schema diff found {len(changes)} changes in {changes['TABLE_NAME'].nunique()} tables")
+        result = schema_results(changes, self.config.get("validation", "required_columns"))
+        
+        # Buckets without any column are not trusted to be empty (e.g. missing privileges)
+        tables = known_columns(columns)
+        schemas = set(columns["TABLE_SCHEMA"])
+        runnable = []
+        for prepared_table_id, table_tests in prepared:
+            table_runnable = []
+            for test_name, test_params in table_tests:
+                reason = missing_reference(
+                    test_params, self.query_executor.placeholders(test_name), tables, schemas
+                )
+                if reason:
+                    logger.warning(f"Skipping test {test_name} for table {prepared_table_id}: {reason}")
+                    continue
+                table_runnable.append((test_name, test_params))
+            if table_runnable:
+                runnable.append((prepared_table_id, table_runnable))
+                
+        return (result if result.num_rows > 0 else None), runnable
+        
+    def _load_table_columns(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> None:
+        """Load the columns of every profiled table with one INFORMATION_SCHEMA query
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) to execute
+        """
+        self.query_executor.load_table_columns([
+            relation for _, table_tests in prepared
+            for relation in self.query_executor.profile_relations(table_tests)
+        ])
+        
+    def _prefetch_aggregates(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]]) -> None:
+        """Compute the aggregates of small tables of the run in cross-table batches
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) to execute
+        """
+        self.query_executor.prefetch_aggregates([
+            test for _, table_tests in prepared
+            for test in self.query_executor.split_drill_down(table_tests)[0]
+        ])
+        
+    def _discover_tables(self) -> List[Tuple[str, Dict]]:
+        """Find all tables of the dev buckets of the branch
+        
+        In "bulk" discovery mode all tables are listed with one Storage API
+        request, in "async" mode the dev buckets are listed concurrently,
+        otherwise tables are listed bucket by bucket.
+        
+        Returns:
+            List of tuples (bucket_id, table) to test
+        """
+        # Tables to test, as tuples (bucket_id, table)
+        table_jobs = []
+        
+        if self.discovery_mode == "bulk":
+            tables_by_bucket = self.bucket_manager.find_tables_by_branch(self.branch_id)
+            if not tables_by_bucket:
+                logger.warning(f"No development buckets found for branch {self.branch_id}")
+            for bucket_id, tables in tables_by_bucket.items():
+                table_jobs.extend((bucket_id, table) for table in tables)
+            return table_jobs
+            
+        # Get all dev buckets for branch
+        dev_buckets = self.bucket_manager.find_buckets_by_branch(self.branch_id)
+        if not dev_buckets:
+            logger.warning(f"No development buckets found for branch {self.branch_id}")
+            return table_jobs
+            
+        if self.discovery_mode == "async":
+            tables_by_bucket = self.bucket_manager.get_tables_for_buckets(
+                [dev_bucket['id'] for dev_bucket in dev_buckets]
+            )
+            for bucket_id, tables in tables_by_bucket.items():
+                table_jobs.extend((bucket_id, table) for table in tables)
+            return table_jobs
+            
+        for dev_bucket in dev_buckets:
+            bucket_id = dev_bucket['id']
+            
+            try:
+                # Get tables for this bucket
+                tables = self.bucket_manager.get_tables(bucket_id)
+                if not tables:
+                    logger.info(f"No tables found in bucket {bucket_id}")
+                    continue
+                    
+                table_jobs.extend((bucket_id, table) for table in tables)
+                        
+            except Exception as e:
+                logger.error(f"Error processing bucket {bucket_id}: {e}")
+                continue
+                
+        return table_jobs
+        
+    @property
+    def metrics(self) -> pd.DataFrame:
+        """Per-query metrics of the last run, slowest queries first"""
+        return self.query_executor.metrics.to_frame()
+        
+    def _finish_metrics(self) -> None:
+        """Enrich and export the query metrics of the run as configured"""
+        if not len(self.query_executor.metrics):
+            return
+        if self.config.get("validation", "metrics", "query_history", default=False):
+            self.query_executor.enrich_metrics()
+        export_dir = self.config.get("validation", "metrics", "export_dir", default=None)
+        if export_dir:
+            try:
+                self.query_executor.metrics.export(export_dir)
+            except Exception as e:
+                logger.warning(f"Could not export query metrics: {e}")
+                
+    def iter_results(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> Iterator[pa.Table]:
+        """Run all applicable tests for the branch, yielding results as they become ready
+        
+        Each yielded table holds the results of one table (or reused results of
+        unchanged tests in incremental mode), so callers can show them while
+        the remaining tables are still being tested.
+        
+        Args:
+            progress_callback: Called with (completed, total) after every table
+            
+        Yields:
+            Arrow tables with standardized columns, see execution.results
             
         Raises:
             Exception: If connection to Snowflake fails or environment is invalid
@@ -234,44 +611,102 @@ class DataValidator:
                 
             # Connect to Snowflake
             self.query_executor.connect()
+            self.query_executor.start_run()
             
-            # List to store all results
-            all_results = []
+            table_jobs = self._discover_tables()
+            if not table_jobs:
+                return
+                
+            # Row counts of every table from one metadata query
+            self.query_executor.load_row_counts([table for _, table in table_jobs])
             
-            # Get all dev buckets for branch
-            dev_buckets = self.bucket_manager.find_buckets_by_branch(self.branch_id)
-            if not dev_buckets:
-                logger.warning(f"No development buckets found for branch {self.branch_id}")
-                return pd.DataFrame()
+            prepared = self._prepare_tests(table_jobs)
+            schema_result = None
+            if self.schema_diff:
+                schema_result, prepared = self._check_schemas(table_jobs, prepared)
+            reused = []
+            if self.incremental_results is not None:
+                prepared, reused = self._skip_unchanged(prepared)
+            self._load_baseline_tables(prepared)
+            self._load_table_columns(prepared)
+            self._prefetch_aggregates(prepared)
+            
+            # Progress counts tables, a table with both reused and changed
+            # tests completes once its tests ran
+            run_table_ids = {prepared_table_id for prepared_table_id, _ in prepared}
+            reused_table_ids = {reused_table_id for reused_table_id, _ in reused} - run_table_ids
+            total = len(reused_table_ids) + len(prepared)
+            completed = 0
+            if schema_result is not None:
+                yield schema_result
+            for reused_table_id, result in reused:
+                if reused_table_id in reused_table_ids:
+                    reused_table_ids.discard(reused_table_id)
+                    completed += 1
+                    if progress_callback is not None:
+                        progress_callback(completed, total)
+                yield result
                 
-            for dev_bucket in dev_buckets:
-                bucket_id = dev_bucket['id']
+            if self.max_workers > 1:
+                table_results = self._iter_concurrently(prepared)
+            else:
+                table_results = self._iter_serially(prepared)
                 
-                try:
-                    # Get tables for this bucket
-                    tables = self.bucket_manager.get_tables(bucket_id)
-                    if not tables:
-                        logger.info(f"No tables found in bucket {bucket_id}")
-                        continue
-                        
-                    for table in tables:
-                        result = self._process_table(bucket_id, table)
-                        if result is not None:
-                            all_results.append(result)
-                            
-                except Exception as e:
-                    logger.error(f"Error processing bucket {bucket_id}: {e}")
+            for prepared_table_id, result in table_results:
+                completed += 1
+                if progress_callback is not None:
+                    progress_callback(completed, total)
+                if result is None:
                     continue
-                    
-            if not all_results:
-                logger.warning("No test results found")
-                return pd.DataFrame()
+                if self.incremental_results is not None:
+                    self.incremental_results.store(prepared_table_id, result)
+                yield result
+                
+            self._finish_metrics()
                 
-            # Compile all results
-            return self.query_executor.compile_results(all_results)
-                    
         except Exception as e:
             logger.error(f"Failed to run tests: {e}")
             raise
         finally:
-            self.query_executor.disconnect() 
\ No newline at end of file
+            self.query_executor.disconnect()
+            
+    async def aiter_results(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> AsyncIterator[pa.Table]:
+        """Async counterpart of iter_results
+        
+        The tests run on a worker thread, so the event loop stays free while
+        waiting for the next table.
+        
+        Args:
+            progress_callback: Called with (completed, total) after every table,
+                from the worker thread
+            
+        Yields:
+            Arrow tables with standardized columns, see execution.results
+        """
+        results = self.iter_results(progress_callback)
+        exhausted = object()
+        try:
+            while True:
+                result = await asyncio.to_thread(next, results, exhausted)
+                if result is exhausted:
+                    break
+                yield result
+        finally:
+            await asyncio.to_thread(results.close)
+            
+    def run_tests(self) -> pd.DataFrame:
+        """Run all applicable tests for the branch
+        
+        Returns:
+            DataFrame containing all test results with standardized columns
+            
+        Raises:
+            Exception: If connection to Snowflake fails or environment is invalid
+        """
+        all_results = list(self.iter_results())
+        if not all_results:
+            logger.warning("No test results found")
+            return pd.DataFrame()
+            
+        # Compile all results
+        return self.query_executor.compile_results(all_results)
\ No newline at end of file
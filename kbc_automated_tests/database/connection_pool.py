@@ -0,0 +1,187 @@
+"""
+Connection pool for reusing Snowflake sessions across test runs
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+from loguru import logger
+
+from .snowflake_client import SnowflakeClient
+
+
+def configure_snowflake_environment(config: Any) -> None:
+    """Export Snowflake credentials from configuration for SnowflakeClient
+
+    Args:
+        config: Configuration object
+    """
+    os.environ['SNOWFLAKE_USER'] = config.get("snowflake", "username")
+    os.environ['SNOWFLAKE_PASSWORD'] = config.get("snowflake", "password")
+    os.environ['SNOWFLAKE_ACCOUNT'] = config.get("snowflake", "account")
+    os.environ['SNOWFLAKE_WAREHOUSE'] = config.get("snowflake", "warehouse")
+
+
+class SnowflakeConnectionPool:
+    """Keeps a bounded number of Snowflake sessions alive and hands them out to workers
+
+    Sessions are opened lazily, health-checked when they have been idle for a
+    while and recycled once they reach their maximum age, so a long-lived
+    process (e.g. the Streamlit app) pays the login cost only once per session.
+    """
+
+    def __init__(self, size: int = 4, max_age_seconds: float = 3600,
+                 health_check_seconds: float = 300, dump_results: bool = False):
+        """Initialize the connection pool
+
+        Args:
+            size: Maximum number of open sessions
+            max_age_seconds: Sessions older than this are closed and replaced
+            health_check_seconds: Sessions idle for longer than this are checked before reuse
+            dump_results: Log the full result of every query at DEBUG level
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.size = size
+        self.max_age_seconds = max_age_seconds
+        self.health_check_seconds = health_check_seconds
+        self.dump_results = dump_results
+        self._idle: List[SnowflakeClient] = []
+        self._open = 0
+        # Guards _idle, _open and _closed, waiters are notified whenever a
+        # session is returned or a slot is freed
+        self._available = threading.Condition()
+        self._closed = False
+        atexit.register(self.close)
+        logger.info(f"Initialized Snowflake connection pool (size: {size})")
+
+    @classmethod
+    def from_config(cls, config: Any) -> "SnowflakeConnectionPool":
+        """Create a pool using the snowflake.pool configuration section
+
+        Args:
+            config: Configuration object
+
+        Returns:
+            Connection pool
+        """
+        configure_snowflake_environment(config)
+        return cls(
+            size=int(config.get("snowflake", "pool", "size", default=4)),
+            max_age_seconds=float(config.get("snowflake", "pool", "max_age_seconds", default=3600)),
+            health_check_seconds=float(config.get("snowflake", "pool", "health_check_seconds", default=300)),
+            dump_results=bool(config.get("logging", "dump_results", default=False)),
+        )
+
+    def _open_client(self) -> SnowflakeClient:
+        """Open a new pooled session"""
+        client = SnowflakeClient(dump_results=self.dump_results)
+        client.connect(keep_alive=True)
+        client.created_at = time.monotonic()
+        client.released_at = client.created_at
+        return client
+
+    def _discard(self, client: SnowflakeClient) -> None:
+        """Close a session and free its slot in the pool"""
+        try:
+            client.disconnect()
+        except Exception as e:
+            logger.warning(f"Error closing pooled Snowflake session: {e}")
+        self._free_slot()
+
+    def _free_slot(self) -> None:
+        """Give up a slot of the pool, letting a waiting caller open a new session"""
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def _is_reusable(self, client: SnowflakeClient) -> bool:
+        """Check whether an idle session can be handed out again"""
+        now = time.monotonic()
+        if now - client.created_at > self.max_age_seconds:
+            logger.info("Recycling Snowflake session that reached its maximum age")
+            return False
+        if now - client.released_at > self.health_check_seconds and not client.is_healthy():
+            logger.warning("Recycling unhealthy Snowflake session")
+            return False
+        return True
+
+    def _acquire(self, timeout: Optional[float]) -> SnowflakeClient:
+        """Take an idle session, opening a new one while below the pool size"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            client = None
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        client = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a Snowflake session")
+                    self._available.wait(remaining)
+
+            if client is None:
+                try:
+                    return self._open_client()
+                except Exception:
+                    self._free_slot()
+                    raise
+            if self._is_reusable(client):
+                return client
+            self._discard(client)
+
+    def _release(self, client: SnowflakeClient, failed: bool) -> None:
+        """Return a session to the pool, dropping it if it is no longer usable"""
+        if self._closed or (failed and not client.is_healthy()):
+            self._discard(client)
+            return
+        # Worker threads of the finished run must not keep their cursors open
+        client.close_worker_cursors()
+        client.released_at = time.monotonic()
+        with self._available:
+            if not self._closed:
+                self._idle.append(client)
+                self._available.notify()
+                return
+        self._discard(client)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[SnowflakeClient]:
+        """Borrow a connected SnowflakeClient for the duration of a block
+
+        Args:
+            timeout: Seconds to wait for a free session, None waits indefinitely
+
+        Yields:
+            Connected SnowflakeClient
+        """
+        client = self._acquire(timeout)
+        failed = False
+        try:
+            yield client
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(client, failed)
+
+    def close(self) -> None:
+        """Close all idle sessions and stop handing out new ones"""
+        with self._available:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for client in idle:
+            self._discard(client)
+        logger.info("Closed Snowflake connection pool")
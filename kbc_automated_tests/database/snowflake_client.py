@@ -2,22 +2,38 @@
 Snowflake client for executing queries
 """
 import os
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional
 from loguru import logger
 import snowflake.connector
 import pandas as pd
+import pyarrow as pa
 
 class SnowflakeClient:
     """Client for executing Snowflake queries"""
     
-    def __init__(self):
-        """Initialize Snowflake client"""
+    def __init__(self, dump_results: bool = False):
+        """Initialize Snowflake client
+        
+        Args:
+            dump_results: Log the full result of every query at DEBUG level
+        """
         logger.info("Initializing Snowflake client")
+        self.dump_results = dump_results
         self.conn = None
         self.cursor = None
+        # Cursors are not safe to share between threads, so worker threads
+        # each get their own cursor on the shared connection
+        self._local = threading.local()
+        self._worker_cursors = []
+        self._cursor_lock = threading.Lock()
+        
+    def connect(self, keep_alive: bool = False):
+        """Connect to Snowflake
         
-    def connect(self):
-        """Connect to Snowflake"""
+        Args:
+            keep_alive: Keep the session alive while the connection is open
+        """
         try:
             self.conn = snowflake.connector.connect(
                 user=os.getenv('SNOWFLAKE_USER'),
@@ -25,56 +41,187 @@ class SnowflakeClient:
                 account=os.getenv('SNOWFLAKE_ACCOUNT'),
                 warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
                 database=os.getenv('SNOWFLAKE_DATABASE'),
-                schema=os.getenv('SNOWFLAKE_SCHEMA')
+                schema=os.getenv('SNOWFLAKE_SCHEMA'),
+                client_session_keep_alive=keep_alive
             )
             self.cursor = self.conn.cursor()
+            self._local.cursor = self.cursor
             logger.info("Successfully connected to Snowflake")
         except Exception as e:
             logger.error(f"Failed to connect to Snowflake: {e}")
             raise
             
-    def execute_query(self, query: str, params: Dict[str, Any] = None) -> pd.DataFrame:
+    def is_healthy(self) -> bool:
+        """Check that the connection is open and the session still answers queries
+        
+        Returns:
+            bool: True if the session is usable, False otherwise
+        """
+        if self.conn is None or self.conn.is_closed():
+            return False
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return True
+        except Exception as e:
+            logger.warning(f"Snowflake health check failed: {e}")
+            return False
+            
+    def _get_cursor(self):
+        """Get the cursor for the calling thread, opening one if needed
+        
+        Returns:
+            Snowflake cursor owned by the calling thread
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+            with self._cursor_lock:
+                self._worker_cursors.append(cursor)
+        return cursor
+            
+    @property
+    def session_id(self) -> Optional[int]:
+        """Snowflake session ID of the connection, None if not connected"""
+        return getattr(self.conn, "session_id", None)
+        
+    def last_query_id(self) -> Optional[str]:
+        """Get the Snowflake query ID (sfqid) of the last query run by the calling thread
+        
+        Returns:
+            Query ID, None if the thread has not run a query yet
+        """
+        return getattr(self._local, "last_query_id", None)
+        
+    def execute_query(self, query: str) -> pd.DataFrame:
         """Execute a query and return results as a pandas DataFrame
         
+        Test queries are rendered by QueryManager before they get here.
+        
         Args:
             query: SQL query to execute
-            params: Dictionary of parameters to bind to the query
             
         Returns:
             DataFrame containing query results
         """
+        # A failed query must not report the ID of the previous one
+        self._local.last_query_id = None
         try:
-            # Log the query and parameters for debugging
-            logger.info("Executing query:")
-            if params:
-                # Replace parameters in query for logging
-                actual_query = query
-                for key, value in params.items():
-                    actual_query = actual_query.replace(f"%({key})s", str(value))
-                logger.info(actual_query)
-                # Execute the query with parameters replaced
-                self.cursor.execute(actual_query)
-            else:
-                logger.info(query)
-                self.cursor.execute(query)
+            cursor = self._get_cursor()
+            logger.opt(lazy=True).debug("Executing query:\n{}", lambda: query)
+            cursor.execute(query)
+            self._local.last_query_id = cursor.sfqid
                 
             # Fetch results directly into a pandas DataFrame
-            df = self.cursor.fetch_pandas_all()
-            logger.info(f"Query returned {len(df)} rows")
-            
-            # Log the results in a readable format
-            logger.info("\nQuery Results:")
-            logger.info(df.to_string())
-            logger.info("\n")
+            df = cursor.fetch_pandas_all()
+            logger.opt(lazy=True).debug("Query returned {} rows", lambda: len(df))
+            if self.dump_results:
+                logger.opt(lazy=True).debug("Query results:\n{}", df.to_string)
             
             return df
             
         except Exception as e:
+            # Snowflake errors carry the ID of the failed query
+            self._local.last_query_id = getattr(e, "sfqid", None)
+            logger.error(f"Failed to execute query: {e}")
+            raise
+            
+    def execute_arrow(self, query: str, max_rows: Optional[int] = None) -> pa.Table:
+        """Execute a query and return results as a pyarrow Table
+        
+        The result batches are fetched in Arrow format and combined without
+        copying, skipping the conversion to pandas.
+        
+        Args:
+            query: SQL query to execute
+            max_rows: Stop streaming result batches once this many rows arrived,
+                keeping memory bounded for queries with large results
+            
+        Returns:
+            Table containing query results, without columns if the query returned no rows
+        """
+        # A failed query must not report the ID of the previous one
+        self._local.last_query_id = None
+        try:
+            cursor = self._get_cursor()
+            logger.opt(lazy=True).debug("Executing query:\n{}", lambda: query)
+            cursor.execute(query)
+            self._local.last_query_id = cursor.sfqid
+            
+            batches = []
+            rows = 0
+            for batch in cursor.fetch_arrow_batches():
+                if max_rows is not None and rows + batch.num_rows > max_rows:
+                    batches.append(batch.slice(0, max_rows - rows))
+                    logger.warning(f"Query result truncated to {max_rows} rows")
+                    break
+                batches.append(batch)
+                rows += batch.num_rows
+                if max_rows is not None and rows == max_rows:
+                    break
+            if not batches:
+                logger.debug("Query returned 0 rows")
+                return pa.table({})
+                
+            # The connector yields one Table per result chunk
+            table = pa.concat_tables(batches)
+            logger.opt(lazy=True).debug("Query returned {} rows", lambda: table.num_rows)
+            if self.dump_results:
+                logger.opt(lazy=True).debug("Query results:\n{}", lambda: table.to_pandas().to_string())
+            return table
+            
+        except Exception as e:
+            # Snowflake errors carry the ID of the failed query
+            self._local.last_query_id = getattr(e, "sfqid", None)
             logger.error(f"Failed to execute query: {e}")
             raise
             
+    def fetch_records(self, query: str) -> List[Dict[str, Any]]:
+        """Execute a metadata command (e.g. SHOW) and return its rows as dictionaries
+        
+        SHOW and DESCRIBE results are not delivered in Arrow format, so they
+        cannot be fetched with fetch_pandas_all.
+        
+        Args:
+            query: SQL command to execute
+            
+        Returns:
+            List of rows keyed by lower-cased column name
+        """
+        try:
+            cursor = self._get_cursor()
+            logger.info(f"Executing metadata query: {query}")
+            cursor.execute(query)
+            columns = [column[0].lower() for column in cursor.description]
+            records = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            logger.info(f"Metadata query returned {len(records)} rows")
+            return records
+            
+        except Exception as e:
+            logger.error(f"Failed to execute metadata query: {e}")
+            raise
+            
+    def close_worker_cursors(self):
+        """Close the cursors opened by worker threads
+        
+        Called when a pooled session is returned, so the threads of finished
+        runs do not keep their cursors open for the lifetime of the session.
+        Later queries open a new cursor on the calling thread.
+        """
+        with self._cursor_lock:
+            cursors, self._worker_cursors = self._worker_cursors, []
+            self._local = threading.local()
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Exception as e:
+                logger.warning(f"Error closing Snowflake cursor: {e}")
+            
     def disconnect(self):
         """Disconnect from Snowflake"""
+        self.close_worker_cursors()
         if self.cursor:
             self.cursor.close()
         if self.conn:
@@ -0,0 +1,40 @@
+"""
+Accuracy modes of tests that can run approximately on very large tables
+
+A test listed in APPROXIMATE_VARIANTS reads its accuracy mode from
+PARAMETER_2 of data_test_parametrics.csv:
+- exact: always run the exact test (the default)
+- approximate: run the approximate variant, e.g. APPROX_COUNT_DISTINCT
+- auto: run the approximate variant once the larger of the DEV and PROD
+  tables has more rows than validation.accuracy.auto_threshold_rows
+"""
+from typing import Optional
+
+# Tests with an approximate variant, mapped to the name of the variant
+APPROXIMATE_VARIANTS = {
+    "check_uniqueness": "check_uniqueness_approximate",
+}
+
+ACCURACY_MODES = ("exact", "approximate", "auto")
+
+def choose_accuracy(mode: Optional[str], row_count: Optional[int], threshold: int) -> str:
+    """Decide whether a test runs exactly or approximately
+    
+    Args:
+        mode: Accuracy mode from the parametrics, None for the default
+        row_count: Rows of the larger input table, None if unknown
+        threshold: Row count above which auto mode runs approximately
+    
+    Returns:
+        "exact" or "approximate"
+    
+    Raises:
+        ValueError: If the mode is not one of ACCURACY_MODES
+    """
+    mode = (mode or "exact").strip().lower()
+    if mode not in ACCURACY_MODES:
+        raise ValueError(f"Unknown accuracy mode: {mode}")
+    if mode == "auto":
+        # Without size metadata stay exact, a slow result beats a wrong one
+        return "approximate" if row_count is not None and row_count > threshold else "exact"
+    return mode
\ No newline at end of file
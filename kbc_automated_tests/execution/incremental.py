@@ -0,0 +1,190 @@
+"""
+Incremental re-runs that reuse the results of tests whose input tables did not change
+"""
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+import pyarrow as pa
+from loguru import logger
+
+from ..cache import DiskCache
+from ..queries.query_planner import ENVIRONMENTS, literal_value, table_id
+from .results import from_rows
+
+# Parameters holding the quoted tables a test reads
+TABLE_PARAMETERS = ("dev_table", "prod_table")
+
+def input_tables(test_params: Dict[str, str]) -> List[str]:
+    """List the Storage API table IDs a test reads
+    
+    Args:
+        test_params: Parameters of the test
+    
+    Returns:
+        Table IDs of the DEV, PROD and (if set) source tables
+    """
+    relations = [test_params[name] for name in TABLE_PARAMETERS]
+    source_bucket = literal_value(test_params["source_bucket_string"])
+    source_table = literal_value(test_params["source_table_string"])
+    if source_bucket and source_table:
+        relations.append(f"{test_params['source_bucket_object']}.{test_params['source_table_object']}")
+    return [table_id(relation) for relation in relations]
+
+class IncrementalResults:
+    """Stores test results together with the state of the tables they read
+    
+    Results are kept per dev table and test name. On the next run a test is
+    only executed again if its parameters changed or one of its input tables
+    has a different lastChangeDate or lastImportDate, otherwise its previous
+    rows are reused. Tests sharing a name on one table (e.g. check_sum on two
+    columns) are told apart by PARAMETER_1 and only stored once all of them
+    returned rows for both environments.
+    """
+    
+    def __init__(self, cache: DiskCache, columns: List[str]):
+        """Initialize the incremental results
+        
+        Args:
+            cache: Disk cache storing the results
+            columns: Result columns, in order
+        """
+        self.cache = cache
+        self.columns = columns
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._expected: Dict[Tuple[str, str], Set[Optional[str]]] = {}
+    
+    @staticmethod
+    def _key(dev_table_id: str, test_name: str) -> str:
+        """Cache key of the results of a test on a dev table"""
+        return json.dumps([dev_table_id, test_name])
+    
+    @staticmethod
+    def _fingerprint(tests: List[Dict[str, str]], tables: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        """Describe the parameters and input table state of a group of tests
+        
+        Returns:
+            Fingerprint string, None if the state of an input table is unknown
+        """
+        inputs = {}
+        for test_params in tests:
+            for input_table_id in input_tables(test_params):
+                table = tables.get(input_table_id)
+                if table is None or not (table.get("lastChangeDate") or table.get("lastImportDate")):
+                    return None
+                inputs[input_table_id] = [table.get("lastChangeDate"), table.get("lastImportDate")]
+        return json.dumps({"tests": tests, "inputs": inputs}, sort_keys=True)
+    
+    @staticmethod
+    def _expected_parameters(tests: List[Dict[str, str]]) -> Optional[Set[Optional[str]]]:
+        """PARAMETER_1 values the rows of a group of same-named tests must cover
+        
+        Args:
+            tests: Parameters of the tests in the group
+        
+        Returns:
+            One PARAMETER_1 value per test, None if two tests share it and
+            their rows cannot be told apart
+        """
+        parameters = {literal_value(test_params["parameter_1_string"]) for test_params in tests}
+        return parameters if len(parameters) == len(tests) else None
+    
+    def split(self, prepared: List[Tuple[str, List[Tuple[str, Dict[str, str]]]]],
+              tables: Dict[str, Dict[str, Any]], force: bool = False) -> Tuple[List[Tuple[str, List[Tuple[str, Dict[str, str]]]]], List[Tuple[str, pa.Table]]]:
+        """Separate tests that have to run from tests with reusable results
+        
+        Args:
+            prepared: List of tuples (table_id, table_tests) of the run
+            tables: Storage API tables by ID, for the state of the input tables
+        
+        Returns:
+            Tuple of the tests left to run, in the same form as prepared, and
+            the reused results as tuples (table_id, result table), one per
+            test name
+        """
+        groups: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        for dev_table_id, table_tests in prepared:
+            for test_name, test_params in table_tests:
+                groups.setdefault((dev_table_id, test_name), []).append(test_params)
+        
+        fingerprints = {group: self._fingerprint(tests, tables) for group, tests in groups.items()}
+        try:
+            stored = self.cache.get_many(self._key(*group) for group in groups)
+        except Exception as e:
+            logger.warning(f"Previous results unavailable, running every test: {str(e)}")
+            stored = {}
+        
+        reused = []
+        reused_groups = set()
+        self._pending = {}
+        self._expected = {}
+        for group, fingerprint in fingerprints.items():
+            entry = stored.get(self._key(*group))
+            if not force and fingerprint is not None and entry is not None and entry["fingerprint"] == fingerprint:
+                reused.append((group[0], from_rows(entry["rows"], self.columns)))
+                reused_groups.add(group)
+                continue
+            if fingerprint is None:
+                continue
+            if len(groups[group]) > 1:
+                expected = self._expected_parameters(groups[group])
+                if expected is None:
+                    continue
+                self._expected[group] = expected
+            self._pending[group] = fingerprint
+        
+        to_run = []
+        for dev_table_id, table_tests in prepared:
+            remaining = [
+                (test_name, test_params) for test_name, test_params in table_tests
+                if (dev_table_id, test_name) not in reused_groups
+            ]
+            if remaining:
+                to_run.append((dev_table_id, remaining))
+        
+        logger.info(f"Reusing results of {len(reused)} unchanged tests, "
+                    f"running {sum(len(tests) for _, tests in to_run)} tests")
+        return to_run, reused
+    
+    @staticmethod
+    def _complete(rows: List[Dict[str, Any]], expected: Set[Optional[str]]) -> bool:
+        """Check that every test of a group returned rows for both environments
+        
+        Args:
+            rows: Result rows of the group
+            expected: PARAMETER_1 values of the tests in the group
+        
+        Returns:
+            True if each PARAMETER_1 value has DEV and PROD rows
+        """
+        covered = {(row["PARAMETER_1"], row["ENVIRONMENT"]) for row in rows}
+        return all(
+            (parameter, environment) in covered
+            for parameter in expected for environment in ENVIRONMENTS
+        )
+    
+    def store(self, dev_table_id: str, result: pa.Table) -> None:
+        """Store the results of tests that ran on a dev table
+        
+        Args:
+            dev_table_id: ID of the dev table
+            result: Result rows of the tests on that table
+        """
+        rows_by_test: Dict[str, List[Dict[str, Any]]] = {}
+        for row in result.select(self.columns).to_pylist():
+            rows_by_test.setdefault(row["TEST_NAME"], []).append(row)
+            
+        items = {}
+        for test_name, rows in rows_by_test.items():
+            group = (dev_table_id, test_name)
+            fingerprint = self._pending.get(group)
+            if fingerprint is None:
+                continue
+            expected = self._expected.get(group)
+            if expected is not None and not self._complete(rows, expected):
+                # A failed test would otherwise be replaced by the rows of the others
+                logger.debug(f"Not storing partial results of {test_name} for {dev_table_id}")
+                continue
+            items[self._key(dev_table_id, test_name)] = {"fingerprint": fingerprint, "rows": rows}
+        try:
+            self.cache.set_many(items)
+        except Exception as e:
+            logger.warning(f"Could not store results for {dev_table_id}: {str(e)}")
\ No newline at end of file
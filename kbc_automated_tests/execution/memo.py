@@ -0,0 +1,90 @@
+"""
+Run-scoped memoization of aggregate values shared between tests and tables
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+# Value published for aggregates whose computation failed
+MISSING = object()
+
+class AggregateMemo:
+    """Computes every distinct aggregate of a run once
+    
+    Callers claim the aggregates they need: values already known are returned,
+    aggregates another thread is computing are returned as futures to wait
+    for, and the remaining ones are owned by the caller, who must publish
+    their values (or MISSING) once computed. Callers publish what they own
+    before waiting on others, so concurrent jobs never wait on each other in
+    a cycle.
+    """
+    
+    def __init__(self):
+        """Initialize an empty memo"""
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def claim(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Future], List[Hashable]]:
+        """Look up aggregates and take ownership of the ones nobody computes yet
+        
+        Args:
+            keys: Keys of the needed aggregates
+        
+        Returns:
+            Tuple of the known values, the futures of aggregates in flight and
+            the keys now owned by the caller. Aggregates that failed earlier in
+            the run are in none of them.
+        """
+        known = {}
+        in_flight = {}
+        owned = []
+        with self._lock:
+            for key in keys:
+                future = self._futures.get(key)
+                if future is None:
+                    self._futures[key] = Future()
+                    owned.append(key)
+                elif not future.done():
+                    in_flight[key] = future
+                elif future.result() is not MISSING:
+                    known[key] = future.result()
+        return known, in_flight, owned
+    
+    def publish(self, values: Dict[Hashable, Any]) -> None:
+        """Publish the values of owned aggregates, waking up waiting callers
+        
+        Args:
+            values: Value of each owned key, MISSING if it could not be computed
+        """
+        with self._lock:
+            futures = [(self._futures.get(key), value) for key, value in values.items()]
+        for future, value in futures:
+            if future is not None and not future.done():
+                future.set_result(value)
+    
+    def add(self, values: Dict[Hashable, Any]) -> None:
+        """Record values computed outside of claim, e.g. in a batch before the jobs run
+        
+        Args:
+            values: Value of each key, keys already known or in flight are left alone
+        """
+        with self._lock:
+            for key, value in values.items():
+                if key not in self._futures:
+                    future = Future()
+                    future.set_result(value)
+                    self._futures[key] = future
+    
+    def reset(self) -> None:
+        """Forget all values, e.g. at the start of a run"""
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        # Nobody may keep waiting on a forgotten aggregate
+        for future in futures.values():
+            if not future.done():
+                future.set_result(MISSING)
+    
+    def __len__(self) -> int:
+        """Number of aggregates known or in flight"""
+        with self._lock:
+            return len(self._futures)
\ No newline at end of file
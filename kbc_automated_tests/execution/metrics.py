@@ -0,0 +1,231 @@
+"""
+Per-query instrumentation of test runs
+
+Every statement sent to Snowflake is recorded with its wall time, Snowflake
+query ID and the tests and table it served, so expensive tests can be found.
+Bytes scanned and server-side execution time can be added afterwards from
+INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from loguru import logger
+
+# Metrics exported in OpenMetrics format: (metric name, field, help)
+OPENMETRICS_GAUGES = (
+    ("kbc_query_duration_seconds", "wall_seconds", "Wall time of the query as seen by the client"),
+    ("kbc_query_execution_seconds", "execution_seconds", "Execution time reported by Snowflake"),
+    ("kbc_query_rows", "rows", "Rows returned by the query"),
+    ("kbc_query_bytes_scanned", "bytes_scanned", "Bytes scanned by the query"),
+)
+
+@dataclass
+class QueryMetric:
+    """Measurements of one query
+    
+    Attributes:
+        table_name: Dev table whose tests the query ran
+        test_names: Tests answered by the query, several for a fused statement
+        relation: Table the query scanned, empty for a query template
+        query_id: Snowflake query ID (sfqid)
+        session_id: Snowflake session that ran the query
+        started_at: Unix time the query was sent
+        wall_seconds: Time until the result was fetched
+        rows: Rows returned
+        status: "success" or "error"
+        error: Error message of a failed query
+        bytes_scanned: Bytes scanned, from the query history
+        execution_seconds: Server-side execution time, from the query history
+    """
+    table_name: str
+    test_names: List[str]
+    relation: str
+    query_id: Optional[str]
+    session_id: Optional[int]
+    started_at: float
+    wall_seconds: float
+    rows: Optional[int]
+    status: str
+    error: Optional[str] = None
+    bytes_scanned: Optional[int] = None
+    execution_seconds: Optional[float] = None
+
+def _label_value(value: Any) -> str:
+    """Escape a value for use as an OpenMetrics label"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class QueryMetrics:
+    """Thread-safe collection of the query metrics of a run"""
+    
+    def __init__(self):
+        """Initialize an empty collection"""
+        self._metrics: List[QueryMetric] = []
+        self._lock = threading.Lock()
+    
+    def record(self, metric: QueryMetric) -> None:
+        """Add the measurements of a query
+        
+        Args:
+            metric: Measurements of the query
+        """
+        with self._lock:
+            self._metrics.append(metric)
+    
+    def __len__(self) -> int:
+        """Number of recorded queries"""
+        with self._lock:
+            return len(self._metrics)
+    
+    def enrich(self, client: Any) -> None:
+        """Add bytes scanned and execution time from the query history
+        
+        Runs one INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION query per
+        session that ran recorded queries.
+        
+        Args:
+            client: Connected SnowflakeClient of the same user
+        """
+        with self._lock:
+            metrics = [metric for metric in self._metrics if metric.query_id and metric.session_id]
+        sessions = {metric.session_id for metric in metrics}
+        
+        history: Dict[str, Dict[str, Any]] = {}
+        for session_id in sessions:
+            query = (
+                "SELECT QUERY_ID, BYTES_SCANNED, EXECUTION_TIME "
+                "FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION("
+                f"SESSION_ID => {int(session_id)}, RESULT_LIMIT => 10000))"
+            )
+            try:
+                for row in client.execute_arrow(query).to_pylist():
+                    history[row["QUERY_ID"]] = row
+            except Exception as e:
+                logger.warning(f"Could not read query history of session {session_id}: {str(e)}")
+        
+        for metric in metrics:
+            row = history.get(metric.query_id)
+            if row is not None:
+                metric.bytes_scanned = row["BYTES_SCANNED"]
+                if row["EXECUTION_TIME"] is not None:
+                    # EXECUTION_TIME is reported in milliseconds
+                    metric.execution_seconds = row["EXECUTION_TIME"] / 1000
+        logger.info(f"Enriched {sum(metric.query_id in history for metric in metrics)} query metrics from query history")
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Get the metrics as a DataFrame, slowest queries first
+        
+        Returns:
+            DataFrame with one row per query and upper-case columns like the results
+        """
+        with self._lock:
+            rows = [asdict(metric) for metric in self._metrics]
+        columns = [name.upper() for name in QueryMetric.__dataclass_fields__]
+        frame = pd.DataFrame(rows)
+        if frame.empty:
+            return pd.DataFrame(columns=columns)
+        frame.columns = [column.upper() for column in frame.columns]
+        frame["TEST_NAMES"] = frame["TEST_NAMES"].str.join(", ")
+        return frame.sort_values("WALL_SECONDS", ascending=False, ignore_index=True)
+    
+    def to_json(self) -> str:
+        """Serialize the metrics as a JSON array"""
+        with self._lock:
+            return json.dumps([asdict(metric) for metric in self._metrics], indent=2)
+    
+    def to_openmetrics(self) -> str:
+        """Serialize the metrics in OpenMetrics text format
+        
+        Every query becomes one sample per gauge, labelled with its query ID,
+        table and tests.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        
+        lines = []
+        for name, attribute, description in OPENMETRICS_GAUGES:
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"# HELP {name} {description}")
+            for metric in metrics:
+                value = getattr(metric, attribute)
+                if value is None:
+                    continue
+                labels = ",".join(
+                    f'{label}="{_label_value(label_value)}"'
+                    for label, label_value in (
+                        ("query_id", metric.query_id or ""),
+                        ("table", metric.table_name),
+                        ("tests", ",".join(metric.test_names)),
+                        ("relation", metric.relation),
+                        ("status", metric.status),
+                    )
+                )
+                lines.append(f"{name}{{{labels}}} {value}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def export(self, directory: str) -> List[str]:
+        """Write the metrics as JSON and OpenMetrics files
+        
+        Args:
+            directory: Directory to write query_metrics.json and query_metrics.prom to
+        
+        Returns:
+            Paths of the written files
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for file_name, content in (("query_metrics.json", self.to_json()),
+                                   ("query_metrics.prom", self.to_openmetrics())):
+            path = os.path.join(directory, file_name)
+            with open(path, "w") as file:
+                file.write(content)
+            paths.append(path)
+        logger.info(f"Exported {len(self)} query metrics to {directory}")
+        return paths
+
+def timed_query(metrics: QueryMetrics, client: Any, query: str, table_name: str,
+                test_names: List[str], relation: str = "", max_rows: Optional[int] = None) -> Any:
+    """Run a query with execute_arrow and record its metrics
+    
+    Args:
+        metrics: Collection to record into
+        client: SnowflakeClient to run the query on
+        query: SQL of the query
+        table_name: Dev table whose tests the query runs
+        test_names: Tests answered by the query
+        relation: Table the query scans, if known
+    
+    Returns:
+        Query result
+    
+    Raises:
+        Exception: Errors of the query are recorded and re-raised
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    rows = None
+    status, error = "success", None
+    try:
+        result = client.execute_arrow(query, max_rows=max_rows)
+        rows = result.num_rows
+        return result
+    except Exception as e:
+        status, error = "error", str(e)
+        raise
+    finally:
+        metrics.record(QueryMetric(
+            table_name=table_name,
+            test_names=list(test_names),
+            relation=relation,
+            query_id=client.last_query_id(),
+            session_id=client.session_id,
+            started_at=started_at,
+            wall_seconds=time.perf_counter() - start,
+            rows=rows,
+            status=status,
+            error=error,
+        ))
\ No newline at end of file
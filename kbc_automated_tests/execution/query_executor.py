@@ -1,91 +1,716 @@
 """
 Query executor for handling query execution and result compilation
 """
-import os
+import json
 import pandas as pd
-from typing import Dict, List
+import pyarrow as pa
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 from loguru import logger
+from snowflake.connector.errors import ProgrammingError
 
 from ..database.snowflake_client import SnowflakeClient
-from ..queries.data_validation_queries import DataValidationQueries
+from ..database.connection_pool import SnowflakeConnectionPool, configure_snowflake_environment
+from ..queries.data_validation_queries import DRILL_DOWN_TESTS, DataValidationQueries
+from ..queries.sampling import SamplingSpec, is_scalable
+from ..queries.query_planner import (
+    BATCH_INDEX, Aggregate, AggregateStatement, PlannedTest, QueryPlanner, literal_value, table_id
+)
+from ..queries.profiling import PROFILE_TEST, plan_profile
+from .row_counts import ROW_COUNT_EXPRESSION, RowCountMetadata
+from .table_columns import TableColumns
+from .schema_diff import load_schema_columns
+from .accuracy import APPROXIMATE_VARIANTS, choose_accuracy
+from .metrics import QueryMetrics, timed_query
+from .memo import MISSING, AggregateMemo
+from .results import concat_results, conform, empty_result, from_rows, label_environment, to_display_frame
+from ..cache import DiskCache
 from ..config.configuration import Configuration
 
 class QueryExecutor:
     """Handles query execution and result compilation"""
     
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, pool: Optional[SnowflakeConnectionPool] = None):
         """Initialize query executor
         
         Args:
             config: Configuration object
+            pool: Shared connection pool, when set queries borrow pooled sessions
+                instead of opening a dedicated connection
         """
         self.config = config
+        self.pool = pool
         
         # Set environment variables for Snowflake connection
-        os.environ['SNOWFLAKE_USER'] = config.get("snowflake", "username")
-        os.environ['SNOWFLAKE_PASSWORD'] = config.get("snowflake", "password")
-        os.environ['SNOWFLAKE_ACCOUNT'] = config.get("snowflake", "account")
-        os.environ['SNOWFLAKE_WAREHOUSE'] = config.get("snowflake", "warehouse")
+        configure_snowflake_environment(config)
         
         # Initialize Snowflake client
-        self.snowflake = SnowflakeClient()
+        self.snowflake = SnowflakeClient(dump_results=bool(config.get("logging", "dump_results", default=False)))
         self.queries = DataValidationQueries()
+        self.planner = QueryPlanner(
+            self.queries,
+            max_aggregates=int(config.get("validation", "max_aggregates_per_statement", default=200))
+        )
+        self.fuse_queries = bool(config.get("validation", "fuse_queries", default=True))
+        self.use_row_count_metadata = bool(config.get("validation", "row_count_metadata", default=True))
+        self.row_counts: Optional[RowCountMetadata] = None
+        self.table_columns = TableColumns()
+        self.metrics = QueryMetrics()
+        self.sampling: Optional[SamplingSpec] = None
+        self.auto_threshold_rows = int(config.get("validation", "accuracy", "auto_threshold_rows", default=100000000))
+        # Drill-down results are streamed and cut off at this many rows
+        self.drill_down_max_rows = int(config.get("validation", "drill_down", "max_rows", default=1000))
         
-    def execute_tests(self, test_params: Dict[str, str], test_name: str) -> pd.DataFrame:
+        # PROD aggregates are cached on disk per table change, see set_baseline_tables
+        self.baseline_cache: Optional[DiskCache] = None
+        if config.get("validation", "baseline_cache", "enabled", default=False):
+            self.baseline_cache = DiskCache(
+                config.get("validation", "baseline_cache", "path", default="cache/prod_baseline.sqlite"),
+                "prod_baseline",
+                max_entries=int(config.get("validation", "baseline_cache", "max_entries", default=10000))
+            )
+        self.baseline_tables: Dict[str, str] = {}
+        self.refresh_baseline = False
+        
+        # Aggregates of small tables computed up front in cross-table batches, see prefetch_aggregates
+        self.max_batch_size = int(config.get("validation", "batching", "max_batch_size", default=1))
+        self.batch_max_rows = int(config.get("validation", "batching", "max_rows", default=1000000))
+        
+        # Every distinct aggregate is computed once per run and shared between tests
+        self.memo = AggregateMemo()
+        
+    @contextmanager
+    def _session(self) -> Iterator[SnowflakeClient]:
+        """Get a Snowflake client to run a query on
+        
+        Yields:
+            A pooled session if a pool is configured, otherwise the dedicated client
+        """
+        if self.pool is None:
+            yield self.snowflake
+        else:
+            with self.pool.connection() as client:
+                yield client
+        
+    def execute_tests(self, test_params: Dict[str, str], test_name: str) -> pa.Table:
         """Execute a test query and return results
         
+        Query templates always read the full tables, also in preview runs: their
+        values (e.g. distinct counts or hashes) cannot be scaled from a sample.
+        
         Args:
             test_params: Parameters for the query
             test_name: Name of the test to execute
             
         Returns:
-            DataFrame containing test results
+            Table containing test results
         """
+        required_columns = self.config.get("validation", "required_columns")
         try:
-            result = self.snowflake.execute_query(
-                self.queries.get_query(test_name),
-                test_params
-            )
+            query = self.queries.render(test_name, test_params)
+            max_rows = self.drill_down_max_rows if test_name in DRILL_DOWN_TESTS else None
+            with self._session() as client:
+                result = timed_query(
+                    self.metrics, client, query, literal_value(test_params["table_name_string"]), [test_name],
+                    max_rows=max_rows
+                )
             
-            # If result is empty, return empty DataFrame with required columns
-            if result.empty:
-                required_columns = self.config.get("validation", "required_columns")
-                return pd.DataFrame(columns=required_columns)
+            # If result is empty, return empty table with required columns
+            if result.num_rows == 0:
+                return empty_result(required_columns)
             
             # Verify result has correct columns
-            required_columns = self.config.get("validation", "required_columns")
-            if list(result.columns) != required_columns:
-                logger.error(f"Test {test_name} returned incorrect columns: {list(result.columns)}")
-                return pd.DataFrame(columns=required_columns)
+            if result.column_names != required_columns:
+                logger.error(f"Test {test_name} returned incorrect columns: {result.column_names}")
+                return empty_result(required_columns)
                 
-            return result
+            return conform(result, required_columns)
             
         except Exception as e:
             logger.error(f"Error executing test {test_name}: {str(e)}")
-            required_columns = self.config.get("validation", "required_columns")
-            return pd.DataFrame(columns=required_columns)
+            return empty_result(required_columns)
+        
+    def load_row_counts(self, storage_tables: List[Dict[str, Any]]) -> None:
+        """Load metadata row counts for every table with one metadata query
+        
+        Row count aggregates of fused tests are then answered from metadata,
+        falling back to COUNT(*) where the count is missing or stale.
+        
+        Args:
+            storage_tables: Storage API table dictionaries of the run, used to
+                detect stale counts
+        """
+        if not self.use_row_count_metadata:
+            return
+            
+        row_counts = RowCountMetadata()
+        try:
+            with self._session() as client:
+                row_counts.load(client)
+            row_counts.add_storage_tables(storage_tables)
+            self.row_counts = row_counts
+        except Exception as e:
+            logger.warning(f"Metadata row counts unavailable, counting rows instead: {str(e)}")
+            self.row_counts = None
+            
+    def profile_relations(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> List[str]:
+        """List the tables whose columns profile_table tests need
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) for one table
+            
+        Returns:
+            Quoted table references
+        """
+        return [
+            test_params[name]
+            for test_name, test_params in table_tests if test_name == PROFILE_TEST
+            for name in ("dev_table", "prod_table")
+        ]
+        
+    def load_table_columns(self, relations: List[str]) -> None:
+        """Load the columns of tables with one INFORMATION_SCHEMA query
+        
+        Tables already loaded by the schema diff are skipped.
+        
+        Args:
+            relations: Quoted table references, e.g. from profile_relations
+        """
+        relations = [relation for relation in relations if self.table_columns.get(relation) is None]
+        if not relations:
+            return
+        try:
+            with self._session() as client:
+                self.table_columns.load(client, relations)
+        except Exception as e:
+            logger.error(f"Could not load table columns: {str(e)}")
+            
+    def load_schema_columns(self, schemas: List[str]) -> pd.DataFrame:
+        """Read the columns of every table in the given schemas, one query per schema
+        
+        The columns are also kept for profile_table tests.
+        
+        Args:
+            schemas: Schema (bucket) names
+            
+        Returns:
+            DataFrame of INFORMATION_SCHEMA.COLUMNS rows, see execution.schema_diff
+        """
+        with self._session() as client:
+            columns = load_schema_columns(client, schemas)
+        self.table_columns.add(columns.to_dict("records"))
+        return columns
+        
+    def placeholders(self, test_name: str) -> FrozenSet[str]:
+        """Get the parameters the template of a test uses
+        
+        Args:
+            test_name: Name of the test
+            
+        Returns:
+            Placeholder names, empty for unknown tests
+        """
+        if test_name == PROFILE_TEST:
+            return frozenset({"dev_table", "prod_table"})
+        if test_name not in self.queries.queries:
+            return frozenset()
+        return self.queries.placeholders(test_name)
+        
+    def plan_profile(self, test_params: Dict[str, str]) -> List[PlannedTest]:
+        """Expand a profile_table test into fused per-column aggregates
+        
+        Args:
+            test_params: Parameters of the test
+            
+        Returns:
+            Planned tests, empty if the columns of either table are unknown
+        """
+        dev_columns = self.table_columns.get(test_params["dev_table"])
+        prod_columns = self.table_columns.get(test_params["prod_table"])
+        if dev_columns is None or prod_columns is None:
+            logger.error(f"Test {PROFILE_TEST} for table {literal_value(test_params['table_name_string'])} has no column list")
+            return []
+        return plan_profile(test_params, dev_columns, prod_columns)
+        
+    def _resolve_from_metadata(self, aggregates: List[Aggregate], values: Dict[Aggregate, Any]) -> List[Aggregate]:
+        """Answer row count aggregates from metadata
+        
+        Args:
+            aggregates: Aggregates over one table
+            values: Computed values, updated with the metadata-backed ones
+            
+        Returns:
+            Aggregates that still have to be computed by the warehouse
+        """
+        if self.row_counts is None:
+            return aggregates
+            
+        remaining = []
+        for aggregate in aggregates:
+            count = None
+            if aggregate.expression == ROW_COUNT_EXPRESSION:
+                count = self.row_counts.get(aggregate.relation)
+            if count is None:
+                remaining.append(aggregate)
+            else:
+                values[aggregate] = count
+        return remaining
+        
+    def set_sampling(self, sampling: Optional[SamplingSpec]) -> None:
+        """Switch between full runs and preview runs on a sample of every table
+        
+        Sampled values never enter the baseline cache.
+        
+        Args:
+            sampling: Sampling settings, None for a full run
+        """
+        self.sampling = sampling
+        
+    def prod_relations(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> List[str]:
+        """List the tables the PROD side of fused tests reads
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) for one table
+            
+        Returns:
+            Quoted table references
+        """
+        relations = [
+            test_params["prod_table"] for test_name, test_params in table_tests if test_name == PROFILE_TEST
+        ]
+        if not self.fuse_queries:
+            return relations
+        return relations + [
+            self.planner.plan_test(test_name, test_params).aggregates["PROD"].relation
+            for test_name, test_params in table_tests
+            if self.planner.can_fuse(test_name)
+        ]
+        
+    def set_baseline_tables(self, change_dates: Dict[str, str], refresh: bool = False) -> None:
+        """Set the production tables whose aggregates may be served from the baseline cache
+        
+        Args:
+            change_dates: Dictionary of quoted table reference to its lastChangeDate
+            refresh: Recompute every aggregate and overwrite the cached values
+        """
+        self.baseline_tables = dict(change_dates)
+        self.refresh_baseline = refresh
+        
+    def _baseline_key(self, aggregate: Aggregate) -> Optional[str]:
+        """Cache key of a PROD aggregate, None if the table is not cacheable"""
+        change_date = self.baseline_tables.get(aggregate.relation)
+        if self.baseline_cache is None or change_date is None:
+            return None
+        return json.dumps([table_id(aggregate.relation), aggregate.expression, change_date])
+        
+    def _resolve_from_baseline(self, aggregates: List[Aggregate], values: Dict[Aggregate, Any]) -> List[Aggregate]:
+        """Answer PROD aggregates from the baseline cache
+        
+        Args:
+            aggregates: Aggregates over one table
+            values: Computed values, updated with the cached ones
+            
+        Returns:
+            Aggregates that still have to be computed by the warehouse
+        """
+        keys = {aggregate: self._baseline_key(aggregate) for aggregate in aggregates}
+        if self.refresh_baseline or self.sampling is not None or not any(keys.values()):
+            return aggregates
+            
+        try:
+            cached = self.baseline_cache.get_many(key for key in keys.values() if key)
+        except Exception as e:
+            logger.warning(f"Baseline cache unavailable: {str(e)}")
+            return aggregates
+            
+        remaining = []
+        for aggregate, key in keys.items():
+            if key in cached:
+                values[aggregate] = cached[key]
+            else:
+                remaining.append(aggregate)
+        return remaining
+        
+    def _store_baseline(self, aggregates: List[Aggregate], values: Dict[Aggregate, Any]) -> None:
+        """Store computed PROD aggregates in the baseline cache"""
+        items = {}
+        for aggregate in aggregates:
+            key = self._baseline_key(aggregate)
+            if key is not None and aggregate in values:
+                items[key] = values[aggregate]
+        try:
+            self.baseline_cache.set_many(items)
+        except Exception as e:
+            logger.warning(f"Could not update baseline cache: {str(e)}")
+            
+    def _sample_clause(self, aggregate: Aggregate) -> str:
+        """SAMPLE clause an aggregate is computed with
         
-    def compile_results(self, results: List[pd.DataFrame]) -> pd.DataFrame:
+        Preview runs read only counts and sums from a sample, they are scaled
+        up to estimates of the full table. Other aggregates such as distinct
+        counts cannot be estimated, and DEV and PROD samples contain different
+        rows, so they are computed on the full tables.
+        
+        Args:
+            aggregate: Aggregate to compute
+            
+        Returns:
+            SAMPLE clause, empty if the aggregate reads the full table
+        """
+        if self.sampling is None or not is_scalable(aggregate.expression):
+            return ""
+        return self.sampling.clause
+        
+    def _split_by_sampling(self, aggregates: List[Aggregate]) -> Dict[str, List[Aggregate]]:
+        """Group aggregates over one table by the SAMPLE clause they are computed with"""
+        groups: Dict[str, List[Aggregate]] = {}
+        for aggregate in aggregates:
+            groups.setdefault(self._sample_clause(aggregate), []).append(aggregate)
+        return groups
+        
+    def _execute_statement(self, relation: str, aggregates: List[Aggregate], sample_clause: str,
+                           planned_tests: List[PlannedTest], values: Dict[Aggregate, Any]) -> None:
+        """Compute aggregates over one table with a single statement
+        
+        One invalid aggregate (e.g. SUM over a text column or a renamed column)
+        fails the whole statement. Statements rejected by Snowflake are split in
+        halves and retried, so only the tests using the invalid aggregate are
+        dropped instead of every test of the table.
+        
+        Args:
+            relation: Quoted table reference
+            aggregates: Aggregates to compute
+            sample_clause: SAMPLE clause shared by the aggregates, see _sample_clause
+            planned_tests: Tests the aggregates belong to
+            values: Computed values, updated with the results of the statement
+        """
+        statement = self.planner.build_statement(relation, aggregates, sample_clause)
+        try:
+            with self._session() as client:
+                result = timed_query(
+                    self.metrics, client, statement.sql,
+                    planned_tests[0].header["TABLE_NAME"], self._test_names(planned_tests, statement.aliases), relation
+                )
+            if result.num_rows == 0:
+                logger.error(f"Fused statement for {statement.relation} returned no rows")
+                return
+                
+            self._read_values(statement, result.slice(0, 1).to_pylist()[0], values)
+            
+        except ProgrammingError as e:
+            if len(aggregates) == 1:
+                logger.error(
+                    f"Error computing {aggregates[0].expression} on {statement.relation} "
+                    f"for {self._test_names(planned_tests, aggregates)}: {str(e)}"
+                )
+                return
+            logger.warning(
+                f"Fused statement for {statement.relation} failed, retrying its "
+                f"{len(aggregates)} aggregates in halves: {str(e)}"
+            )
+            middle = len(aggregates) // 2
+            self._execute_statement(relation, aggregates[:middle], sample_clause, planned_tests, values)
+            self._execute_statement(relation, aggregates[middle:], sample_clause, planned_tests, values)
+                    
+        except Exception as e:
+            logger.error(f"Error executing fused statement for {statement.relation}: {str(e)}")
+            
+    def _test_names(self, planned_tests: List[PlannedTest], aggregates: Iterable[Aggregate]) -> List[str]:
+        """List the distinct names of the tests using any of the aggregates"""
+        aggregates = set(aggregates)
+        return list(dict.fromkeys(
+            planned.test_name for planned in planned_tests
+            if any(aggregate in aggregates for aggregate in planned.aggregates.values())
+        ))
+        
+    def _read_values(self, statement: AggregateStatement, row: Dict[str, Any], values: Dict[Aggregate, Any]) -> None:
+        """Take the aggregate values of a statement from its result row
+        
+        Args:
+            statement: Statement that produced the row
+            row: Result row keyed by alias
+            values: Computed values, updated with the values of the row
+        """
+        for aggregate, alias in statement.aliases.items():
+            values[aggregate] = row[alias]
+            if statement.sample_clause and row[alias] is not None:
+                # Estimate the full-table count or sum from the sample
+                values[aggregate] = float(row[alias]) * self.sampling.scale
+                
+    def _memo_key(self, aggregate: Aggregate) -> Tuple[str, str, str]:
+        """Key of an aggregate in the run memo
+        
+        The table reference identifies the environment, the SAMPLE clause
+        keeps sampled values apart from full-table values.
+        """
+        return (aggregate.relation, aggregate.expression, self._sample_clause(aggregate))
+        
+    def _execute_batch(self, statements: List[AggregateStatement], planned_tests: List[PlannedTest],
+                       values: Dict[Aggregate, Any]) -> None:
+        """Compute the aggregates of several tables with one UNION ALL statement
+        
+        Args:
+            statements: Aggregate statements over different tables
+            planned_tests: Tests the aggregates belong to
+            values: Computed values, updated with the results of the batch
+        """
+        aggregates = [aggregate for statement in statements for aggregate in statement.aliases]
+        table_names = list(dict.fromkeys(
+            planned.header["TABLE_NAME"] for planned in planned_tests
+            if any(aggregate in statement.aliases for statement in statements for aggregate in planned.aggregates.values())
+        ))
+        try:
+            with self._session() as client:
+                result = timed_query(
+                    self.metrics, client, self.planner.build_batch(statements), ", ".join(table_names),
+                    self._test_names(planned_tests, aggregates), ", ".join(statement.relation for statement in statements)
+                )
+            for row in result.to_pylist():
+                self._read_values(statements[int(row[BATCH_INDEX])], row, values)
+                
+        except Exception as e:
+            # The tables of the batch are scanned again by their own fused statements
+            logger.warning(f"Error executing batch of {len(statements)} statements: {str(e)}")
+            
+    def prefetch_aggregates(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> None:
+        """Compute the fused aggregates of small tables across the whole run in batches
+        
+        For many small tables the round trip of each statement costs more than
+        the scan, so the aggregate statements of tables with at most
+        validation.batching.max_rows rows are combined into UNION ALL
+        statements of up to validation.batching.max_batch_size tables. The
+        fused job of each table then picks up its values from the run memo
+        instead of querying. Tables of failed batches fall back to their own
+        statements.
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) of every table of the run
+        """
+        if self.max_batch_size < 2 or self.row_counts is None:
+            return
+            
+        planned_tests, _ = self.plan_tests(table_tests)
+        values: Dict[Aggregate, Any] = {}
+        statements = []
+        for relation, aggregates in self.planner.group_aggregates(planned_tests).items():
+            row_count = self.row_counts.estimate(relation)
+            if row_count is None or row_count > self.batch_max_rows:
+                continue
+            aggregates = self._resolve_from_metadata(aggregates, values)
+            aggregates = self._resolve_from_baseline(aggregates, values)
+            for sample_clause, group in self._split_by_sampling(aggregates).items():
+                for chunk in self.planner.chunk_aggregates(group):
+                    statements.append(self.planner.build_statement(relation, chunk, sample_clause))
+        if len(statements) < 2:
+            return
+            
+        computed: Dict[Aggregate, Any] = {}
+        for start in range(0, len(statements), self.max_batch_size):
+            batch = statements[start:start + self.max_batch_size]
+            # A single leftover statement runs with the fused job of its table
+            if len(batch) > 1:
+                self._execute_batch(batch, planned_tests, computed)
+        for statement in statements:
+            if self.sampling is None and statement.relation in self.baseline_tables:
+                self._store_baseline(list(statement.aliases), computed)
+                
+        self.memo.add({self._memo_key(aggregate): value for aggregate, value in computed.items()})
+        logger.info(f"Prefetched {len(computed)} aggregates of {len(statements)} statements in batches")
+            
+    def execute_planned_tests(self, planned_tests: List[PlannedTest]) -> pa.Table:
+        """Execute fused tests with one aggregate statement per table
+        
+        Row counts are answered from metadata when available, so a table whose
+        aggregates are all row counts is not scanned at all. PROD aggregates of
+        unchanged tables come from the baseline cache. Every distinct aggregate
+        is computed once per run: values already computed for other tests or
+        tables (including the cross-table batches of prefetch_aggregates) come
+        from the run memo, and aggregates another job is computing right now are
+        awaited instead of computed again. Tables with more than
+        max_aggregates_per_statement aggregates are scanned in chunks. A
+        statement failing on an invalid aggregate is split until only the tests
+        using that aggregate are dropped.
+        
+        Args:
+            planned_tests: Tests planned by the QueryPlanner
+            
+        Returns:
+            Table containing test results
+        """
+        required_columns = self.config.get("validation", "required_columns")
+        values: Dict[Aggregate, Any] = {}
+        waiting = {}
+        
+        for relation, aggregates in self.planner.group_aggregates(planned_tests).items():
+            aggregates = self._resolve_from_metadata(aggregates, values)
+            keys = {aggregate: self._memo_key(aggregate) for aggregate in aggregates}
+            aggregate_of_key = {key: aggregate for aggregate, key in keys.items()}
+            known, in_flight, owned = self.memo.claim(keys.values())
+            values.update({aggregate_of_key[key]: value for key, value in known.items()})
+            waiting.update({aggregate_of_key[key]: future for key, future in in_flight.items()})
+            
+            aggregates = [aggregate_of_key[key] for key in owned]
+            try:
+                remaining = self._resolve_from_baseline(aggregates, values)
+                if remaining:
+                    for sample_clause, group in self._split_by_sampling(remaining).items():
+                        for chunk in self.planner.chunk_aggregates(group):
+                            self._execute_statement(relation, chunk, sample_clause, planned_tests, values)
+                    if self.sampling is None and relation in self.baseline_tables:
+                        self._store_baseline(remaining, values)
+            finally:
+                # Publish before waiting on other jobs, so jobs never wait on each other in a cycle
+                self.memo.publish({keys[aggregate]: values.get(aggregate, MISSING) for aggregate in aggregates})
+                
+        for aggregate, future in waiting.items():
+            value = future.result()
+            if value is not MISSING:
+                values[aggregate] = value
+                
+        # Only tests computed on a sample are labelled as sampled
+        sampled = [
+            any(self._sample_clause(aggregate) for aggregate in planned.aggregates.values())
+            for planned in planned_tests
+        ]
+        result = from_rows(self.planner.fan_out(
+            [planned for planned, is_sampled in zip(planned_tests, sampled) if not is_sampled], values
+        ), required_columns)
+        if any(sampled):
+            sampled_result = from_rows(self.planner.fan_out(
+                [planned for planned, is_sampled in zip(planned_tests, sampled) if is_sampled], values
+            ), required_columns)
+            result = concat_results([result, label_environment(sampled_result, self.sampling.label)], required_columns)
+        return result
+        
+    def resolve_test(self, test_name: str, test_params: Dict[str, str]) -> str:
+        """Pick the query template a test runs with, applying its accuracy mode
+        
+        Args:
+            test_name: Name of the test
+            test_params: Parameters of the test, PARAMETER_2 holds the accuracy
+                mode of tests with an approximate variant
+            
+        Returns:
+            Name of the template to run
+        """
+        variant = APPROXIMATE_VARIANTS.get(test_name)
+        if variant is None:
+            return test_name
+            
+        row_count = None
+        if self.row_counts is not None:
+            estimates = [
+                self.row_counts.estimate(test_params[name]) for name in ("dev_table", "prod_table")
+            ]
+            if all(estimate is not None for estimate in estimates):
+                row_count = max(estimates)
+                
+        mode = literal_value(test_params["parameter_2_string"])
+        try:
+            accuracy = choose_accuracy(mode, row_count, self.auto_threshold_rows)
+        except ValueError as e:
+            logger.warning(f"{str(e)} for {test_name}, running it exactly")
+            accuracy = "exact"
+        return variant if accuracy == "approximate" else test_name
+        
+    def split_drill_down(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> Tuple[List[Tuple[str, Dict[str, str]]], List[Tuple[str, Dict[str, str]]]]:
+        """Separate drill-down tests from the tests they depend on
+        
+        Drill-down tests (see DRILL_DOWN_TESTS) only run once the other tests
+        of their table found a difference. They are dropped from sampled runs,
+        sampling both tables independently would report keys missing by chance.
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) for one table
+            
+        Returns:
+            Tuple of the regular tests and the drill-down tests
+        """
+        regular = [test for test in table_tests if test[0] not in DRILL_DOWN_TESTS]
+        drill_down = [test for test in table_tests if test[0] in DRILL_DOWN_TESTS]
+        if drill_down and self.sampling is not None:
+            logger.info(f"Skipping {len(drill_down)} drill-down tests in sampled run")
+            drill_down = []
+        return regular, drill_down
+        
+    def plan_tests(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> Tuple[List[PlannedTest], List[Tuple[str, Dict[str, str]]]]:
+        """Plan the tests that can be fused, applying their accuracy mode
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params)
+            
+        Returns:
+            Tuple of the planned tests and the (test_name, test_params) of the
+            tests running their query template
+        """
+        planned_tests = []
+        unfused = []
+        for test_name, test_params in table_tests:
+            if test_name == PROFILE_TEST:
+                # Profiles are defined by their aggregates and are always fused
+                planned_tests.extend(self.plan_profile(test_params))
+                continue
+            test_name = self.resolve_test(test_name, test_params)
+            if self.fuse_queries and self.planner.can_fuse(test_name):
+                planned_tests.append(self.planner.plan_test(test_name, test_params))
+            else:
+                unfused.append((test_name, test_params))
+        return planned_tests, unfused
+        
+    def build_jobs(self, table_tests: List[Tuple[str, Dict[str, str]]]) -> List[Callable[[], pa.Table]]:
+        """Turn the tests of a table into independent execution jobs
+        
+        Tests with an aggregate form are fused into a single job scanning each
+        table once, the remaining tests run their query template one by one.
+        
+        Args:
+            table_tests: List of tuples (test_name, test_params) for one table
+            
+        Returns:
+            List of callables, each returning a result table
+        """
+        planned_tests, unfused = self.plan_tests(table_tests)
+        jobs = [partial(self.execute_tests, test_params, test_name) for test_name, test_params in unfused]
+        if planned_tests:
+            jobs.insert(0, partial(self.execute_planned_tests, planned_tests))
+        return jobs
+        
+    def enrich_metrics(self) -> None:
+        """Add bytes scanned and execution time of the recorded queries from the query history"""
+        try:
+            with self._session() as client:
+                self.metrics.enrich(client)
+        except Exception as e:
+            logger.warning(f"Could not enrich query metrics: {str(e)}")
+            
+    def compile_results(self, results: List[pa.Table]) -> pd.DataFrame:
         """Compile multiple test results into a single DataFrame
         
+        The tables are concatenated without copying and converted to pandas once.
+        
         Args:
-            results: List of result DataFrames
+            results: List of result tables
             
         Returns:
             Combined DataFrame with all results
         """
-        if not results:
-            required_columns = self.config.get("validation", "required_columns")
-            return pd.DataFrame(columns=required_columns)
-            
-        final_results = pd.concat(results, ignore_index=True)
+        required_columns = self.config.get("validation", "required_columns")
+        final_results = to_display_frame(concat_results(results, required_columns))
         logger.info(f"Combined {len(results)} test results into final DataFrame")
         return final_results
         
+    def start_run(self) -> None:
+        """Reset the query metrics and the memo of computed aggregates for a new run"""
+        self.metrics = QueryMetrics()
+        self.memo.reset()
+        
     def connect(self):
-        """Connect to Snowflake"""
-        self.snowflake.connect()
+        """Connect to Snowflake, pooled sessions are opened on demand instead"""
+        if self.pool is None:
+            self.snowflake.connect()
         
     def disconnect(self):
-        """Disconnect from Snowflake"""
-        self.snowflake.disconnect() 
\ No newline at end of file
+        """Disconnect from Snowflake, pooled sessions stay open for reuse"""
+        if self.pool is None:
+            self.snowflake.disconnect() 
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Arrow representation of test results
+
+Results stay pyarrow Tables from the moment they are fetched from Snowflake
+until they are shown, concatenating them only references the existing
+buffers. A pandas DataFrame is built once, at the display boundary.
+"""
+from typing import Any, Dict, List
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Columns shown as pandas categoricals, they repeat for every row of a test
+CATEGORICAL_COLUMNS = ["TABLE_NAME", "TEST_NAME", "ENVIRONMENT"]
+
+def result_schema(columns: List[str]) -> pa.Schema:
+    """Build the Arrow schema of test results
+    
+    Args:
+        columns: Result columns, in order
+    
+    Returns:
+        Schema with string columns and a float64 VALUE column
+    """
+    return pa.schema([
+        pa.field(column, pa.float64() if column == "VALUE" else pa.string())
+        for column in columns
+    ])
+
+def empty_result(columns: List[str]) -> pa.Table:
+    """Create a result table without rows
+    
+    Args:
+        columns: Result columns, in order
+    
+    Returns:
+        Empty table with the result schema
+    """
+    return result_schema(columns).empty_table()
+
+def conform(table: pa.Table, columns: List[str]) -> pa.Table:
+    """Select and cast the columns of a fetched result to the result schema
+    
+    Args:
+        table: Result fetched from Snowflake
+        columns: Result columns, in order
+    
+    Returns:
+        Table with the result schema
+    
+    Raises:
+        ValueError: If the table does not have exactly the result columns
+        pyarrow.ArrowInvalid: If a column cannot be cast, e.g. a non-numeric VALUE
+    """
+    if table.column_names != columns:
+        raise ValueError(f"Result has incorrect columns: {table.column_names}")
+    return table.cast(result_schema(columns), safe=False)
+
+def from_rows(rows: List[Dict[str, Any]], columns: List[str]) -> pa.Table:
+    """Build a result table from row dictionaries
+    
+    Args:
+        rows: Result rows keyed by column
+        columns: Result columns, in order
+    
+    Returns:
+        Table with the result schema
+    """
+    rows = [
+        dict(row, VALUE=None if row.get("VALUE") is None else float(row["VALUE"]))
+        for row in rows
+    ]
+    return pa.Table.from_pylist(rows, schema=result_schema(columns))
+
+def label_environment(table: pa.Table, suffix: str) -> pa.Table:
+    """Append a label to the ENVIRONMENT of every result row
+    
+    Args:
+        table: Result table
+        suffix: Text to append, e.g. " (SAMPLE 1%)"
+        
+    Returns:
+        Table with relabelled ENVIRONMENT column
+    """
+    index = table.column_names.index("ENVIRONMENT")
+    labelled = pc.binary_join_element_wise(table["ENVIRONMENT"], pa.scalar(suffix), "")
+    return table.set_column(index, "ENVIRONMENT", labelled)
+    
+def has_differences(table: pa.Table) -> bool:
+    """Check whether any test in a result table differs between DEV and PROD
+    
+    Rows are matched on every column except ENVIRONMENT and VALUE, so a row
+    present in only one environment counts as a difference as well.
+    
+    Args:
+        table: Result table, ENVIRONMENT may carry a label such as " (SAMPLE 1%)"
+        
+    Returns:
+        bool: True if at least one test has different DEV and PROD values
+    """
+    key_columns = [column for column in table.column_names if column not in ("ENVIRONMENT", "VALUE")]
+    values: Dict[tuple, Dict[str, Any]] = {}
+    for row in table.to_pylist():
+        environment = "DEV" if row["ENVIRONMENT"].startswith("DEV") else "PROD"
+        values.setdefault(tuple(row[column] for column in key_columns), {})[environment] = row["VALUE"]
+    return any(
+        set(by_environment) != {"DEV", "PROD"} or by_environment["DEV"] != by_environment["PROD"]
+        for by_environment in values.values()
+    )
+    
+def concat_results(tables: List[pa.Table], columns: List[str]) -> pa.Table:
+    """Concatenate result tables without copying their buffers
+    
+    Args:
+        tables: Result tables with the result schema
+        columns: Result columns, in order
+    
+    Returns:
+        Combined table
+    """
+    if not tables:
+        return empty_result(columns)
+    return pa.concat_tables(tables)
+
+def to_display_frame(table: pa.Table) -> pd.DataFrame:
+    """Convert results to a pandas DataFrame for display
+    
+    Args:
+        table: Result table
+    
+    Returns:
+        DataFrame with categorical TABLE_NAME, TEST_NAME and ENVIRONMENT columns
+    """
+    categories = [column for column in CATEGORICAL_COLUMNS if column in table.column_names]
+    return table.to_pandas(categories=categories)
\ No newline at end of file
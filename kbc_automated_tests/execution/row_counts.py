@@ -0,0 +1,105 @@
+"""
+Row counts from table metadata, used instead of scanning tables with COUNT(*)
+"""
+import threading
+from typing import Any, Dict, Iterable, Optional
+from loguru import logger
+
+from ..database.snowflake_client import SnowflakeClient
+
+# Aggregate expression that metadata row counts can stand in for
+ROW_COUNT_EXPRESSION = "COUNT(*)"
+
+def relation_name(schema: str, table: str) -> str:
+    """Build the quoted table reference used in queries
+    
+    Args:
+        schema: Schema (bucket) name
+        table: Table name
+    
+    Returns:
+        Quoted reference, e.g. "out.c-bucket"."TABLE"
+    """
+    return f'"{schema}"."{table}"'
+
+class RowCountMetadata:
+    """Row counts of every table in the workspace database from one metadata query
+    
+    Counts come from SHOW TABLES, which is answered from Snowflake metadata
+    without resuming a warehouse. A count is treated as stale, and the caller
+    falls back to COUNT(*), when Snowflake reports no count for the table
+    (e.g. views or external tables) or when the Storage API reports a
+    different rowsCount for the table.
+    """
+    
+    def __init__(self):
+        """Initialize empty row count metadata"""
+        self._counts: Dict[str, int] = {}
+        self._storage_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, client: SnowflakeClient) -> None:
+        """Load row counts of all tables in the current database
+        
+        Args:
+            client: Connected Snowflake client
+        """
+        records = client.fetch_records("SHOW TABLES IN DATABASE")
+        counts = {}
+        for record in records:
+            rows = record.get("rows")
+            if rows is None or record.get("kind", "TABLE") not in ("TABLE", "TRANSIENT", "TEMPORARY"):
+                continue
+            counts[relation_name(record["schema_name"], record["name"])] = int(rows)
+        
+        with self._lock:
+            self._counts = counts
+        logger.info(f"Loaded metadata row counts for {len(counts)} tables")
+    
+    def add_storage_tables(self, tables: Iterable[Dict[str, Any]]) -> None:
+        """Record the Storage API row counts of tables for the staleness check
+        
+        Args:
+            tables: Table dictionaries from the Storage API
+        """
+        with self._lock:
+            for table in tables:
+                if table.get("rowsCount") is None:
+                    continue
+                bucket_id, table_name = table["id"].rsplit(".", 1)
+                self._storage_counts[relation_name(bucket_id, table_name)] = int(table["rowsCount"])
+    
+    def get(self, relation: str) -> Optional[int]:
+        """Get the row count of a table if it can be trusted
+        
+        Args:
+            relation: Quoted table reference
+        
+        Returns:
+            Row count, or None if it is missing or stale
+        """
+        with self._lock:
+            count = self._counts.get(relation)
+            storage_count = self._storage_counts.get(relation)
+        
+        if count is None:
+            return None
+        if storage_count is not None and storage_count != count:
+            logger.info(f"Metadata row count of {relation} is stale ({count} vs {storage_count} in Storage)")
+            return None
+        return count
+    
+    def estimate(self, relation: str) -> Optional[int]:
+        """Get the approximate size of a table, even if its count is stale
+        
+        Args:
+            relation: Quoted table reference
+        
+        Returns:
+            Metadata or Storage API row count, None if neither is known
+        """
+        with self._lock:
+            count = self._counts.get(relation)
+            if count is None:
+                count = self._storage_counts.get(relation)
+        return count
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Branch-wide schema diff of the DEV tables against their PROD counterparts
+
+The columns of every DEV and PROD bucket of the branch are read from
+INFORMATION_SCHEMA.COLUMNS with one query per schema and compared in memory
+with pandas. Added, dropped and retyped columns are reported as check_schema
+rows in the standard result format, and tests that reference a missing table
+or column are skipped before any data query runs.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+
+from ..database.snowflake_client import SnowflakeClient
+from ..queries.query_planner import HEADER_COLUMNS, literal_value
+from .results import from_rows
+from .row_counts import relation_name
+
+SCHEMA_TEST = "check_schema"
+
+# Columns read from INFORMATION_SCHEMA.COLUMNS
+SCHEMA_COLUMNS = [
+    "TABLE_SCHEMA",
+    "TABLE_NAME",
+    "COLUMN_NAME",
+    "DATA_TYPE",
+    "NUMERIC_PRECISION",
+    "NUMERIC_SCALE",
+    "IS_NULLABLE",
+]
+
+def schema_columns_query(schema: str) -> str:
+    """Build the query listing the columns of every table in a schema
+    
+    Args:
+        schema: Schema (bucket) name
+    
+    Returns:
+        SQL query
+    """
+    escaped = schema.replace("'", "''")
+    return (
+        f"SELECT {', '.join(SCHEMA_COLUMNS)}\n"
+        "FROM INFORMATION_SCHEMA.COLUMNS\n"
+        f"WHERE TABLE_SCHEMA = '{escaped}'\n"
+        "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+    )
+
+def load_schema_columns(client: SnowflakeClient, schemas: Iterable[str]) -> pd.DataFrame:
+    """Read the columns of all tables of the given schemas, one query per schema
+    
+    Args:
+        client: Connected Snowflake client
+        schemas: Schema (bucket) names
+    
+    Returns:
+        DataFrame with the SCHEMA_COLUMNS columns
+    """
+    frames = []
+    for schema in sorted(set(schemas)):
+        result = client.execute_arrow(schema_columns_query(schema))
+        if result.num_rows > 0:
+            frames.append(result.select(SCHEMA_COLUMNS).to_pandas())
+    if not frames:
+        return pd.DataFrame(columns=SCHEMA_COLUMNS)
+    columns = pd.concat(frames, ignore_index=True)
+    logger.info(f"Loaded {len(columns)} columns of {len(frames)} schemas")
+    return columns
+
+def column_definitions(columns: pd.DataFrame) -> pd.Series:
+    """Describe the type and nullability of every column, e.g. NUMBER(38,0) NOT NULL
+    
+    Args:
+        columns: DataFrame with the SCHEMA_COLUMNS columns
+    
+    Returns:
+        Series of definitions aligned with columns
+    """
+    precision = columns["NUMERIC_PRECISION"].astype("Int64").astype("string")
+    scale = columns["NUMERIC_SCALE"].astype("Int64").astype("string")
+    definitions = columns["DATA_TYPE"].astype("string")
+    definitions = definitions.where(precision.isna(), definitions + "(" + precision + "," + scale.fillna("0") + ")")
+    return definitions.where(columns["IS_NULLABLE"] != "NO", definitions + " NOT NULL")
+
+def diff_schemas(columns: pd.DataFrame, prod_schemas: Dict[str, str], dev_tables: Iterable[str]) -> pd.DataFrame:
+    """Compare the columns of DEV tables with their PROD counterparts
+    
+    Args:
+        columns: Columns of the DEV and PROD schemas, see load_schema_columns
+        prod_schemas: Dictionary of DEV schema to its PROD schema
+        dev_tables: Quoted references of the DEV tables to compare
+    
+    Returns:
+        DataFrame with one row per change: DEV_SCHEMA, TABLE_NAME, COLUMN_NAME,
+        CHANGE (table_added, added, dropped or retyped), DEV_DEFINITION and PROD_DEFINITION
+    """
+    columns = columns.assign(DEFINITION=column_definitions(columns))
+    columns = columns.assign(RELATION='"' + columns["TABLE_SCHEMA"] + '"."' + columns["TABLE_NAME"] + '"')
+    keys = ["PROD_SCHEMA", "TABLE_NAME", "COLUMN_NAME"]
+    
+    dev = columns[columns["RELATION"].isin(set(dev_tables))]
+    dev = dev.assign(PROD_SCHEMA=dev["TABLE_SCHEMA"].map(prod_schemas))
+    prod = columns[columns["TABLE_SCHEMA"].isin(set(prod_schemas.values()))]
+    prod = prod.rename(columns={"TABLE_SCHEMA": "PROD_SCHEMA"})
+    # Only tables rebuilt in the branch are compared, PROD tables without a DEV copy are expected
+    prod = prod.merge(dev[["PROD_SCHEMA", "TABLE_NAME"]].drop_duplicates(), on=["PROD_SCHEMA", "TABLE_NAME"])
+    
+    merged = dev[["TABLE_SCHEMA"] + keys + ["DEFINITION"]].merge(
+        prod[keys + ["DEFINITION"]], on=keys, how="outer", suffixes=("_DEV", "_PROD"), indicator=True
+    )
+    merged["DEV_SCHEMA"] = merged.groupby(["PROD_SCHEMA", "TABLE_NAME"])["TABLE_SCHEMA"].transform("first")
+    
+    prod_tables = prod[["PROD_SCHEMA", "TABLE_NAME"]].drop_duplicates()
+    new_table = ~merged.set_index(["PROD_SCHEMA", "TABLE_NAME"]).index.isin(
+        prod_tables.set_index(["PROD_SCHEMA", "TABLE_NAME"]).index
+    )
+    # A table missing in PROD is reported once instead of column by column
+    first_of_new_table = new_table & ~merged.duplicated(["DEV_SCHEMA", "TABLE_NAME"]).to_numpy()
+    change = pd.Series(None, index=merged.index, dtype="object")
+    change[(merged["_merge"] == "left_only") & ~new_table] = "added"
+    change[merged["_merge"] == "right_only"] = "dropped"
+    change[(merged["_merge"] == "both") & (merged["DEFINITION_DEV"] != merged["DEFINITION_PROD"])] = "retyped"
+    change[first_of_new_table] = "table_added"
+    merged["CHANGE"] = change
+    merged.loc[first_of_new_table, ["COLUMN_NAME", "DEFINITION_DEV"]] = ["n/a", None]
+    
+    changes = merged[merged["CHANGE"].notna()]
+    return changes.rename(columns={"DEFINITION_DEV": "DEV_DEFINITION", "DEFINITION_PROD": "PROD_DEFINITION"})[
+        ["DEV_SCHEMA", "TABLE_NAME", "COLUMN_NAME", "CHANGE", "DEV_DEFINITION", "PROD_DEFINITION"]
+    ]
+
+def schema_results(changes: pd.DataFrame, columns: List[str]) -> pa.Table:
+    """Convert schema changes into standard result rows
+    
+    Every change has a DEV and a PROD row with the DEV and PROD definitions in
+    PARAMETER_3 and PARAMETER_4. VALUE is 1 if the column (or table) exists in
+    that environment and 0 otherwise.
+    
+    Args:
+        changes: Changes found by diff_schemas
+        columns: Result columns, in order
+    
+    Returns:
+        Table with the result schema
+    """
+    rows = []
+    for change in changes.to_dict("records"):
+        header = {name: "n/a" for name in HEADER_COLUMNS}
+        header.update(
+            TABLE_NAME=change["TABLE_NAME"],
+            TEST_NAME=SCHEMA_TEST,
+            PARAMETER_1=change["COLUMN_NAME"],
+            PARAMETER_2=change["CHANGE"],
+            PARAMETER_3=change["DEV_DEFINITION"] if pd.notna(change["DEV_DEFINITION"]) else "n/a",
+            PARAMETER_4=change["PROD_DEFINITION"] if pd.notna(change["PROD_DEFINITION"]) else "n/a",
+        )
+        rows.append(dict(header, ENVIRONMENT="DEV", VALUE=0 if change["CHANGE"] == "dropped" else 1))
+        rows.append(dict(header, ENVIRONMENT="PROD", VALUE=0 if change["CHANGE"] in ("added", "table_added") else 1))
+    return from_rows(rows, columns)
+
+def known_columns(columns: pd.DataFrame) -> Dict[str, Set[str]]:
+    """Index the loaded column names by table
+    
+    Args:
+        columns: Columns loaded by load_schema_columns
+    
+    Returns:
+        Dictionary of quoted table reference to its column names
+    """
+    return {
+        relation_name(schema, table): set(group)
+        for (schema, table), group in columns.groupby(["TABLE_SCHEMA", "TABLE_NAME"])["COLUMN_NAME"]
+    }
+
+def missing_reference(test_params: Dict[str, str], placeholders: FrozenSet[str],
+                      tables: Dict[str, Set[str]], schemas: Set[str]) -> Optional[str]:
+    """Find a table or column a DEV vs PROD test reads that does not exist
+    
+    Args:
+        test_params: Parameters of the test
+        placeholders: Placeholders of the test template
+        tables: Column names by quoted table reference, see known_columns
+        schemas: Schemas whose tables were loaded, other tables are not checked
+    
+    Returns:
+        Description of the missing table or column, None if the test can run
+    """
+    relations = [
+        test_params[name] for name in ("dev_table", "prod_table") if name in placeholders
+    ]
+    for relation in relations:
+        schema = relation.split('"."')[0].strip('"')
+        if schema in schemas and relation not in tables:
+            return f"table {relation} does not exist"
+    
+    # PARAMETER_1 names columns of the DEV and PROD table only in tests reading both
+    parameter_1 = literal_value(test_params.get("parameter_1_string", "NULL"))
+    if len(relations) < 2 or parameter_1 is None or not (
+        placeholders & {"parameter_1_object", "parameter_1_columns"}
+    ):
+        return None
+    for relation in relations:
+        if relation not in tables:
+            continue
+        for column in parameter_1.split(","):
+            column = column.strip().strip('"')
+            if column and column not in tables[relation]:
+                return f"column {column} does not exist in {relation}"
+    return None
\ No newline at end of file
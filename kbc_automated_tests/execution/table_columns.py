@@ -0,0 +1,88 @@
+"""
+Column lists of tables from INFORMATION_SCHEMA.COLUMNS, loaded once per run
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+from ..database.snowflake_client import SnowflakeClient
+from .row_counts import relation_name
+
+def string_list(values: Iterable[str]) -> str:
+    """Render values as a comma separated list of SQL string literals"""
+    return ", ".join("'" + value.replace("'", "''") + "'" for value in sorted(values))
+
+def split_relation(relation: str) -> Tuple[str, str]:
+    """Split a quoted table reference into schema and table name
+    
+    Args:
+        relation: Quoted table reference, e.g. "out.c-bucket"."TABLE"
+    
+    Returns:
+        Tuple (schema, table)
+    """
+    schema, table = relation.split('"."')
+    return schema.strip('"'), table.strip('"')
+
+class TableColumns:
+    """Column names and types of many tables from one INFORMATION_SCHEMA query"""
+    
+    def __init__(self):
+        """Initialize empty column metadata"""
+        self._columns: Dict[str, List[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, client: SnowflakeClient, relations: Iterable[str]) -> None:
+        """Load the columns of tables with a single query
+        
+        Args:
+            client: Connected Snowflake client
+            relations: Quoted table references to load
+        """
+        wanted = {split_relation(relation) for relation in relations}
+        if not wanted:
+            return
+        
+        query = (
+            "SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE\n"
+            "FROM INFORMATION_SCHEMA.COLUMNS\n"
+            f"WHERE TABLE_SCHEMA IN ({string_list({schema for schema, _ in wanted})})\n"
+            f"AND TABLE_NAME IN ({string_list({table for _, table in wanted})})\n"
+            "ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"
+        )
+        rows = [
+            row for row in client.execute_arrow(query).to_pylist()
+            if (row["TABLE_SCHEMA"], row["TABLE_NAME"]) in wanted
+        ]
+        logger.info(f"Loaded columns of {self.add(rows)} tables")
+    
+    def add(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Record columns read from INFORMATION_SCHEMA.COLUMNS
+        
+        Args:
+            rows: Rows with TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME and DATA_TYPE,
+                in column order within each table
+        
+        Returns:
+            Number of tables recorded
+        """
+        columns: Dict[str, List[Tuple[str, str]]] = {}
+        for row in rows:
+            relation = relation_name(row["TABLE_SCHEMA"], row["TABLE_NAME"])
+            columns.setdefault(relation, []).append((row["COLUMN_NAME"], row["DATA_TYPE"]))
+        
+        with self._lock:
+            self._columns.update(columns)
+        return len(columns)
+    
+    def get(self, relation: str) -> Optional[List[Tuple[str, str]]]:
+        """Get the columns of a table
+        
+        Args:
+            relation: Quoted table reference
+        
+        Returns:
+            Tuples (column name, data type) in column order, None if the table was not loaded
+        """
+        with self._lock:
+            return self._columns.get(relation)
\ No newline at end of file
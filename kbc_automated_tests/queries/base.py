@@ -1,17 +1,118 @@
 """
 Base class for query management
 """
-from typing import Dict, Any, Optional
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional
 from loguru import logger
 
+# Placeholder syntax of the templates, e.g. %(dev_table)s
+PLACEHOLDER_PATTERN = re.compile(r"%\((\w+)\)s")
+
+class CompiledTemplate:
+    """Query template parsed once into literal segments and placeholder slots
+    
+    Rendering is a single join of the segments with the bound values instead
+    of one str.replace over the whole text per parameter.
+    """
+    
+    def __init__(self, template: str):
+        """
+        Parse a template
+        
+        Args:
+            template: Template text with %(name)s placeholders
+        """
+        parts = PLACEHOLDER_PATTERN.split(template)
+        # split alternates literal text and placeholder names
+        self.literals: List[str] = parts[0::2]
+        self.slots: List[str] = parts[1::2]
+        self.placeholders: FrozenSet[str] = frozenset(self.slots)
+    
+    def render(self, params: Dict[str, Any]) -> str:
+        """
+        Bind values to the placeholders
+        
+        Args:
+            params: Value for every placeholder
+            
+        Returns:
+            Rendered text
+            
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        try:
+            values = [str(params[slot]) for slot in self.slots]
+        except KeyError as e:
+            raise KeyError(f"Missing required parameter: {e}")
+        
+        parts = [self.literals[0]]
+        for value, literal in zip(values, self.literals[1:]):
+            parts.append(value)
+            parts.append(literal)
+        return "".join(parts)
+
+@dataclass(frozen=True)
+class AggregateTemplate:
+    """Scalar aggregate form of a DEV vs PROD test
+    
+    Tests registered with an aggregate form can be fused with other tests on
+    the same table into a single scan per table (see QueryPlanner).
+    
+    Attributes:
+        dev_source: Template of the table the DEV value is computed from
+        dev_expression: Template of the SQL aggregate producing the DEV value
+        prod_source: Template of the table the PROD value is computed from
+        prod_expression: Template of the SQL aggregate producing the PROD value
+        columns: Templates for the result columns that are not 'n/a'
+    """
+    dev_source: str
+    dev_expression: str
+    prod_source: str
+    prod_expression: str
+    columns: Dict[str, str] = field(default_factory=dict)
+
 class QueryManager:
     """Base class for managing and executing queries"""
     
-    def __init__(self):
-        """Initialize the query manager"""
+    def __init__(self, parameters: Optional[Iterable[str]] = None):
+        """Initialize the query manager
+        
+        Args:
+            parameters: Names of the parameters every test binds, templates using
+                any other %(name)s placeholder are rejected at registration.
+                Defaults to accepting any placeholder.
+        """
         self.queries: Dict[str, str] = {}
+        self.aggregates: Dict[str, AggregateTemplate] = {}
+        self.parameters: Optional[FrozenSet[str]] = frozenset(parameters) if parameters is not None else None
+        self._compiled: Dict[str, CompiledTemplate] = {}
         logger.info("Initializing QueryManager")
     
+    def compile(self, template: str) -> CompiledTemplate:
+        """
+        Get the compiled form of a template, validating its placeholders
+        
+        Args:
+            template: Template text with %(name)s placeholders
+            
+        Returns:
+            Compiled template, parsed once and reused afterwards
+            
+        Raises:
+            ValueError: If the template uses a placeholder no test binds
+        """
+        compiled = self._compiled.get(template)
+        if compiled is None:
+            compiled = CompiledTemplate(template)
+            if self.parameters is not None:
+                unknown = compiled.placeholders - self.parameters
+                if unknown:
+                    raise ValueError(f"Template uses unknown parameters: {sorted(unknown)}")
+            self._compiled[template] = compiled
+        return compiled
+    
     def add_query(self, query_id: str, query_template: str) -> None:
         """
         Add a query template to the manager
@@ -19,10 +120,47 @@ class QueryManager:
         Args:
             query_id: Unique identifier for the query
             query_template: SQL query template with placeholders
+            
+        Raises:
+            ValueError: If the template uses a placeholder no test binds
         """
+        self.compile(query_template)
         self.queries[query_id] = query_template
         logger.info(f"Added query template: {query_id}")
     
+    def add_aggregate(self, query_id: str, aggregate: AggregateTemplate) -> None:
+        """
+        Register the scalar aggregate form of a query so it can be fused
+        
+        Args:
+            query_id: ID of the query the aggregate is equivalent to
+            aggregate: Aggregate templates for the DEV and PROD values
+        """
+        if query_id not in self.queries:
+            raise KeyError(f"Query {query_id} not found")
+            
+        for template in (aggregate.dev_source, aggregate.dev_expression,
+                         aggregate.prod_source, aggregate.prod_expression,
+                         *aggregate.columns.values()):
+            self.compile(template)
+        self.aggregates[query_id] = aggregate
+        logger.info(f"Added aggregate template: {query_id}")
+    
+    def placeholders(self, query_id: str) -> FrozenSet[str]:
+        """
+        Get the names of the parameters a registered query uses
+        
+        Args:
+            query_id: ID of the query
+            
+        Returns:
+            Placeholder names
+        """
+        if query_id not in self.queries:
+            raise KeyError(f"Query {query_id} not found")
+            
+        return self.compile(self.queries[query_id]).placeholders
+    
     def get_query(self, query_id: str, params: Optional[Dict[str, Any]] = None) -> str:
         """
         Get a query with parameters replaced
@@ -44,4 +182,33 @@ class QueryManager:
             except KeyError as e:
                 raise KeyError(f"Missing required parameter: {e}")
                 
-        return query 
\ No newline at end of file
+        return query
+    
+    def render(self, query_id: str, params: Dict[str, Any]) -> str:
+        """
+        Render a registered %(name)s query template
+        
+        Args:
+            query_id: ID of the query to render
+            params: Value for every placeholder of the query
+            
+        Returns:
+            SQL ready to execute
+        """
+        if query_id not in self.queries:
+            raise KeyError(f"Query {query_id} not found")
+            
+        return self.compile(self.queries[query_id]).render(params)
+    
+    def render_template(self, template: str, params: Dict[str, Any]) -> str:
+        """
+        Render any %(name)s template, compiling it on first use
+        
+        Args:
+            template: Template text
+            params: Value for every placeholder of the template
+            
+        Returns:
+            Rendered text
+        """
+        return self.compile(template).render(params)
\ No newline at end of file
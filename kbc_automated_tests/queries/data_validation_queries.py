@@ -14,22 +14,54 @@ How to add new tests:
    - TEST_NAME: The name of the test (must match add_query parameter)
    - COLUMN_NAME: The column being tested (use 'n/a' if not applicable)
    - ENVIRONMENT: Either 'DEV' or 'PROD'
-   - VALUE: The result of your validation
+   - VALUE: The numeric result of your validation (results are kept as float64)
 
 Common patterns:
 - Use UNION ALL to combine DEV and PROD results
 - Use %(table_name)s for table references
 - Use %(column_name)s for column references
 - Use %(table_name_string)s and %(column_name_string)s for string literals
+- Use %(parameter_1_columns)s for a comma separated column list in PARAMETER_1
+- Only the parameters listed in STANDARD_PARAMETERS are bound, templates using
+  any other placeholder are rejected when they are registered
+
+Tests whose DEV and PROD values are each a single aggregate over one table can
+also register an AggregateTemplate with add_aggregate. The executor then fuses
+all such tests of a table into one scan per table instead of running the query
+template once per test. The aggregate must produce the same rows as the template.
 """
-from .base import QueryManager
+from .base import AggregateTemplate, QueryManager
+
+# Parameters DataValidator binds for every test, templates may only use these
+STANDARD_PARAMETERS = (
+    "dev_table",
+    "prod_table",
+    "table_name_string",
+    "source_bucket_object",
+    "source_bucket_string",
+    "source_table_object",
+    "source_table_string",
+    "parameter_1_object",
+    "parameter_2_object",
+    "parameter_3_object",
+    "parameter_4_object",
+    "parameter_1_string",
+    "parameter_2_string",
+    "parameter_3_string",
+    "parameter_4_string",
+    "parameter_1_columns",
+)
+
+# Drill-down tests only run on tables where another test of the same run
+# found a difference between DEV and PROD
+DRILL_DOWN_TESTS = frozenset({"check_key_diff"})
 
 class DataValidationQueries(QueryManager):
     """Collection of data validation queries"""
     
     def __init__(self):
         """Initialize data validation queries"""
-        super().__init__()
+        super().__init__(parameters=STANDARD_PARAMETERS)
         
         # Test 1: Compare row counts between dev and prod tables
         # Query name must match TEST_NAME in data_test_parametrics.csv
@@ -65,6 +97,15 @@ class DataValidationQueries(QueryManager):
             FROM %(prod_table)s
             """
         )
+        self.add_aggregate(
+            "check_row_count",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="COUNT(*)",
+                prod_source="%(prod_table)s",
+                prod_expression="COUNT(*)",
+            )
+        )
         
         # Test 2: Compare sum of a column between dev and prod tables
         # Query name must match TEST_NAME in data_test_parametrics.csv
@@ -100,6 +141,16 @@ class DataValidationQueries(QueryManager):
             FROM %(prod_table)s
             """
         )
+        self.add_aggregate(
+            "check_sum",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="SUM(%(parameter_1_object)s)",
+                prod_source="%(prod_table)s",
+                prod_expression="SUM(%(parameter_1_object)s)",
+                columns={"PARAMETER_1": "%(parameter_1_string)s"},
+            )
+        )
         
         # Test 3: Check uniqueness of a column (used for primary keys)
         # Query name must match TEST_NAME in data_test_parametrics.csv
@@ -112,7 +163,7 @@ class DataValidationQueries(QueryManager):
                 'n/a' as SOURCE_BUCKET,
                 'n/a' as SOURCE_TABLE,
                 %(parameter_1_string)s as PARAMETER_1,
-                'n/a' as PARAMETER_2,
+                'exact' as PARAMETER_2,
                 'n/a' as PARAMETER_3,
                 'n/a' as PARAMETER_4,
                 'DEV' as ENVIRONMENT,
@@ -127,7 +178,7 @@ class DataValidationQueries(QueryManager):
                 'n/a' as SOURCE_BUCKET,
                 'n/a' as SOURCE_TABLE,
                 %(parameter_1_string)s as PARAMETER_1,
-                'n/a' as PARAMETER_2,
+                'exact' as PARAMETER_2,
                 'n/a' as PARAMETER_3,
                 'n/a' as PARAMETER_4,
                 'PROD' as ENVIRONMENT,
@@ -135,6 +186,284 @@ class DataValidationQueries(QueryManager):
             FROM %(prod_table)s
             """
         )
+        self.add_aggregate(
+            "check_uniqueness",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="COUNT(DISTINCT %(parameter_1_object)s)",
+                prod_source="%(prod_table)s",
+                prod_expression="COUNT(DISTINCT %(parameter_1_object)s)",
+                columns={"PARAMETER_1": "%(parameter_1_string)s", "PARAMETER_2": "'exact'"},
+            )
+        )
+        
+        # Test 3b: Approximate variant of check_uniqueness for very large tables
+        # Runs instead of check_uniqueness when its accuracy mode (PARAMETER_2)
+        # resolves to approximate, PARAMETER_3 reports the relative error bound
+        self.add_query(
+            "check_uniqueness_approximate",
+            """
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_uniqueness' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                'approximate' as PARAMETER_2,
+                '1.62%' as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'DEV' as ENVIRONMENT,
+                APPROX_COUNT_DISTINCT(%(parameter_1_object)s) as VALUE
+            FROM %(dev_table)s
+
+            UNION ALL
+
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_uniqueness' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                'approximate' as PARAMETER_2,
+                '1.62%' as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'PROD' as ENVIRONMENT,
+                APPROX_COUNT_DISTINCT(%(parameter_1_object)s) as VALUE
+            FROM %(prod_table)s
+            """
+        )
+        self.add_aggregate(
+            "check_uniqueness_approximate",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="APPROX_COUNT_DISTINCT(%(parameter_1_object)s)",
+                prod_source="%(prod_table)s",
+                prod_expression="APPROX_COUNT_DISTINCT(%(parameter_1_object)s)",
+                columns={
+                    "TEST_NAME": "'check_uniqueness'",
+                    "PARAMETER_1": "%(parameter_1_string)s",
+                    "PARAMETER_2": "'approximate'",
+                    "PARAMETER_3": "'1.62%'",
+                },
+            )
+        )
+
+        # Test 3c: Order-independent fingerprint of the table content
+        # PARAMETER_1 lists the columns to hash (n/a hashes all columns),
+        # PARAMETER_2 optionally splits the table into N hash buckets so a
+        # mismatch can be narrowed to a bucket, PARAMETER_3 is the bucket.
+        # The fingerprint is masked to 53 bits so VALUE stays exact as float64.
+        self.add_query(
+            "check_content_hash",
+            """
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_content_hash' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                COALESCE(%(parameter_1_string)s, '*') as PARAMETER_1,
+                COALESCE(%(parameter_2_string)s, 'n/a') as PARAMETER_2,
+                IFF(%(parameter_2_string)s IS NULL, 'n/a', TO_VARCHAR(BUCKET)) as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'DEV' as ENVIRONMENT,
+                VALUE
+            FROM (
+                SELECT 
+                    ABS(MOD(HASH(%(parameter_1_columns)s), COALESCE(TRY_TO_NUMBER(%(parameter_2_string)s), 1))) as BUCKET,
+                    BITAND(HASH_AGG(%(parameter_1_columns)s), 9007199254740991) as VALUE
+                FROM %(dev_table)s
+                GROUP BY BUCKET
+            )
+
+            UNION ALL
+
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_content_hash' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                COALESCE(%(parameter_1_string)s, '*') as PARAMETER_1,
+                COALESCE(%(parameter_2_string)s, 'n/a') as PARAMETER_2,
+                IFF(%(parameter_2_string)s IS NULL, 'n/a', TO_VARCHAR(BUCKET)) as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'PROD' as ENVIRONMENT,
+                VALUE
+            FROM (
+                SELECT 
+                    ABS(MOD(HASH(%(parameter_1_columns)s), COALESCE(TRY_TO_NUMBER(%(parameter_2_string)s), 1))) as BUCKET,
+                    BITAND(HASH_AGG(%(parameter_1_columns)s), 9007199254740991) as VALUE
+                FROM %(prod_table)s
+                GROUP BY BUCKET
+            )
+            """
+        )
+
+        # Test 3d: Sample of the keys that differ between dev and prod (drill-down)
+        # PARAMETER_1 is the key column, PARAMETER_2 the maximum number of keys
+        # per kind (default 10). Result rows carry the kind (only_in_dev,
+        # only_in_prod, changed) in PARAMETER_2 and the key in PARAMETER_3,
+        # VALUE is the row hash in that environment. Rows sharing a key are
+        # hashed together, so a non-unique key is reported once. NULL keys are
+        # compared like any other key and reported as 'NULL'. The tables are
+        # stacked and grouped by key instead of joined, so each key is
+        # classified by the environments that actually have rows for it.
+        self.add_query(
+            "check_key_diff",
+            """
+            WITH KEY_HASHES AS (
+                SELECT 'DEV' as ENVIRONMENT, %(parameter_1_object)s as KEY_VALUE, HASH_AGG(*) as ROW_HASH
+                FROM %(dev_table)s
+                GROUP BY %(parameter_1_object)s
+
+                UNION ALL
+
+                SELECT 'PROD' as ENVIRONMENT, %(parameter_1_object)s as KEY_VALUE, HASH_AGG(*) as ROW_HASH
+                FROM %(prod_table)s
+                GROUP BY %(parameter_1_object)s
+            ),
+            DIFFERENCES AS (
+                SELECT 
+                    KEY_VALUE,
+                    MAX(IFF(ENVIRONMENT = 'DEV', ROW_HASH, NULL)) as DEV_HASH,
+                    MAX(IFF(ENVIRONMENT = 'PROD', ROW_HASH, NULL)) as PROD_HASH,
+                    CASE
+                        WHEN COUNT_IF(ENVIRONMENT = 'PROD') = 0 THEN 'only_in_dev'
+                        WHEN COUNT_IF(ENVIRONMENT = 'DEV') = 0 THEN 'only_in_prod'
+                        ELSE 'changed'
+                    END as DIFF_KIND
+                FROM KEY_HASHES
+                GROUP BY KEY_VALUE
+                HAVING COUNT(*) = 1 OR COUNT(DISTINCT ROW_HASH) = 2
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY DIFF_KIND ORDER BY KEY_VALUE)
+                    <= COALESCE(TRY_TO_NUMBER(%(parameter_2_string)s), 10)
+            )
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_key_diff' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                DIFF_KIND as PARAMETER_2,
+                COALESCE(TO_VARCHAR(KEY_VALUE), 'NULL') as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'DEV' as ENVIRONMENT,
+                BITAND(DEV_HASH, 9007199254740991) as VALUE
+            FROM DIFFERENCES
+            WHERE DIFF_KIND <> 'only_in_prod'
+
+            UNION ALL
+
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_key_diff' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                DIFF_KIND as PARAMETER_2,
+                COALESCE(TO_VARCHAR(KEY_VALUE), 'NULL') as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                'PROD' as ENVIRONMENT,
+                BITAND(PROD_HASH, 9007199254740991) as VALUE
+            FROM DIFFERENCES
+            WHERE DIFF_KIND <> 'only_in_dev'
+            """
+        )
+
+        # Test 3e: Distribution profile of a numeric column
+        # PARAMETER_1 is the column, PARAMETER_2 the number of histogram bins
+        # (default 10). One row per statistic with its name in PARAMETER_2:
+        # null_rate, minimum, maximum, mean, stddev, p05..p95 (APPROX_PERCENTILE)
+        # and histogram rows with the bin in PARAMETER_3 and the share of non-null
+        # values in VALUE. Bins split the range of each environment, a shifted
+        # range shows in minimum and maximum. Every table is read once.
+        self.add_query(
+            "check_distribution",
+            """
+            WITH COLUMN_VALUES AS (
+                SELECT 
+                    'DEV' as ENVIRONMENT,
+                    %(parameter_1_object)s::FLOAT as COLUMN_VALUE,
+                    MIN(%(parameter_1_object)s::FLOAT) OVER () as LOW,
+                    MAX(%(parameter_1_object)s::FLOAT) OVER () as HIGH
+                FROM %(dev_table)s
+
+                UNION ALL
+
+                SELECT 
+                    'PROD' as ENVIRONMENT,
+                    %(parameter_1_object)s::FLOAT as COLUMN_VALUE,
+                    MIN(%(parameter_1_object)s::FLOAT) OVER () as LOW,
+                    MAX(%(parameter_1_object)s::FLOAT) OVER () as HIGH
+                FROM %(prod_table)s
+            ),
+            BINNED AS (
+                SELECT 
+                    ENVIRONMENT,
+                    COLUMN_VALUE,
+                    CASE
+                        WHEN COLUMN_VALUE IS NULL THEN NULL
+                        WHEN HIGH = LOW THEN 1
+                        ELSE LEAST(
+                            WIDTH_BUCKET(COLUMN_VALUE, LOW, HIGH, COALESCE(TRY_TO_NUMBER(%(parameter_2_string)s), 10)),
+                            COALESCE(TRY_TO_NUMBER(%(parameter_2_string)s), 10)
+                        )
+                    END as BIN
+                FROM COLUMN_VALUES
+            ),
+            STATISTICS AS (
+                SELECT 
+                    ENVIRONMENT,
+                    BIN,
+                    GROUPING(BIN) as IS_TOTAL,
+                    COUNT(COLUMN_VALUE)::FLOAT as VALUE_COUNT,
+                    ((COUNT(*) - COUNT(COLUMN_VALUE)) / NULLIF(COUNT(*), 0))::FLOAT as NULL_RATE,
+                    MIN(COLUMN_VALUE) as MINIMUM,
+                    MAX(COLUMN_VALUE) as MAXIMUM,
+                    AVG(COLUMN_VALUE)::FLOAT as MEAN,
+                    STDDEV(COLUMN_VALUE)::FLOAT as STDDEV,
+                    APPROX_PERCENTILE(COLUMN_VALUE, 0.05)::FLOAT as P05,
+                    APPROX_PERCENTILE(COLUMN_VALUE, 0.25)::FLOAT as P25,
+                    APPROX_PERCENTILE(COLUMN_VALUE, 0.5)::FLOAT as P50,
+                    APPROX_PERCENTILE(COLUMN_VALUE, 0.75)::FLOAT as P75,
+                    APPROX_PERCENTILE(COLUMN_VALUE, 0.95)::FLOAT as P95
+                FROM BINNED
+                GROUP BY GROUPING SETS ((ENVIRONMENT), (ENVIRONMENT, BIN))
+            )
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_distribution' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                LOWER(STATISTIC) as PARAMETER_2,
+                'n/a' as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                ENVIRONMENT,
+                VALUE
+            FROM (
+                SELECT ENVIRONMENT, NULL_RATE, MINIMUM, MAXIMUM, MEAN, STDDEV, P05, P25, P50, P75, P95
+                FROM STATISTICS
+                WHERE IS_TOTAL = 1
+            )
+            UNPIVOT INCLUDE NULLS (VALUE FOR STATISTIC IN (NULL_RATE, MINIMUM, MAXIMUM, MEAN, STDDEV, P05, P25, P50, P75, P95))
+
+            UNION ALL
+
+            SELECT 
+                %(table_name_string)s as TABLE_NAME,
+                'check_distribution' as TEST_NAME,
+                'n/a' as SOURCE_BUCKET,
+                'n/a' as SOURCE_TABLE,
+                %(parameter_1_string)s as PARAMETER_1,
+                'histogram' as PARAMETER_2,
+                TO_VARCHAR(BIN) as PARAMETER_3,
+                'n/a' as PARAMETER_4,
+                ENVIRONMENT,
+                VALUE_COUNT / NULLIF(SUM(VALUE_COUNT) OVER (PARTITION BY ENVIRONMENT), 0) as VALUE
+            FROM STATISTICS
+            WHERE IS_TOTAL = 0 AND BIN IS NOT NULL
+            """
+        )
 
         # Test 4: Check row count between source and target tables
         # Query name must match TEST_NAME in data_test_parametrics.csv
@@ -170,6 +499,19 @@ class DataValidationQueries(QueryManager):
             FROM %(source_bucket_object)s.%(source_table_object)s
             """
         )
+        self.add_aggregate(
+            "input_check_row_count",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="COUNT(*)",
+                prod_source="%(source_bucket_object)s.%(source_table_object)s",
+                prod_expression="COUNT(*)",
+                columns={
+                    "SOURCE_BUCKET": "%(source_bucket_string)s",
+                    "SOURCE_TABLE": "%(source_table_string)s",
+                },
+            )
+        )
 
         # Test 5: Check sum of a column between source and target tables
         self.add_query(
@@ -204,6 +546,19 @@ class DataValidationQueries(QueryManager):
             FROM %(source_bucket_object)s.%(source_table_object)s
             """
         )
+        self.add_aggregate(
+            "input_check_sum",
+            AggregateTemplate(
+                dev_source="%(dev_table)s",
+                dev_expression="SUM(%(parameter_2_object)s)",
+                prod_source="%(source_bucket_object)s.%(source_table_object)s",
+                prod_expression="SUM(%(parameter_1_object)s)",
+                columns={
+                    "PARAMETER_1": "%(parameter_1_string)s",
+                    "PARAMETER_2": "%(parameter_2_string)s",
+                },
+            )
+        )
         
 
         # Example Test X: Check for NULL values and date ranges
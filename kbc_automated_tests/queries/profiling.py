@@ -0,0 +1,90 @@
+"""
+Whole-table column profiling
+
+The profile_table test compares a set of statistics of every column of the
+DEV and PROD table. Instead of one query template it expands into one
+PlannedTest per column and statistic, so the QueryPlanner computes the
+statistics of all columns in one wide aggregate statement per table (split
+into chunks for very wide tables) and fans them out into the standard rows.
+"""
+from typing import Dict, List, Sequence, Tuple
+from loguru import logger
+
+from .query_planner import HEADER_COLUMNS, Aggregate, PlannedTest, literal_value
+
+PROFILE_TEST = "profile_table"
+
+# DATA_TYPE values of INFORMATION_SCHEMA.COLUMNS that get min, max and sum
+NUMERIC_TYPES = frozenset({
+    "NUMBER", "DECIMAL", "NUMERIC", "INT", "INTEGER", "BIGINT", "SMALLINT",
+    "TINYINT", "BYTEINT", "FLOAT", "FLOAT4", "FLOAT8", "DOUBLE", "REAL",
+})
+
+def quote_identifier(name: str) -> str:
+    """Quote a column name for use in SQL
+    
+    Args:
+        name: Column name as stored in Snowflake
+    
+    Returns:
+        Quoted identifier, e.g. "AMOUNT"
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+def profile_expressions(column: str, numeric: bool) -> List[Tuple[str, str]]:
+    """List the statistics profiled for a column
+    
+    Args:
+        column: Column name
+        numeric: Whether the column is numeric in both environments
+    
+    Returns:
+        List of tuples (statistic name, SQL aggregate expression)
+    """
+    quoted = quote_identifier(column)
+    expressions = [
+        ("null_count", f"COUNT_IF({quoted} IS NULL)"),
+        ("approx_distinct", f"APPROX_COUNT_DISTINCT({quoted})"),
+    ]
+    if numeric:
+        expressions += [
+            ("min", f"MIN({quoted})"),
+            ("max", f"MAX({quoted})"),
+            ("sum", f"SUM({quoted})"),
+        ]
+    return expressions
+
+def plan_profile(test_params: Dict[str, str], dev_columns: Sequence[Tuple[str, str]],
+                 prod_columns: Sequence[Tuple[str, str]]) -> List[PlannedTest]:
+    """Expand a profile_table test into one planned test per column and statistic
+    
+    Only columns present in both environments are profiled, in DEV column order.
+    
+    Args:
+        test_params: Parameters of the test
+        dev_columns: Tuples (column name, data type) of the DEV table
+        prod_columns: Tuples (column name, data type) of the PROD table
+    
+    Returns:
+        Planned tests
+    """
+    prod_types = dict(prod_columns)
+    table_name = literal_value(test_params["table_name_string"])
+    missing = [column for column, _ in dev_columns if column not in prod_types]
+    missing += [column for column in prod_types if column not in dict(dev_columns)]
+    if missing:
+        logger.info(f"Not profiling columns of {table_name} missing in one environment: {missing}")
+    
+    planned_tests = []
+    for column, dev_type in dev_columns:
+        if column not in prod_types:
+            continue
+        numeric = dev_type in NUMERIC_TYPES and prod_types[column] in NUMERIC_TYPES
+        for statistic, expression in profile_expressions(column, numeric):
+            header = {name: "n/a" for name in HEADER_COLUMNS}
+            header.update(TABLE_NAME=table_name, TEST_NAME=PROFILE_TEST, PARAMETER_1=column, PARAMETER_2=statistic)
+            planned_tests.append(PlannedTest(PROFILE_TEST, header, {
+                "DEV": Aggregate(test_params["dev_table"], expression),
+                "PROD": Aggregate(test_params["prod_table"], expression),
+            }))
+    return planned_tests
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Query planner that fuses the tests of a table into one aggregate scan per table
+
+Every test with an aggregate form (see AggregateTemplate) needs one scalar
+value per environment, each computed from a single table. The planner groups
+those values by the table they read, so five tests on one table cost one
+SELECT per table (e.g. one for DEV, one for PROD) instead of ten scans. The
+scalar results are then fanned back out into the standard long-format rows.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from .base import QueryManager
+
+# Result columns that identify a test, in result order
+HEADER_COLUMNS = [
+    "TABLE_NAME",
+    "TEST_NAME",
+    "SOURCE_BUCKET",
+    "SOURCE_TABLE",
+    "PARAMETER_1",
+    "PARAMETER_2",
+    "PARAMETER_3",
+    "PARAMETER_4",
+]
+
+ENVIRONMENTS = ("DEV", "PROD")
+
+# Column of batched statements telling which statement a result row belongs to
+BATCH_INDEX = "BATCH_INDEX"
+
+@dataclass(frozen=True)
+class Aggregate:
+    """A scalar aggregate computed over one table
+
+    Attributes:
+        relation: Quoted table reference, e.g. "out.c-bucket"."TABLE"
+        expression: SQL aggregate expression, e.g. SUM("AMOUNT")
+    """
+    relation: str
+    expression: str
+
+@dataclass
+class PlannedTest:
+    """A test reduced to one aggregate per environment
+
+    Attributes:
+        test_name: Name of the test
+        header: Values of the result columns identifying the test
+        aggregates: Aggregate producing the value of each environment
+    """
+    test_name: str
+    header: Dict[str, Any]
+    aggregates: Dict[str, Aggregate]
+
+@dataclass
+class AggregateStatement:
+    """One SELECT computing every needed aggregate over a single table
+
+    Attributes:
+        relation: Quoted table reference the statement scans
+        sql: SQL of the statement
+        aliases: Result column alias of each aggregate
+        sample_clause: SAMPLE clause applied to the table, empty for full scans
+    """
+    relation: str
+    sql: str
+    aliases: Dict[Aggregate, str]
+    sample_clause: str = ""
+
+def table_id(relation: str) -> str:
+    """Convert a quoted table reference to its Storage API table ID
+
+    Args:
+        relation: Quoted table reference, e.g. "out.c-bucket"."TABLE"
+
+    Returns:
+        Table ID, e.g. out.c-bucket.TABLE
+    """
+    return ".".join(part.strip('"') for part in relation.split('"."'))
+
+def literal_value(literal: str) -> Optional[str]:
+    """Convert a rendered SQL string literal back to its Python value
+
+    Args:
+        literal: SQL literal such as 'AMOUNT' or NULL
+
+    Returns:
+        The unquoted string, or None for NULL
+    """
+    literal = literal.strip()
+    if literal.upper() == "NULL":
+        return None
+    if len(literal) >= 2 and literal[0] == literal[-1] == "'":
+        return literal[1:-1].replace("''", "'")
+    return literal
+
+class QueryPlanner:
+    """Plans fused aggregate statements for tests with an aggregate form"""
+
+    def __init__(self, queries: QueryManager, max_aggregates: Optional[int] = None):
+        """Initialize the query planner
+
+        Args:
+            queries: Query manager holding the aggregate templates
+            max_aggregates: Maximum number of aggregates per statement, wider
+                scans are split to stay under the statement size limits
+        """
+        self.queries = queries
+        self.max_aggregates = max_aggregates
+
+    def can_fuse(self, test_name: str) -> bool:
+        """Check whether a test has an aggregate form
+
+        Args:
+            test_name: Name of the test
+
+        Returns:
+            bool: True if the test can be fused
+        """
+        return test_name in self.queries.aggregates
+
+    def plan_test(self, test_name: str, test_params: Dict[str, str]) -> PlannedTest:
+        """Reduce a test to one aggregate per environment
+
+        Args:
+            test_name: Name of the test, must have an aggregate form
+            test_params: Parameters for the test templates
+
+        Returns:
+            Planned test
+        """
+        template = self.queries.aggregates[test_name]
+
+        header = {column: "n/a" for column in HEADER_COLUMNS}
+        header["TABLE_NAME"] = literal_value(test_params["table_name_string"])
+        header["TEST_NAME"] = test_name
+        for column, column_template in template.columns.items():
+            header[column] = literal_value(self.queries.render_template(column_template, test_params))
+
+        aggregates = {
+            "DEV": Aggregate(
+                self.queries.render_template(template.dev_source, test_params),
+                self.queries.render_template(template.dev_expression, test_params),
+            ),
+            "PROD": Aggregate(
+                self.queries.render_template(template.prod_source, test_params),
+                self.queries.render_template(template.prod_expression, test_params),
+            ),
+        }
+        return PlannedTest(test_name, header, aggregates)
+
+    def group_aggregates(self, planned_tests: List[PlannedTest]) -> Dict[str, List[Aggregate]]:
+        """Group the aggregates of planned tests by the table they read
+
+        Identical aggregates on the same table are kept once.
+
+        Args:
+            planned_tests: Tests to compute
+
+        Returns:
+            Dictionary of table reference to its distinct aggregates, in first-use order
+        """
+        by_relation: Dict[str, List[Aggregate]] = {}
+        for planned in planned_tests:
+            for environment in ENVIRONMENTS:
+                aggregate = planned.aggregates[environment]
+                aggregates = by_relation.setdefault(aggregate.relation, [])
+                if aggregate not in aggregates:
+                    aggregates.append(aggregate)
+        return by_relation
+
+    def chunk_aggregates(self, aggregates: List[Aggregate]) -> List[List[Aggregate]]:
+        """Split the aggregates of a table into chunks of at most max_aggregates
+
+        Args:
+            aggregates: Aggregates over one table
+
+        Returns:
+            Chunks of aggregates, each computed by one statement
+        """
+        if not self.max_aggregates or len(aggregates) <= self.max_aggregates:
+            return [aggregates]
+        return [
+            aggregates[start:start + self.max_aggregates]
+            for start in range(0, len(aggregates), self.max_aggregates)
+        ]
+
+    def build_statement(self, relation: str, aggregates: List[Aggregate],
+                        sample_clause: str = "") -> AggregateStatement:
+        """Build one SELECT computing aggregates over a single table
+
+        Args:
+            relation: Quoted table reference
+            aggregates: Aggregates over that table
+            sample_clause: SAMPLE clause to read only a sample of the table
+
+        Returns:
+            Aggregate statement
+        """
+        aliases = {aggregate: f"A{i}" for i, aggregate in enumerate(aggregates)}
+        select_list = ",\n    ".join(
+            f'{aggregate.expression} AS "{alias}"' for aggregate, alias in aliases.items()
+        )
+        sql = f"SELECT\n    {select_list}\nFROM {relation}"
+        if sample_clause:
+            sql = f"{sql} {sample_clause}"
+        return AggregateStatement(relation, sql, aliases, sample_clause)
+
+    def build_batch(self, statements: List[AggregateStatement]) -> str:
+        """Combine aggregate statements over different tables into one UNION ALL statement
+
+        Every statement becomes one result row, tagged with its position in
+        BATCH_INDEX. Narrower statements are padded with NULL columns so all
+        rows share the aliases A0..An.
+
+        Args:
+            statements: Statements to combine
+
+        Returns:
+            SQL of the combined statement
+        """
+        width = max(len(statement.aliases) for statement in statements)
+        selects = []
+        for index, statement in enumerate(statements):
+            select_list = [f'{index} AS "{BATCH_INDEX}"']
+            select_list += [f'{aggregate.expression} AS "{alias}"' for aggregate, alias in statement.aliases.items()]
+            select_list += [f'NULL AS "A{i}"' for i in range(len(statement.aliases), width)]
+            sql = "SELECT\n    " + ",\n    ".join(select_list) + f"\nFROM {statement.relation}"
+            if statement.sample_clause:
+                sql = f"{sql} {statement.sample_clause}"
+            selects.append(sql)
+        return "\nUNION ALL\n".join(selects)
+
+    def fan_out(self, planned_tests: List[PlannedTest], values: Dict[Aggregate, Any]) -> List[Dict[str, Any]]:
+        """Expand aggregate values into the standard long-format result rows
+
+        Tests whose aggregates could not be computed are left out, like a
+        failed test query.
+
+        Args:
+            planned_tests: Tests that were planned
+            values: Computed value of each aggregate
+
+        Returns:
+            One row per test and environment, keyed by result column
+        """
+        rows: List[Dict[str, Any]] = []
+        for planned in planned_tests:
+            if any(planned.aggregates[environment] not in values for environment in ENVIRONMENTS):
+                logger.error(f"Test {planned.test_name} for table {planned.header['TABLE_NAME']} has no result")
+                continue
+            for environment in ENVIRONMENTS:
+                row = dict(planned.header)
+                row["ENVIRONMENT"] = environment
+                row["VALUE"] = values[planned.aggregates[environment]]
+                rows.append(row)
+
+        return rows
@@ -0,0 +1,80 @@
+"""
+Sampling of test queries for fast preview runs
+
+Preview runs read a deterministic sample of every DEV and PROD table with
+SAMPLE ... SEED, so repeated previews of unchanged tables return the same
+values. Only fused counts and sums are sampled, they are scaled back up to
+estimates of the full table. Other aggregates (e.g. distinct counts) cannot be
+estimated from a sample and the DEV and PROD samples hold different rows, so
+they run on the full tables, like tests without an aggregate form.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# Aggregates whose value grows linearly with the number of rows read
+SCALABLE_PATTERN = re.compile(r"^\s*(COUNT\(\s*\*\s*\)|COUNT_IF\(|SUM\()", re.IGNORECASE)
+
+SAMPLING_METHODS = ("BLOCK", "BERNOULLI")
+
+@dataclass(frozen=True)
+class SamplingSpec:
+    """How tables are sampled in a preview run
+    
+    Attributes:
+        percent: Percentage of the table to read, between 0 and 100
+        seed: Seed making the sample deterministic
+        method: BLOCK samples whole micro-partitions (fast), BERNOULLI samples rows
+    """
+    percent: float = 1.0
+    seed: int = 42
+    method: str = "BLOCK"
+    
+    def __post_init__(self):
+        """Validate the sampling settings"""
+        if not 0 < self.percent <= 100:
+            raise ValueError("percent must be greater than 0 and at most 100")
+        if self.method.upper() not in SAMPLING_METHODS:
+            raise ValueError(f"method must be one of {SAMPLING_METHODS}")
+    
+    @classmethod
+    def from_config(cls, config: Any) -> "SamplingSpec":
+        """Create the sampling settings from validation.preview
+        
+        Args:
+            config: Configuration object
+        
+        Returns:
+            Sampling settings
+        """
+        return cls(
+            percent=float(config.get("validation", "preview", "percent", default=1.0)),
+            seed=int(config.get("validation", "preview", "seed", default=42)),
+            method=str(config.get("validation", "preview", "method", default="BLOCK")).upper(),
+        )
+    
+    @property
+    def clause(self) -> str:
+        """SAMPLE clause to append to a table reference"""
+        return f"SAMPLE {self.method.upper()} ({self.percent:g}) SEED ({self.seed})"
+    
+    @property
+    def scale(self) -> float:
+        """Factor turning a count or sum over the sample into a full-table estimate"""
+        return 100.0 / self.percent
+    
+    @property
+    def label(self) -> str:
+        """Suffix marking the ENVIRONMENT of sampled results"""
+        return f" (SAMPLE {self.percent:g}%)"
+
+def is_scalable(expression: str) -> bool:
+    """Check whether an aggregate can be scaled from a sample to the full table
+    
+    Args:
+        expression: SQL aggregate expression
+    
+    Returns:
+        True for COUNT(*) and SUM(...)
+    """
+    return SCALABLE_PATTERN.match(expression) is not None
\ No newline at end of file
@@ -1,18 +1,90 @@
 """
 Storage bucket management module for Keboola Automated Tests
 """
-from typing import List, Dict, Optional, Any
+import asyncio
+import threading
+import time
+from typing import List, Dict, Optional, Any, Tuple
 from loguru import logger
 from ..api.keboola_client import KeboolaClient
+from ..api.async_keboola_client import AsyncKeboolaClient
 
 class BucketManager:
-    """Manages storage bucket operations and branch mapping"""
+    """Manages storage bucket operations and branch mapping
     
-    def __init__(self):
-        """Initialize the BucketManager"""
-        self.client = KeboolaClient()
+    Bucket and table listings are cached in memory for cache_ttl_seconds. The
+    bucket listing is kept as an index keyed by bucket ID, so existence checks
+    and dev to prod lookups do not call the Storage API.
+    """
+    
+    def __init__(self, cache_ttl_seconds: float = 300, client: Optional[KeboolaClient] = None,
+                 async_client: Optional[AsyncKeboolaClient] = None):
+        """Initialize the BucketManager
+        
+        Args:
+            cache_ttl_seconds: How long bucket and table listings are reused
+            client: Keboola API client, defaults to a client with default settings
+            async_client: Async Keboola API client used to list many buckets
+                concurrently, defaults to listing them one by one
+        """
+        self.client = client or KeboolaClient()
+        self.async_client = async_client
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._bucket_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._bucket_index_loaded_at = 0.0
+        self._table_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._all_tables: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._cache_lock = threading.RLock()
         logger.info("Initializing BucketManager")
     
+    def _is_fresh(self, loaded_at: float) -> bool:
+        """Check whether a cache entry loaded at the given time is still valid"""
+        return time.monotonic() - loaded_at < self.cache_ttl_seconds
+    
+    def _get_bucket_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get all buckets keyed by bucket ID, listing them only when the cache expired
+        
+        Returns:
+            Dictionary of bucket ID to bucket information
+        """
+        with self._cache_lock:
+            if self._bucket_index is None or not self._is_fresh(self._bucket_index_loaded_at):
+                buckets = self.client.list_buckets()
+                self._bucket_index = {bucket["id"]: bucket for bucket in buckets}
+                self._bucket_index_loaded_at = time.monotonic()
+                logger.info(f"Cached {len(self._bucket_index)} buckets")
+            return self._bucket_index
+    
+    def invalidate(self, bucket_id: Optional[str] = None) -> None:
+        """
+        Drop cached listings so the next lookup fetches them again
+        
+        Args:
+            bucket_id: Only drop the cached tables of this bucket, defaults to everything
+        """
+        with self._cache_lock:
+            if bucket_id is None:
+                self._bucket_index = None
+                self._table_cache.clear()
+                self._all_tables = None
+                logger.info("Invalidated bucket and table cache")
+            else:
+                self._table_cache.pop(bucket_id, None)
+                logger.info(f"Invalidated table cache for bucket: {bucket_id}")
+    
+    def get_bucket(self, bucket_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a bucket by ID
+        
+        Args:
+            bucket_id: ID of the bucket
+            
+        Returns:
+            Bucket dictionary, or None if the bucket does not exist
+        """
+        return self._get_bucket_index().get(bucket_id)
+    
     def find_buckets_by_branch(self, branch_id: str) -> List[Dict[str, Any]]:
         """
         Find all storage buckets that contain the given branch ID
@@ -24,7 +96,7 @@ class BucketManager:
             List of bucket dictionaries containing bucket information
         """
         logger.info(f"Searching for buckets containing branch ID: {branch_id}")
-        buckets = self.client.list_buckets()
+        buckets = self._get_bucket_index().values()
         matching_buckets = [
             bucket for bucket in buckets 
             if branch_id in bucket["id"]
@@ -41,8 +113,117 @@ class BucketManager:
         Returns:
             List of table dictionaries containing table information
         """
+        with self._cache_lock:
+            cached = self._table_cache.get(bucket_id)
+            if cached is not None and self._is_fresh(cached[0]):
+                return cached[1]
+                
         logger.info(f"Fetching tables for bucket: {bucket_id}")
-        return self.client.list_tables(bucket_id)
+        tables = self.client.list_tables(bucket_id)
+        with self._cache_lock:
+            self._table_cache[bucket_id] = (time.monotonic(), tables)
+        return tables
+    
+    def get_tables_for_buckets(self, bucket_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get all tables of many buckets, listing uncached buckets concurrently
+        
+        Args:
+            bucket_ids: IDs of the storage buckets
+            
+        Returns:
+            Dictionary of bucket ID to the tables in that bucket, buckets that
+            could not be listed are left out
+        """
+        tables_by_bucket: Dict[str, List[Dict[str, Any]]] = {}
+        missing = []
+        with self._cache_lock:
+            for bucket_id in bucket_ids:
+                cached = self._table_cache.get(bucket_id)
+                if cached is not None and self._is_fresh(cached[0]):
+                    tables_by_bucket[bucket_id] = cached[1]
+                else:
+                    missing.append(bucket_id)
+                    
+        if missing and self.async_client is not None:
+            logger.info(f"Fetching tables for {len(missing)} buckets concurrently")
+            fetched = asyncio.run(self.async_client.list_tables_for_buckets(missing))
+            loaded_at = time.monotonic()
+            with self._cache_lock:
+                for bucket_id, tables in fetched.items():
+                    self._table_cache[bucket_id] = (loaded_at, tables)
+            tables_by_bucket.update(fetched)
+        else:
+            for bucket_id in missing:
+                try:
+                    tables_by_bucket[bucket_id] = self.get_tables(bucket_id)
+                except Exception as e:
+                    logger.error(f"Error fetching tables for bucket {bucket_id}: {e}")
+                    
+        return {
+            bucket_id: tables_by_bucket[bucket_id]
+            for bucket_id in bucket_ids if bucket_id in tables_by_bucket
+        }
+    
+    def find_tables_by_branch(self, branch_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find the tables of all buckets containing the given branch ID with one listing
+        
+        Lists every table of the project in a single Storage API request and
+        filters by bucket ID locally, instead of one request per bucket.
+        
+        Args:
+            branch_id: The branch ID to search for
+            
+        Returns:
+            Dictionary of dev bucket ID to the tables in that bucket
+        """
+        logger.info(f"Searching for tables in buckets containing branch ID: {branch_id}")
+        with self._cache_lock:
+            if self._all_tables is None or not self._is_fresh(self._all_tables[0]):
+                self._all_tables = (time.monotonic(), self.client.list_all_tables(include="buckets"))
+            loaded_at, all_tables = self._all_tables
+            
+            tables_by_bucket: Dict[str, List[Dict[str, Any]]] = {}
+            for table in all_tables:
+                bucket_id = table.get("bucket", {}).get("id") or table["id"].rsplit(".", 1)[0]
+                if branch_id in bucket_id:
+                    tables_by_bucket.setdefault(bucket_id, []).append(table)
+                    
+            # Later get_tables calls for these buckets are served from this listing
+            for bucket_id, tables in tables_by_bucket.items():
+                self._table_cache[bucket_id] = (loaded_at, tables)
+                
+        logger.info(f"Found {sum(len(tables) for tables in tables_by_bucket.values())} tables "
+                    f"in {len(tables_by_bucket)} buckets for branch {branch_id}")
+        return tables_by_bucket
+    
+    def get_tables_by_id(self, table_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up many tables by ID from the cached listings
+        
+        Tables are served from the project-wide listing when it is cached,
+        otherwise their buckets are listed (concurrently when possible).
+        
+        Args:
+            table_ids: IDs of the tables, e.g. out.c-bucket.TABLE
+            
+        Returns:
+            Dictionary of table ID to table information, including metadata
+            such as lastChangeDate, tables that were not found are left out
+        """
+        with self._cache_lock:
+            all_tables = self._all_tables
+        if all_tables is not None and self._is_fresh(all_tables[0]):
+            listed = all_tables[1]
+        else:
+            bucket_ids = list(dict.fromkeys(table_id.rsplit(".", 1)[0] for table_id in table_ids))
+            listed = [
+                table for tables in self.get_tables_for_buckets(bucket_ids).values() for table in tables
+            ]
+            
+        wanted = set(table_ids)
+        return {table["id"]: table for table in listed if table["id"] in wanted}
     
     def get_production_bucket_id(self, dev_bucket_id: str, branch_id: str) -> Optional[str]:
         """
@@ -89,8 +270,7 @@ class BucketManager:
             return False
             
         # Check if the production bucket exists
-        buckets = self.client.list_buckets()
-        exists = any(bucket["id"] == prod_bucket_id for bucket in buckets)
+        exists = prod_bucket_id in self._get_bucket_index()
         
         if exists:
             logger.info(f"Production bucket {prod_bucket_id} exists")
@@ -109,16 +289,15 @@ class BucketManager:
         Returns:
             True if bucket exists, False otherwise
         """
-        logger.info(f"Checking if bucket exists: {bucket_id}")
+        logger.debug(f"Checking if bucket exists: {bucket_id}")
         
         try:
-            buckets = self.client.list_buckets()
-            exists = any(bucket["id"] == bucket_id for bucket in buckets)
+            exists = bucket_id in self._get_bucket_index()
             
             if exists:
-                logger.info(f"Bucket {bucket_id} exists")
+                logger.debug(f"Bucket {bucket_id} exists")
             else:
-                logger.info(f"Bucket {bucket_id} does not exist")
+                logger.debug(f"Bucket {bucket_id} does not exist")
                 
             return exists
         except Exception as e:
@@ -0,0 +1,92 @@
+"""
+Fakes and factories shared by the test modules
+"""
+import pyarrow as pa
+from kbc_automated_tests.execution.query_executor import QueryExecutor
+from kbc_automated_tests.execution.row_counts import RowCountMetadata
+from kbc_automated_tests.queries.query_planner import HEADER_COLUMNS
+
+REQUIRED_COLUMNS = HEADER_COLUMNS + ["ENVIRONMENT", "VALUE"]
+
+class StubConfiguration:
+    """Configuration reading values from a nested dictionary"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, *keys, default=None):
+        value = self.values
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+class FakeSnowflakeClient:
+    """Stand-in for SnowflakeClient answering every aggregate with 1"""
+
+    session_id = 1
+
+    def __init__(self):
+        self.queries = []
+
+    def last_query_id(self):
+        return f"query-{len(self.queries)}"
+
+    def execute_arrow(self, query, max_rows=None):
+        self.queries.append(query)
+        aliases = [line.rsplit(" AS ", 1)[1].strip('",') for line in query.splitlines() if " AS " in line]
+        return pa.Table.from_pylist([{alias: 1 for alias in aliases}])
+
+def make_params(parameter_1="NULL", parameter_2="NULL"):
+    """Build test parameters the way DataValidator does"""
+    def as_object(value):
+        return "NULL" if value == "NULL" else f'"{value}"'
+
+    def as_string(value):
+        return "NULL" if value == "NULL" else f"'{value}'"
+
+    return {
+        "dev_table": '"out.c-123-sales"."ORDERS"',
+        "prod_table": '"out.c-sales"."ORDERS"',
+        "table_name_string": "'ORDERS'",
+        "source_bucket_object": '"in.c-erp"',
+        "source_bucket_string": "'in.c-erp'",
+        "source_table_object": '"Orders"',
+        "source_table_string": "'Orders'",
+        "parameter_1_object": as_object(parameter_1),
+        "parameter_2_object": as_object(parameter_2),
+        "parameter_3_object": "NULL",
+        "parameter_4_object": "NULL",
+        "parameter_1_string": as_string(parameter_1),
+        "parameter_2_string": as_string(parameter_2),
+        "parameter_3_string": "NULL",
+        "parameter_4_string": "NULL",
+        "parameter_1_columns": "*" if parameter_1 == "NULL" else f'"{parameter_1}"',
+    }
+
+def table_params(table_name, parameter_1="AMOUNT"):
+    """Build the parameters of a test on another table of the sales bucket"""
+    return dict(
+        make_params(parameter_1),
+        dev_table=f'"out.c-123-sales"."{table_name}"',
+        prod_table=f'"out.c-sales"."{table_name}"',
+        table_name_string=f"'{table_name}'",
+    )
+
+def make_executor(client=None, **validation):
+    """Create a QueryExecutor running its queries on a fake client, with extra validation settings"""
+    config = StubConfiguration({
+        "snowflake": {"username": "u", "password": "p", "account": "a", "warehouse": "w"},
+        "validation": dict({"required_columns": REQUIRED_COLUMNS}, **validation),
+    })
+    executor = QueryExecutor(config)
+    executor.snowflake = client if client is not None else FakeSnowflakeClient()
+    return executor
+
+def set_row_counts(executor, row_counts):
+    """Give tables known row counts, keyed by table ID, e.g. out.c-sales.ORDERS"""
+    executor.row_counts = RowCountMetadata()
+    executor.row_counts.add_storage_tables(
+        {"id": table, "rowsCount": rows} for table, rows in row_counts.items()
+    )
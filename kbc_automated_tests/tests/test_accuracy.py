@@ -0,0 +1,38 @@
+"""
+Tests for accuracy modes of approximate tests
+"""
+import pytest
+from kbc_automated_tests.execution.accuracy import choose_accuracy
+from kbc_automated_tests.tests.fakes import make_executor, make_params, set_row_counts
+
+@pytest.fixture
+def executor():
+    """Create a QueryExecutor with known table sizes"""
+    executor = make_executor(accuracy={"auto_threshold_rows": 1000})
+    set_row_counts(executor, {"out.c-123-sales.ORDERS": 10, "out.c-sales.ORDERS": 5000})
+    return executor
+
+def test_choose_accuracy():
+    """Test exact, approximate and auto modes"""
+    assert choose_accuracy(None, 10 ** 12, 1000) == "exact"
+    assert choose_accuracy("Approximate", 10, 1000) == "approximate"
+    assert choose_accuracy("auto", 5000, 1000) == "approximate"
+    assert choose_accuracy("auto", 10, 1000) == "exact"
+    assert choose_accuracy("auto", None, 1000) == "exact"
+    with pytest.raises(ValueError):
+        choose_accuracy("fast", 10, 1000)
+
+def test_auto_mode_uses_the_larger_table(executor):
+    """Test that auto mode switches to the approximate variant for large tables"""
+    assert executor.resolve_test("check_uniqueness", make_params("ID", "auto")) == "check_uniqueness_approximate"
+    assert executor.resolve_test("check_uniqueness", make_params("ID")) == "check_uniqueness"
+    assert executor.resolve_test("check_sum", make_params("ID", "auto")) == "check_sum"
+
+def test_approximate_results_report_the_error_bound(executor):
+    """Test that approximate runs keep the test name and report mode and error bound"""
+    job = executor.build_jobs([("check_uniqueness", make_params("ID", "approximate"))])[0]
+    result = job().to_pylist()
+
+    assert "APPROX_COUNT_DISTINCT" in executor.snowflake.queries[0]
+    assert {row["TEST_NAME"] for row in result} == {"check_uniqueness"}
+    assert {(row["PARAMETER_2"], row["PARAMETER_3"]) for row in result} == {("approximate", "1.62%")}
@@ -0,0 +1,85 @@
+"""
+Tests for the wiring of the Streamlit app to DataValidator
+"""
+from pathlib import Path
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+import kbc_automated_tests.api.keboola_client as keboola_client
+import kbc_automated_tests.config.configuration as configuration
+import kbc_automated_tests.data_validator as data_validator
+import kbc_automated_tests.database.connection_pool as connection_pool
+from kbc_automated_tests.execution.results import from_rows
+from kbc_automated_tests.queries.query_planner import HEADER_COLUMNS
+from kbc_automated_tests.tests.fakes import StubConfiguration
+
+APP_PATH = str(Path(__file__).resolve().parents[2] / "app.py")
+
+class FakeKeboolaClient:
+    """Stand-in for KeboolaClient listing one branch"""
+
+    def __init__(self, config=None, pool_maxsize=10):
+        self.config = config
+
+    def list_branches(self):
+        return [{"id": 123, "name": "feature"}]
+
+class FakeDataValidator:
+    """Stand-in for DataValidator recording how the app creates it"""
+
+    created = []
+    results = []
+
+    def __init__(self, branch_id, **kwargs):
+        self.kwargs = dict(kwargs, branch_id=branch_id)
+        self.metrics = pd.DataFrame()
+        FakeDataValidator.created.append(self)
+
+    def iter_results(self, progress_callback=None):
+        return iter(FakeDataValidator.results)
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create the app with fake clients and a fake validator"""
+    monkeypatch.setattr(configuration, "Configuration", lambda: StubConfiguration({}))
+    monkeypatch.setattr(keboola_client, "KeboolaClient", FakeKeboolaClient)
+    monkeypatch.setattr(connection_pool.SnowflakeConnectionPool, "from_config", classmethod(lambda cls, config: None))
+    monkeypatch.setattr(data_validator, "DataValidator", FakeDataValidator)
+    FakeDataValidator.created = []
+    FakeDataValidator.results = []
+    st.cache_resource.clear()
+    yield AppTest.from_file(APP_PATH, default_timeout=30).run()
+    st.cache_resource.clear()
+
+def test_preview_run_mode_runs_a_sampled_validation(app):
+    """Test that choosing the preview run mode creates a sampled validator"""
+    app.radio[0].set_value("Preview (sampled)").run()
+    app.button[0].click().run()
+
+    assert not app.exception
+    assert [validator.kwargs["preview"] for validator in FakeDataValidator.created] == [True]
+    assert FakeDataValidator.created[0].kwargs["branch_id"] == "123"
+
+def test_runs_share_the_cached_keboola_client(app):
+    """Test that every run gets the configured client that listed the branches"""
+    app.button[0].click().run()
+    app.button[0].click().run()
+
+    clients = [validator.kwargs["keboola_client"] for validator in FakeDataValidator.created]
+    assert len(clients) == 2 and clients[0] is clients[1]
+    assert isinstance(clients[0], FakeKeboolaClient)
+    assert clients[0].config is not None
+
+def test_results_table_shows_every_streamed_result(app):
+    """Test that the final results table holds the rows of all streamed tables"""
+    columns = HEADER_COLUMNS + ["ENVIRONMENT", "VALUE"]
+    row = {column: "n/a" for column in HEADER_COLUMNS}
+    FakeDataValidator.results = [
+        from_rows([dict(row, TABLE_NAME=name, ENVIRONMENT="DEV", VALUE=1)], columns)
+        for name in ("ORDERS", "CUSTOMERS", "ITEMS")
+    ]
+    app.button[0].click().run()
+
+    assert not app.exception
+    assert list(app.dataframe[0].value["TABLE_NAME"]) == ["ORDERS", "CUSTOMERS", "ITEMS"]
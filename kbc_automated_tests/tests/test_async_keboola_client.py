@@ -0,0 +1,99 @@
+"""
+Tests for the AsyncKeboolaClient class against a local fake Storage API
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from kbc_automated_tests.api.keboola_client import KeboolaClient
+from kbc_automated_tests.api.async_keboola_client import AsyncKeboolaClient
+from kbc_automated_tests.storage.bucket_manager import BucketManager
+
+# Simulated Storage API latency per request
+LATENCY_SECONDS = 0.1
+BUCKET_IDS = [f"out.c-123-bucket{i}" for i in range(10)]
+
+class SlowStorageApi(BaseHTTPRequestHandler):
+    """Serves bucket table listings after a fixed delay"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(LATENCY_SECONDS)
+        bucket_id = self.path.split("/")[-2]
+        if bucket_id == "out.c-123-broken":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps([{"id": f"{bucket_id}.ORDERS"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def client():
+    """Create a KeboolaClient pointed at the slow fake Storage API"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowStorageApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = KeboolaClient(pool_maxsize=len(BUCKET_IDS))
+    client.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield client
+    client.close()
+    server.shutdown()
+
+def test_concurrent_listing_is_faster_than_sequential(client):
+    """Test that listing many buckets concurrently beats listing them one by one"""
+    start = time.monotonic()
+    sequential = {bucket_id: client.list_tables(bucket_id) for bucket_id in BUCKET_IDS}
+    sequential_seconds = time.monotonic() - start
+
+    async_client = AsyncKeboolaClient(max_concurrency=len(BUCKET_IDS), client=client)
+    start = time.monotonic()
+    concurrent = asyncio.run(async_client.list_tables_for_buckets(BUCKET_IDS))
+    concurrent_seconds = time.monotonic() - start
+
+    assert concurrent == sequential
+    assert sequential_seconds >= LATENCY_SECONDS * len(BUCKET_IDS)
+    assert concurrent_seconds < sequential_seconds / 3
+
+def test_failed_buckets_are_left_out(client):
+    """Test that one failing bucket does not fail the whole fan-out"""
+    async_client = AsyncKeboolaClient(max_concurrency=4, client=client)
+    tables = asyncio.run(async_client.list_tables_for_buckets(["out.c-123-broken", BUCKET_IDS[0]]))
+    assert list(tables) == [BUCKET_IDS[0]]
+
+def test_bucket_manager_uses_async_client(client):
+    """Test that BucketManager fans out uncached buckets and caches the listings"""
+    async_client = AsyncKeboolaClient(max_concurrency=len(BUCKET_IDS), client=client)
+    bucket_manager = BucketManager(client=client, async_client=async_client)
+
+    tables_by_bucket = bucket_manager.get_tables_for_buckets(BUCKET_IDS)
+    assert list(tables_by_bucket) == BUCKET_IDS
+
+    start = time.monotonic()
+    bucket_manager.get_tables_for_buckets(BUCKET_IDS)
+    assert time.monotonic() - start < LATENCY_SECONDS
+
+class BarrierClient:
+    """Stand-in for KeboolaClient whose listings only return once all of them run at the same time"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties)
+
+    def list_tables(self, bucket_id):
+        self.barrier.wait(timeout=5)
+        return []
+
+def test_concurrency_is_not_capped_by_the_default_executor():
+    """Test that max_concurrency requests run at once, beyond the default executor's 32 workers"""
+    bucket_ids = [f"out.c-123-bucket{i}" for i in range(40)]
+    async_client = AsyncKeboolaClient(max_concurrency=len(bucket_ids), client=BarrierClient(len(bucket_ids)))
+    tables = asyncio.run(async_client.list_tables_for_buckets(bucket_ids))
+    assert list(tables) == bucket_ids
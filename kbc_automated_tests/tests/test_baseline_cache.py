@@ -0,0 +1,54 @@
+"""
+Tests for the PROD baseline cache
+"""
+import pytest
+from kbc_automated_tests.cache import DiskCache
+from kbc_automated_tests.tests.fakes import make_executor, make_params
+
+@pytest.fixture
+def executor(tmp_path):
+    """Create a QueryExecutor with a baseline cache in a temporary directory"""
+    return make_executor(
+        row_count_metadata=False,
+        baseline_cache={"enabled": True, "path": str(tmp_path / "baseline.sqlite")},
+    )
+
+def run_sum(executor):
+    """Run a fused check_sum on ORDERS in a new run and return the result"""
+    executor.start_run()
+    planned = [executor.planner.plan_test("check_sum", make_params("AMOUNT"))]
+    return executor.execute_planned_tests(planned)
+
+def test_entries_persist_and_evict_least_recently_used(tmp_path):
+    """Test that values survive reopening and the oldest entries are evicted"""
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path, "test", max_entries=2)
+    cache.set_many({"a": 1, "b": 2.5})
+    cache.get_many(["a"])
+    cache.set_many({"c": 3})
+
+    reopened = DiskCache(path, "test", max_entries=2)
+    assert reopened.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(DiskCache(path, "other")) == 0
+
+def test_unchanged_prod_tables_are_not_scanned_again(executor):
+    """Test that PROD values are served from the cache until the table changes"""
+    executor.set_baseline_tables({'"out.c-sales"."ORDERS"': "2024-01-01T00:00:00+0000"})
+    first = run_sum(executor)
+    second = run_sum(executor)
+
+    assert len(executor.snowflake.queries) == 3
+    assert all('"out.c-sales"' not in query for query in executor.snowflake.queries[2:])
+    assert second["VALUE"].to_pylist() == first["VALUE"].to_pylist() == [1.0, 1.0]
+
+    executor.set_baseline_tables({'"out.c-sales"."ORDERS"': "2024-02-01T00:00:00+0000"})
+    run_sum(executor)
+    assert len(executor.snowflake.queries) == 5
+
+def test_refresh_recomputes_cached_values(executor):
+    """Test that a forced refresh scans PROD even when it is cached"""
+    executor.set_baseline_tables({'"out.c-sales"."ORDERS"': "2024-01-01T00:00:00+0000"})
+    run_sum(executor)
+    executor.set_baseline_tables({'"out.c-sales"."ORDERS"': "2024-01-01T00:00:00+0000"}, refresh=True)
+    run_sum(executor)
+    assert len(executor.snowflake.queries) == 4
@@ -0,0 +1,64 @@
+"""
+Tests for cross-table batching of fused statements
+"""
+import pyarrow as pa
+from kbc_automated_tests.tests.fakes import FakeSnowflakeClient, make_executor, set_row_counts, table_params
+
+class BatchingClient(FakeSnowflakeClient):
+    """Fake client answering each branch of a UNION ALL with its batch index plus 10"""
+
+    def __init__(self, fail_batches=False):
+        super().__init__()
+        self.fail_batches = fail_batches
+
+    def execute_arrow(self, query, max_rows=None):
+        if "UNION ALL" not in query:
+            return super().execute_arrow(query, max_rows)
+        self.queries.append(query)
+        if self.fail_batches:
+            raise RuntimeError("batch failed")
+        rows = []
+        for branch in query.split("\nUNION ALL\n"):
+            aliases = [line.rsplit(" AS ", 1)[1].strip('",') for line in branch.splitlines() if " AS " in line]
+            index = int(branch.split(" AS ", 1)[0].split()[-1])
+            rows.append({alias: index if alias == "BATCH_INDEX" else index + 10 for alias in aliases})
+        return pa.Table.from_pylist(rows)
+
+def make_batching_executor(client, max_batch_size=10):
+    """Create a QueryExecutor where every table has 100 rows"""
+    executor = make_executor(client, batching={"max_batch_size": max_batch_size, "max_rows": 1000})
+    set_row_counts(executor, {
+        f"{bucket}.{table}": 100 for bucket in ("out.c-123-sales", "out.c-sales") for table in ("ORDERS", "RETURNS")
+    })
+    return executor
+
+def run(executor):
+    """Prefetch, then run the fused job of each table"""
+    tables = {name: [("check_sum", table_params(name))] for name in ("ORDERS", "RETURNS")}
+    executor.prefetch_aggregates([test for table_tests in tables.values() for test in table_tests])
+    return {
+        name: [row["VALUE"] for row in executor.build_jobs(table_tests)[0]().to_pylist()]
+        for name, table_tests in tables.items()
+    }
+
+def test_small_tables_share_one_statement():
+    """Test that four table scans are sent as one batch and split back per test"""
+    client = BatchingClient()
+    values = run(make_batching_executor(client))
+
+    assert len(client.queries) == 1
+    assert values == {"ORDERS": [10.0, 11.0], "RETURNS": [12.0, 13.0]}
+
+def test_batch_size_is_bounded():
+    """Test that batches hold at most max_batch_size statements"""
+    client = BatchingClient()
+    run(make_batching_executor(client, max_batch_size=3))
+    assert len(client.queries) == 2
+
+def test_failed_batches_fall_back_to_single_statements():
+    """Test that tables of a failed batch are scanned on their own"""
+    client = BatchingClient(fail_batches=True)
+    values = run(make_batching_executor(client))
+
+    assert len(client.queries) == 1 + 4
+    assert values == {"ORDERS": [1.0, 1.0], "RETURNS": [1.0, 1.0]}
@@ -0,0 +1,73 @@
+"""
+Tests for the cached bucket and table listings of BucketManager
+"""
+import pytest
+from kbc_automated_tests.storage.bucket_manager import BucketManager
+
+class FakeKeboolaClient:
+    """Stand-in for KeboolaClient that counts listing calls"""
+
+    def __init__(self):
+        self.bucket_calls = 0
+        self.table_calls = 0
+        self.all_table_calls = 0
+
+    def list_buckets(self):
+        self.bucket_calls += 1
+        return [{"id": "out.c-123-sales"}, {"id": "out.c-sales"}]
+
+    def list_tables(self, bucket_id):
+        self.table_calls += 1
+        return [{"id": f"{bucket_id}.ORDERS"}]
+
+    def list_all_tables(self, include="buckets"):
+        self.all_table_calls += 1
+        return [
+            {"id": "out.c-123-sales.ORDERS", "bucket": {"id": "out.c-123-sales"}},
+            {"id": "out.c-123-sales.ITEMS", "bucket": {"id": "out.c-123-sales"}},
+            {"id": "out.c-sales.ORDERS", "bucket": {"id": "out.c-sales"}},
+        ]
+
+@pytest.fixture
+def bucket_manager():
+    """Create a BucketManager backed by a fake Storage API client"""
+    return BucketManager(cache_ttl_seconds=60, client=FakeKeboolaClient())
+
+def test_bucket_lookups_use_one_listing(bucket_manager):
+    """Test that repeated existence checks reuse the cached bucket index"""
+    assert bucket_manager.bucket_exists("out.c-sales")
+    assert not bucket_manager.bucket_exists("out.c-missing")
+    assert bucket_manager.validate_production_bucket_exists("out.c-123-sales", "123")
+    assert bucket_manager.find_buckets_by_branch("123") == [{"id": "out.c-123-sales"}]
+    assert bucket_manager.client.bucket_calls == 1
+
+def test_table_listings_are_cached(bucket_manager):
+    """Test that tables of a bucket are listed once until invalidated"""
+    bucket_manager.get_tables("out.c-sales")
+    bucket_manager.get_tables("out.c-sales")
+    assert bucket_manager.client.table_calls == 1
+
+    bucket_manager.invalidate("out.c-sales")
+    bucket_manager.get_tables("out.c-sales")
+    assert bucket_manager.client.table_calls == 2
+
+def test_expired_cache_is_refreshed(bucket_manager):
+    """Test that listings are fetched again once the TTL expired"""
+    bucket_manager.bucket_exists("out.c-sales")
+    bucket_manager.cache_ttl_seconds = 0
+    bucket_manager.bucket_exists("out.c-sales")
+    assert bucket_manager.client.bucket_calls == 2
+
+def test_bulk_discovery_filters_by_branch(bucket_manager):
+    """Test that branch tables are found with one listing of all tables"""
+    tables_by_bucket = bucket_manager.find_tables_by_branch("123")
+    assert list(tables_by_bucket) == ["out.c-123-sales"]
+    assert [table["id"] for table in tables_by_bucket["out.c-123-sales"]] == [
+        "out.c-123-sales.ORDERS",
+        "out.c-123-sales.ITEMS",
+    ]
+
+    # The bulk listing also serves per-bucket lookups
+    assert len(bucket_manager.get_tables("out.c-123-sales")) == 2
+    assert bucket_manager.client.all_table_calls == 1
+    assert bucket_manager.client.table_calls == 0
@@ -0,0 +1,67 @@
+"""
+Tests for the ConfigurationManager test index
+"""
+import pytest
+from kbc_automated_tests.configuration.config_manager import ConfigurationManager, TestSpec
+
+PARAMETRICS = """STORAGE_TABLE_ID,STORAGE_BUCKET_ID,TEST_NAME,SOURCE_BUCKET,SOURCE_TABLE,PARAMETER_1,PARAMETER_2,PARAMETER_3,PARAMETER_4
+FCT_MONTH_END_CLOSE,out.c-base,check_row_count,n/a,n/a,n/a,n/a,n/a,n/a
+FCT_MONTH_END_CLOSE,out.c-base,check_sum,n/a,n/a,AMOUNT,n/a,n/a,n/a
+FCT_MONTH_END_CLOSE,out.c-base,check_sum,n/a,n/a,TAX,,,
+FCT_BILLING_LINES,out.c-base,input_check_sum,in.c-erp,BillingLedgerDetail,TotalAmount,TOTAL_AMOUNT_BILLED,n/a,n/a
+"""
+
+class FakeConfig:
+    """Configuration stand-in pointing at a parametrics file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, *keys, default=None):
+        return self.path
+
+@pytest.fixture
+def config_manager(tmp_path):
+    """Create a ConfigurationManager over a small parametrics file"""
+    path = tmp_path / "data_test_parametrics.csv"
+    path.write_text(PARAMETRICS)
+    return ConfigurationManager(FakeConfig(str(path)))
+
+def test_specs_are_indexed_per_table(config_manager):
+    """Test that every row of a table is returned in file order"""
+    specs = config_manager.get_test_specs("out.c-base", "out.c-123-base.FCT_MONTH_END_CLOSE")
+    assert [spec.test_name for spec in specs] == ["check_row_count", "check_sum", "check_sum"]
+    assert [spec.parameter_1 for spec in specs] == [None, "AMOUNT", "TAX"]
+
+def test_specs_are_normalized(config_manager):
+    """Test that n/a, empty cells and NaN become None"""
+    specs = config_manager.get_test_specs("out.c-base", "FCT_BILLING_LINES")
+    assert specs == (
+        TestSpec(
+            storage_bucket_id="out.c-base",
+            storage_table_id="FCT_BILLING_LINES",
+            test_name="input_check_sum",
+            source_bucket="in.c-erp",
+            source_table="BillingLedgerDetail",
+            parameter_1="TotalAmount",
+            parameter_2="TOTAL_AMOUNT_BILLED",
+        ),
+    )
+
+def test_index_is_read_only(config_manager):
+    """Test that the compiled index cannot be modified"""
+    with pytest.raises(TypeError):
+        config_manager.test_index[("out.c-base", "NEW")] = ()
+
+def test_find_matching_tests(config_manager):
+    """Test the (test_name, parameter_1) view of the index"""
+    assert config_manager.find_matching_tests("out.c-base", "MISSING") == []
+    assert config_manager.find_matching_tests("out.c-base", "FCT_BILLING_LINES") == [
+        ("input_check_sum", "TotalAmount")
+    ]
+
+def test_column_lists_are_quoted():
+    """Test that PARAMETER_1 is also bound as a quoted column list"""
+    spec = TestSpec("out.c-base", "ORDERS", "check_content_hash", parameter_1='ID, "AMOUNT, NOTE')
+    assert spec.query_params["parameter_1_columns"] == '"ID", """AMOUNT", "NOTE"'
+    assert TestSpec("out.c-base", "ORDERS", "check_content_hash").query_params["parameter_1_columns"] == "*"
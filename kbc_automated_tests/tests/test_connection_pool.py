@@ -0,0 +1,102 @@
+"""
+Tests for the SnowflakeConnectionPool class
+"""
+import threading
+import time
+import pytest
+from kbc_automated_tests.database.connection_pool import SnowflakeConnectionPool
+
+class FakeClient:
+    """Stand-in for SnowflakeClient that records its lifecycle"""
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.disconnected = False
+        self.cursors_closed = 0
+
+    def is_healthy(self):
+        return self.healthy
+
+    def close_worker_cursors(self):
+        self.cursors_closed += 1
+
+    def disconnect(self):
+        self.disconnected = True
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Create a pool that opens fake sessions"""
+    pool = SnowflakeConnectionPool(size=2, max_age_seconds=60, health_check_seconds=0)
+    opened = []
+
+    def open_client():
+        client = FakeClient()
+        client.created_at = time.monotonic()
+        client.released_at = client.created_at
+        opened.append(client)
+        return client
+
+    monkeypatch.setattr(pool, "_open_client", open_client)
+    pool.opened = opened
+    yield pool
+    pool.close()
+
+def test_sessions_are_reused(pool):
+    """Test that a released session is handed out again"""
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(pool.opened) == 1
+
+def test_pool_size_is_bounded(pool):
+    """Test that waiting for a session times out once the pool is exhausted"""
+    with pool.connection(), pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection(timeout=0.01):
+                pass
+    assert len(pool.opened) == 2
+
+def test_unhealthy_sessions_are_recycled(pool):
+    """Test that a session failing its health check is replaced"""
+    with pool.connection() as first:
+        pass
+    first.healthy = False
+    with pool.connection() as second:
+        pass
+    assert second is not first
+    assert first.disconnected
+
+def test_old_sessions_are_recycled(pool):
+    """Test that sessions past their maximum age are replaced"""
+    with pool.connection() as first:
+        pass
+    first.created_at -= 120
+    with pool.connection() as second:
+        pass
+    assert second is not first
+    assert first.disconnected
+
+def test_released_sessions_close_worker_cursors(pool):
+    """Test that the per-thread cursors of a run are closed when its session is returned"""
+    with pool.connection() as client:
+        assert client.cursors_closed == 0
+    assert client.cursors_closed == 1
+
+def test_waiter_opens_a_session_when_one_is_discarded(pool):
+    """Test that a caller waiting on a full pool is woken when a failed session is dropped"""
+    pool.size = 1
+    acquired = []
+    with pytest.raises(RuntimeError):
+        with pool.connection() as broken:
+            waiter = threading.Thread(target=lambda: acquired.append(pool._acquire(timeout=None)))
+            waiter.start()
+            time.sleep(0.05)
+            broken.healthy = False
+            raise RuntimeError("query failed")
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert broken.disconnected
+    assert acquired and acquired[0] is not broken
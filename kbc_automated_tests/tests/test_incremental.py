@@ -0,0 +1,83 @@
+"""
+Tests for the IncrementalResults class
+"""
+import pytest
+from kbc_automated_tests.cache import DiskCache
+from kbc_automated_tests.execution.incremental import IncrementalResults, input_tables
+from kbc_automated_tests.execution.results import from_rows
+from kbc_automated_tests.queries.query_planner import HEADER_COLUMNS
+from kbc_automated_tests.tests.fakes import make_params
+
+REQUIRED_COLUMNS = HEADER_COLUMNS + ["ENVIRONMENT", "VALUE"]
+DEV_TABLE_ID = "out.c-123-sales.ORDERS"
+
+def make_tables(dev_change="2024-01-01", prod_change="2024-01-01"):
+    """Build Storage API tables of the DEV, PROD and source tables"""
+    return {
+        DEV_TABLE_ID: {"lastChangeDate": dev_change, "lastImportDate": dev_change},
+        "out.c-sales.ORDERS": {"lastChangeDate": prod_change, "lastImportDate": prod_change},
+        "in.c-erp.Orders": {"lastChangeDate": "2024-01-01", "lastImportDate": "2024-01-01"},
+    }
+
+def make_result(test_name, *parameters):
+    """Build the result rows of a test, once per PARAMETER_1 value if given"""
+    row = {column: "n/a" for column in HEADER_COLUMNS}
+    row.update(TABLE_NAME="ORDERS", TEST_NAME=test_name)
+    return from_rows([
+        dict(row, PARAMETER_1=parameter, ENVIRONMENT=environment, VALUE=value)
+        for parameter in parameters or ("n/a",)
+        for environment, value in (("DEV", 10), ("PROD", 12))
+    ], REQUIRED_COLUMNS)
+
+@pytest.fixture
+def incremental(tmp_path):
+    """Create incremental results stored in a temporary directory"""
+    return IncrementalResults(DiskCache(str(tmp_path / "results.sqlite"), "test_results"), REQUIRED_COLUMNS)
+
+@pytest.fixture
+def prepared():
+    """Two tests on one dev table"""
+    return [(DEV_TABLE_ID, [
+        ("check_row_count", make_params()),
+        ("input_check_sum", make_params("TotalAmount", "TOTAL")),
+    ])]
+
+def test_input_tables_include_the_source_table():
+    """Test that tests with a source table depend on it"""
+    params = make_params()
+    assert input_tables(params) == [DEV_TABLE_ID, "out.c-sales.ORDERS", "in.c-erp.Orders"]
+
+def test_unchanged_tests_are_reused(incremental, prepared):
+    """Test that only tests with changed inputs run again"""
+    to_run, reused = incremental.split(prepared, make_tables())
+    assert to_run == prepared and reused == []
+    incremental.store(DEV_TABLE_ID, make_result("check_row_count"))
+
+    to_run, reused = incremental.split(prepared, make_tables())
+    assert [test_name for test_name, _ in to_run[0][1]] == ["input_check_sum"]
+    assert reused[0][0] == DEV_TABLE_ID and reused[0][1]["VALUE"].to_pylist() == [10, 12]
+
+    to_run, reused = incremental.split(prepared, make_tables(prod_change="2024-02-01"))
+    assert len(to_run[0][1]) == 2 and reused == []
+
+def test_tests_without_table_state_always_run(incremental, prepared):
+    """Test that unknown input tables disable reuse"""
+    incremental.split(prepared, make_tables())
+    incremental.store(DEV_TABLE_ID, make_result("check_row_count"))
+    to_run, reused = incremental.split(prepared, {})
+    assert to_run == prepared and reused == []
+
+def test_partial_results_of_same_named_tests_are_not_stored(incremental):
+    """Test that a failed test is not hidden by a same-named test that succeeded"""
+    prepared = [(DEV_TABLE_ID, [
+        ("check_sum", make_params("AMOUNT")),
+        ("check_sum", make_params("TAX")),
+    ])]
+    incremental.split(prepared, make_tables())
+    incremental.store(DEV_TABLE_ID, make_result("check_sum", "AMOUNT"))
+    to_run, reused = incremental.split(prepared, make_tables())
+    assert to_run == prepared and reused == []
+
+    incremental.store(DEV_TABLE_ID, make_result("check_sum", "AMOUNT", "TAX"))
+    to_run, reused = incremental.split(prepared, make_tables())
+    assert to_run == [] and reused[0][1].num_rows == 4
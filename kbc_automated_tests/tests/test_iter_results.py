@@ -0,0 +1,102 @@
+"""
+Tests for streaming results out of DataValidator
+"""
+import asyncio
+import threading
+import pyarrow as pa
+import pytest
+from kbc_automated_tests.data_validator import DataValidator
+from kbc_automated_tests.execution.metrics import QueryMetrics
+
+class FakeQueryExecutor:
+    """Stand-in for QueryExecutor whose jobs return one row per test"""
+
+    def __init__(self):
+        self.disconnected = False
+        self.release = {}
+        self.metrics = QueryMetrics()
+
+    def connect(self):
+        pass
+
+    def start_run(self):
+        self.metrics = QueryMetrics()
+
+    def disconnect(self):
+        self.disconnected = True
+
+    def load_row_counts(self, storage_tables):
+        pass
+
+    def split_drill_down(self, table_tests):
+        return table_tests, []
+
+    def build_jobs(self, table_tests):
+        def job(test_name):
+            # Tables listed in release wait until the test lets them finish
+            if test_name in self.release:
+                self.release[test_name].wait(timeout=5)
+            return pa.Table.from_pylist([{"TEST_NAME": test_name, "VALUE": 1.0}])
+        return [lambda test_name=test_name: job(test_name) for test_name, _ in table_tests]
+
+@pytest.fixture
+def validator():
+    """Create a DataValidator over three fake tables"""
+    validator = DataValidator.__new__(DataValidator)
+    validator.query_executor = FakeQueryExecutor()
+    validator.incremental_results = None
+    validator.schema_diff = False
+    validator.max_workers = 2
+    validator._validate_environment = lambda: True
+    validator._discover_tables = lambda: [("out.c-123-sales", {"id": name}) for name in ("SLOW", "FAST", "OTHER")]
+    validator._prepare_tests = lambda table_jobs: [(table["id"], [(table["id"], {})]) for _, table in table_jobs]
+    validator._load_baseline_tables = lambda prepared: None
+    validator._load_table_columns = lambda prepared: None
+    validator._prefetch_aggregates = lambda prepared: None
+    return validator
+
+def test_tables_are_yielded_as_they_finish(validator):
+    """Test that a slow table does not hold back the results of other tables"""
+    validator.query_executor.release["SLOW"] = threading.Event()
+    progress = []
+    results = validator.iter_results(progress_callback=lambda completed, total: progress.append((completed, total)))
+
+    first = next(results)
+    assert first["TEST_NAME"].to_pylist() in (["FAST"], ["OTHER"])
+    validator.query_executor.release["SLOW"].set()
+    rest = list(results)
+
+    assert len(rest) == 2
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert validator.query_executor.disconnected
+
+def test_async_results(validator):
+    """Test that the async counterpart yields every table"""
+    async def collect():
+        return [result async for result in validator.aiter_results()]
+
+    results = asyncio.run(collect())
+    assert sorted(result["TEST_NAME"][0].as_py() for result in results) == ["FAST", "OTHER", "SLOW"]
+
+class FakeIncrementalResults:
+    """Stand-in for IncrementalResults that stores nothing"""
+
+    def store(self, dev_table_id, result):
+        pass
+
+def test_progress_counts_tables_with_reused_results(validator):
+    """Test that reused results advance the progress once per table"""
+    def skip_unchanged(prepared):
+        reused = [
+            (table_id, pa.Table.from_pylist([{"TEST_NAME": test_name, "VALUE": 1.0}]))
+            for table_id, test_name in (("SLOW", "check_sum"), ("SLOW", "check_row_count"), ("FAST", "check_sum"))
+        ]
+        return [entry for entry in prepared if entry[0] != "SLOW"], reused
+
+    validator.incremental_results = FakeIncrementalResults()
+    validator._skip_unchanged = skip_unchanged
+    progress = []
+    results = list(validator.iter_results(progress_callback=lambda completed, total: progress.append((completed, total))))
+
+    assert len(results) == 5
+    assert progress == [(1, 3), (2, 3), (3, 3)]
@@ -0,0 +1,80 @@
+"""
+Tests for the KeboolaClient class against a local fake Storage API
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from kbc_automated_tests.api.keboola_client import KeboolaClient
+
+class FakeConfig:
+    """Configuration stand-in without backoff delays"""
+    
+    def get(self, *keys, default=None):
+        return {"max_attempts": 3, "delay_seconds": 0}.get(keys[-1], default)
+
+class FakeStorageApi(BaseHTTPRequestHandler):
+    """Serves canned Storage API responses"""
+    
+    failures_left = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        if self.path == "/v2/storage/buckets":
+            if FakeStorageApi.failures_left > 0:
+                FakeStorageApi.failures_left -= 1
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_json([{"id": "out.c-sales"}])
+        elif self.path == "/v2/storage/dev-branches":
+            next_url = f"http://{self.headers['Host']}/v2/storage/dev-branches?page=2"
+            self._send_json([{"id": 1}], {"Link": f'<{next_url}>; rel="next"'})
+        elif self.path == "/v2/storage/dev-branches?page=2":
+            self._send_json([{"id": 2}])
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+@pytest.fixture
+def client():
+    """Create a KeboolaClient pointed at the fake Storage API"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStorageApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = KeboolaClient(FakeConfig())
+    client.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield client
+    client.close()
+    server.shutdown()
+
+def test_unavailable_responses_are_retried(client):
+    """Test that 503 responses are retried up to max_attempts"""
+    FakeStorageApi.failures_left = 2
+    assert client.list_buckets() == [{"id": "out.c-sales"}]
+
+def test_retries_are_bounded(client):
+    """Test that the request fails once all attempts are used"""
+    FakeStorageApi.failures_left = 3
+    with pytest.raises(Exception):
+        client.list_buckets()
+    FakeStorageApi.failures_left = 0
+
+def test_paginated_listings_are_concatenated(client):
+    """Test that next links are followed"""
+    assert client.list_branches() == [{"id": 1}, {"id": 2}]
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Tests for the check_key_diff drill-down test
+"""
+import pyarrow as pa
+import pytest
+from kbc_automated_tests.data_validator import DataValidator
+from kbc_automated_tests.database.snowflake_client import SnowflakeClient
+from kbc_automated_tests.execution.results import has_differences
+from kbc_automated_tests.queries.data_validation_queries import DataValidationQueries
+from kbc_automated_tests.tests.fakes import make_params
+
+def make_result(dev_value, prod_value, environment_label=""):
+    """Build the result rows of one test"""
+    return pa.Table.from_pylist([
+        {"TEST_NAME": "check_sum", "PARAMETER_1": "AMOUNT", "ENVIRONMENT": "DEV" + environment_label, "VALUE": dev_value},
+        {"TEST_NAME": "check_sum", "PARAMETER_1": "AMOUNT", "ENVIRONMENT": "PROD" + environment_label, "VALUE": prod_value},
+    ])
+
+class BatchCursor:
+    """Stand-in for a Snowflake cursor streaming three batches of two rows"""
+
+    sfqid = "01b2-query"
+
+    def __init__(self):
+        self.fetched = 0
+
+    def execute(self, query):
+        self.query = query
+
+    def fetch_arrow_batches(self):
+        for start in (0, 2, 4):
+            self.fetched += 1
+            yield pa.table({"VALUE": [start, start + 1]})
+
+class FakeQueryExecutor:
+    """Stand-in for QueryExecutor returning a configured value per environment"""
+
+    def __init__(self, dev_value, prod_value):
+        self.result = make_result(dev_value, prod_value)
+        self.ran = []
+
+    def split_drill_down(self, table_tests):
+        return (
+            [test for test in table_tests if test[0] != "check_key_diff"],
+            [test for test in table_tests if test[0] == "check_key_diff"],
+        )
+
+    def build_jobs(self, table_tests):
+        def job(test_name):
+            self.ran.append(test_name)
+            return self.result
+        return [lambda test_name=test_name: job(test_name) for test_name, _ in table_tests]
+
+def test_has_differences():
+    """Test that differing values and one-sided rows count as differences"""
+    assert not has_differences(make_result(10.0, 10.0))
+    assert has_differences(make_result(10.0, 12.0))
+    assert not has_differences(make_result(10.0, 10.0, " (SAMPLE 1%)"))
+    assert has_differences(make_result(10.0, 10.0).slice(0, 1))
+
+def test_key_diff_query_is_bounded_per_kind():
+    """Test that the sample size is pushed down into the query"""
+    query = DataValidationQueries().render("check_key_diff", make_params("ORDER_ID", "5"))
+    assert query.count('"ORDER_ID" as KEY_VALUE, HASH_AGG(*) as ROW_HASH') == 2
+    assert "PARTITION BY DIFF_KIND" in query
+    assert "TRY_TO_NUMBER('5'), 10)" in query
+
+def test_key_diff_classifies_keys_by_the_environments_with_rows():
+    """Test that keys are deduplicated and classified without a join on the key"""
+    query = DataValidationQueries().render("check_key_diff", make_params("ORDER_ID"))
+    assert "JOIN" not in query
+    assert query.count('GROUP BY "ORDER_ID"') == 2
+    assert "WHEN COUNT_IF(ENVIRONMENT = 'PROD') = 0 THEN 'only_in_dev'" in query
+    assert "WHERE DIFF_KIND <> 'only_in_prod'" in query
+
+def test_results_are_streamed_up_to_max_rows():
+    """Test that fetching stops once max_rows rows arrived"""
+    client = SnowflakeClient()
+    cursor = BatchCursor()
+    client._local.cursor = cursor
+
+    table = client.execute_arrow("SELECT 1", max_rows=3)
+
+    assert table["VALUE"].to_pylist() == [0, 1, 2]
+    assert cursor.fetched == 2
+
+@pytest.mark.parametrize("prod_value, drilled_down", [(10.0, False), (12.0, True)])
+def test_drill_down_only_runs_on_differences(prod_value, drilled_down):
+    """Test that check_key_diff only runs when another test found a difference"""
+    validator = DataValidator.__new__(DataValidator)
+    validator.query_executor = FakeQueryExecutor(10.0, prod_value)
+
+    validator._execute_table_tests([("check_sum", {}), ("check_key_diff", {})])
+
+    assert ("check_key_diff" in validator.query_executor.ran) == drilled_down
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Tests for the run-scoped memo of aggregate values
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kbc_automated_tests.execution.memo import MISSING, AggregateMemo
+from kbc_automated_tests.tests.fakes import FakeSnowflakeClient, make_executor, table_params
+
+class SlowClient(FakeSnowflakeClient):
+    """Fake client holding every query until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def execute_arrow(self, query, max_rows=None):
+        self.release.wait(timeout=5)
+        with self.lock:
+            return super().execute_arrow(query, max_rows)
+
+def source_row_count(table_name):
+    """Plan input_check_row_count of a table against the shared source table"""
+    return [("input_check_row_count", table_params(table_name))]
+
+def test_claim_shares_values_and_in_flight_work():
+    """Test that a key is owned once, awaited while in flight and known afterwards"""
+    memo = AggregateMemo()
+    known, in_flight, owned = memo.claim(["a", "b"])
+    assert (known, in_flight, owned) == ({}, {}, ["a", "b"])
+
+    _, waiting, owned = memo.claim(["a"])
+    assert owned == [] and set(waiting) == {"a"}
+
+    memo.publish({"a": 1, "b": MISSING})
+    assert waiting["a"].result() == 1
+    assert memo.claim(["a", "b"]) == ({"a": 1}, {}, [])
+
+def test_reset_releases_waiting_callers():
+    """Test that forgetting the memo does not leave callers waiting forever"""
+    memo = AggregateMemo()
+    memo.claim(["a"])
+    _, waiting, _ = memo.claim(["a"])
+    memo.reset()
+    assert waiting["a"].result() is MISSING
+    assert memo.claim(["a"])[2] == ["a"]
+
+def test_shared_source_is_counted_once():
+    """Test that input checks of two tables on one source table share its row count"""
+    executor = make_executor()
+    for table_name in ("ORDERS", "RETURNS"):
+        executor.build_jobs(source_row_count(table_name))[0]()
+
+    source_queries = [query for query in executor.snowflake.queries if '"in.c-erp"' in query]
+    assert len(source_queries) == 1
+
+def test_concurrent_jobs_wait_for_in_flight_aggregates():
+    """Test that a job awaits the aggregate another job is computing"""
+    executor = make_executor(SlowClient())
+    jobs = [executor.build_jobs(source_row_count(name))[0] for name in ("ORDERS", "RETURNS")]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        executor.snowflake.release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert all(result.num_rows == 2 for result in results)
+    source_queries = [query for query in executor.snowflake.queries if '"in.c-erp"' in query]
+    assert len(source_queries) == 1
@@ -0,0 +1,68 @@
+"""
+Tests for the QueryMetrics class
+"""
+import json
+import pyarrow as pa
+import pytest
+from kbc_automated_tests.execution.metrics import QueryMetrics, timed_query
+
+class FakeSnowflakeClient:
+    """Stand-in for SnowflakeClient with a canned query history"""
+
+    session_id = 42
+
+    def __init__(self):
+        self.queries = []
+
+    def last_query_id(self):
+        return f"query-{len(self.queries)}"
+
+    def execute_arrow(self, query, max_rows=None):
+        self.queries.append(query)
+        if "QUERY_HISTORY_BY_SESSION" in query:
+            return pa.Table.from_pylist([{"QUERY_ID": "query-1", "BYTES_SCANNED": 2048, "EXECUTION_TIME": 1500}])
+        if "FAIL" in query:
+            raise RuntimeError("SQL compilation error")
+        return pa.table({"VALUE": [1, 2]})
+
+@pytest.fixture
+def recorded():
+    """Record one successful and one failed query"""
+    metrics = QueryMetrics()
+    client = FakeSnowflakeClient()
+    timed_query(metrics, client, "SELECT 1", "ORDERS", ["check_sum", "check_row_count"], '"out.c-sales"."ORDERS"')
+    with pytest.raises(RuntimeError):
+        timed_query(metrics, client, "FAIL", "ITEMS", ["check_uniqueness"])
+    return metrics, client
+
+def test_queries_are_recorded_per_test_and_table(recorded):
+    """Test that every query is recorded with its query ID, rows and status"""
+    metrics, _ = recorded
+    frame = metrics.to_frame()
+
+    assert len(frame) == 2
+    by_table = frame.set_index("TABLE_NAME")
+    assert by_table.loc["ORDERS", "QUERY_ID"] == "query-1"
+    assert by_table.loc["ORDERS", "TEST_NAMES"] == "check_sum, check_row_count"
+    assert by_table.loc["ORDERS", "ROWS"] == 2
+    assert by_table.loc["ITEMS", "STATUS"] == "error"
+
+def test_query_history_adds_bytes_scanned(recorded):
+    """Test that the query history is read once per session"""
+    metrics, client = recorded
+    metrics.enrich(client)
+
+    assert sum("QUERY_HISTORY_BY_SESSION" in query for query in client.queries) == 1
+    record = next(row for row in json.loads(metrics.to_json()) if row["query_id"] == "query-1")
+    assert record["bytes_scanned"] == 2048
+    assert record["execution_seconds"] == 1.5
+
+def test_openmetrics_export(recorded, tmp_path):
+    """Test that metrics are exported as JSON and OpenMetrics files"""
+    metrics, _ = recorded
+    paths = metrics.export(str(tmp_path))
+
+    text = open(paths[1]).read()
+    assert text.endswith("# EOF\n")
+    assert 'kbc_query_rows{query_id="query-1",table="ORDERS",tests="check_sum,check_row_count"' in text
+    assert len(json.load(open(paths[0]))) == 2
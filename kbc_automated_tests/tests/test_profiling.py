@@ -0,0 +1,69 @@
+"""
+Tests for the profile_table test
+"""
+import pyarrow as pa
+from kbc_automated_tests.execution.table_columns import TableColumns
+from kbc_automated_tests.tests.fakes import FakeSnowflakeClient, make_executor, make_params
+
+COLUMNS = [
+    {"TABLE_SCHEMA": "out.c-123-sales", "TABLE_NAME": "ORDERS", "COLUMN_NAME": "ID", "DATA_TYPE": "TEXT"},
+    {"TABLE_SCHEMA": "out.c-123-sales", "TABLE_NAME": "ORDERS", "COLUMN_NAME": "AMOUNT", "DATA_TYPE": "NUMBER"},
+    {"TABLE_SCHEMA": "out.c-123-sales", "TABLE_NAME": "ORDERS", "COLUMN_NAME": "NOTE", "DATA_TYPE": "TEXT"},
+    {"TABLE_SCHEMA": "out.c-sales", "TABLE_NAME": "ORDERS", "COLUMN_NAME": "ID", "DATA_TYPE": "TEXT"},
+    {"TABLE_SCHEMA": "out.c-sales", "TABLE_NAME": "ORDERS", "COLUMN_NAME": "AMOUNT", "DATA_TYPE": "NUMBER"},
+    {"TABLE_SCHEMA": "out.c-sales", "TABLE_NAME": "CUSTOMERS", "COLUMN_NAME": "ID", "DATA_TYPE": "TEXT"},
+]
+
+class ProfilingClient(FakeSnowflakeClient):
+    """Fake client that also answers the INFORMATION_SCHEMA.COLUMNS query"""
+
+    def execute_arrow(self, query, max_rows=None):
+        if "INFORMATION_SCHEMA.COLUMNS" in query:
+            self.queries.append(query)
+            return pa.Table.from_pylist(COLUMNS)
+        return super().execute_arrow(query, max_rows)
+
+def make_profiling_executor(max_aggregates):
+    """Create a QueryExecutor answering every aggregate with 1"""
+    return make_executor(ProfilingClient(), row_count_metadata=False, max_aggregates_per_statement=max_aggregates)
+
+def run_profile(executor):
+    """Load the columns and run profile_table on ORDERS"""
+    table_tests = [("profile_table", make_params())]
+    executor.load_table_columns(executor.profile_relations(table_tests))
+    results = [job() for job in executor.build_jobs(table_tests)]
+    return pa.concat_tables(results)
+
+def test_table_columns_are_loaded_with_one_query():
+    """Test that only the requested tables are kept, in column order"""
+    client = ProfilingClient()
+    columns = TableColumns()
+    columns.load(client, ['"out.c-123-sales"."ORDERS"', '"out.c-sales"."ORDERS"'])
+
+    assert len(client.queries) == 1
+    assert columns.get('"out.c-123-sales"."ORDERS"') == [("ID", "TEXT"), ("AMOUNT", "NUMBER"), ("NOTE", "TEXT")]
+    assert columns.get('"out.c-sales"."CUSTOMERS"') is None
+
+def test_profile_scans_each_table_once():
+    """Test that all columns are profiled in one statement per environment"""
+    executor = make_profiling_executor(200)
+    result = run_profile(executor)
+
+    # One metadata query plus one scan per environment
+    assert len(executor.snowflake.queries) == 3
+    rows = [row for row in result.to_pylist() if row["ENVIRONMENT"] == "DEV"]
+    assert [(row["PARAMETER_1"], row["PARAMETER_2"]) for row in rows] == [
+        ("ID", "null_count"), ("ID", "approx_distinct"),
+        ("AMOUNT", "null_count"), ("AMOUNT", "approx_distinct"),
+        ("AMOUNT", "min"), ("AMOUNT", "max"), ("AMOUNT", "sum"),
+    ]
+    assert all(row["TEST_NAME"] == "profile_table" for row in rows)
+
+def test_wide_profiles_are_chunked():
+    """Test that statements are split once they exceed the aggregate limit"""
+    executor = make_profiling_executor(3)
+    result = run_profile(executor)
+
+    # Seven aggregates per environment in chunks of three
+    assert len(executor.snowflake.queries) == 1 + 2 * 3
+    assert result.num_rows == 14
@@ -0,0 +1,52 @@
+"""
+Tests for query template compilation in QueryManager
+"""
+import pytest
+from kbc_automated_tests.queries.base import CompiledTemplate, QueryManager
+from kbc_automated_tests.queries.data_validation_queries import DataValidationQueries, STANDARD_PARAMETERS
+from kbc_automated_tests.tests.fakes import make_params
+
+def test_compiled_template_renders_like_replace():
+    """Test that rendering binds every occurrence of each placeholder"""
+    template = "SELECT %(a)s, %(b)s FROM %(a)s"
+    compiled = CompiledTemplate(template)
+    assert compiled.placeholders == {"a", "b"}
+    assert compiled.render({"a": "T", "b": 1}) == "SELECT T, 1 FROM T"
+
+def test_missing_parameter_is_reported():
+    """Test that rendering without a bound placeholder fails"""
+    with pytest.raises(KeyError, match="Missing required parameter"):
+        CompiledTemplate("SELECT %(a)s").render({})
+
+def test_unknown_placeholder_is_rejected_at_registration():
+    """Test that templates may only use the declared parameters"""
+    queries = QueryManager(parameters=["dev_table"])
+    queries.add_query("ok", "SELECT 1 FROM %(dev_table)s")
+    with pytest.raises(ValueError, match="column_name"):
+        queries.add_query("broken", "SELECT %(column_name)s FROM %(dev_table)s")
+    assert "broken" not in queries.queries
+
+def test_data_validation_queries_render():
+    """Test that every registered test renders with the standard parameters"""
+    queries = DataValidationQueries()
+    params = {name: f"<{name}>" for name in STANDARD_PARAMETERS}
+    for query_id in queries.queries:
+        rendered = queries.render(query_id, params)
+        assert "%(" not in rendered
+
+def test_content_hash_scans_each_table_once():
+    """Test that check_content_hash fingerprints each environment with one grouped scan"""
+    params = dict(make_params(), parameter_1_columns='"ID", "AMOUNT"', parameter_2_string="'16'")
+    rendered = DataValidationQueries().render("check_content_hash", params)
+    assert rendered.count("HASH_AGG(\"ID\", \"AMOUNT\")") == 2
+    assert rendered.count("FROM \"out.c-123-sales\".\"ORDERS\"") == 1
+    assert "TRY_TO_NUMBER('16')" in rendered
+
+def test_distribution_scans_each_table_once():
+    """Test that check_distribution profiles each environment with one scan and one aggregation"""
+    rendered = DataValidationQueries().render("check_distribution", make_params("AMOUNT", "20"))
+    assert rendered.count("FROM \"out.c-123-sales\".\"ORDERS\"") == 1
+    assert rendered.count("FROM \"out.c-sales\".\"ORDERS\"") == 1
+    assert rendered.count("GROUP BY GROUPING SETS") == 1
+    assert "APPROX_PERCENTILE(COLUMN_VALUE, 0.5)" in rendered
+    assert "TRY_TO_NUMBER('20')" in rendered
@@ -0,0 +1,110 @@
+"""
+Tests for the QueryPlanner class
+"""
+import pytest
+from snowflake.connector.errors import ProgrammingError
+from kbc_automated_tests.queries.data_validation_queries import DataValidationQueries
+from kbc_automated_tests.queries.query_planner import QueryPlanner
+from kbc_automated_tests.tests.fakes import REQUIRED_COLUMNS, FakeSnowflakeClient, make_executor, make_params
+
+class InvalidColumnClient(FakeSnowflakeClient):
+    """Fake client rejecting every statement that sums the NOTE column"""
+
+    def execute_arrow(self, query, max_rows=None):
+        if 'SUM("NOTE")' in query:
+            self.queries.append(query)
+            raise ProgrammingError("Numeric value 'n/a' is not recognized")
+        return super().execute_arrow(query, max_rows)
+
+def build_statements(planner, planned):
+    """Build the statements the executor runs: one per table and chunk of aggregates"""
+    return [
+        planner.build_statement(relation, chunk)
+        for relation, aggregates in planner.group_aggregates(planned).items()
+        for chunk in planner.chunk_aggregates(aggregates)
+    ]
+
+@pytest.fixture
+def planner():
+    """Create a QueryPlanner over the data validation queries"""
+    return QueryPlanner(DataValidationQueries())
+
+def test_tests_on_one_table_share_one_scan_per_environment(planner):
+    """Test that all aggregates of a table are fused into one statement"""
+    planned = [
+        planner.plan_test("check_row_count", make_params()),
+        planner.plan_test("check_sum", make_params("AMOUNT")),
+        planner.plan_test("check_uniqueness", make_params("ORDER_ID")),
+    ]
+    statements = build_statements(planner, planned)
+
+    assert [statement.relation for statement in statements] == [
+        '"out.c-123-sales"."ORDERS"',
+        '"out.c-sales"."ORDERS"',
+    ]
+    assert all(len(statement.aliases) == 3 for statement in statements)
+    assert 'SUM("AMOUNT")' in statements[0].sql
+    assert 'COUNT(DISTINCT "ORDER_ID")' in statements[1].sql
+
+def test_identical_aggregates_are_computed_once(planner):
+    """Test that a row count shared by two tests is selected once"""
+    planned = [
+        planner.plan_test("check_row_count", make_params()),
+        planner.plan_test("input_check_row_count", make_params()),
+    ]
+    statements = build_statements(planner, planned)
+
+    assert len(statements) == 3
+    assert len(statements[0].aliases) == 1
+    assert statements[2].relation == '"in.c-erp"."Orders"'
+
+def test_fan_out_matches_template_rows(planner):
+    """Test that fused values expand into the standard result rows"""
+    planned = [planner.plan_test("input_check_sum", make_params("TotalAmount", "TOTAL"))]
+    statement_values = {}
+    for statement in build_statements(planner, planned):
+        for aggregate in statement.aliases:
+            statement_values[aggregate] = 10 if statement.relation.startswith('"out') else 12
+
+    rows = planner.fan_out(planned, statement_values)
+
+    assert all(list(row) == REQUIRED_COLUMNS for row in rows)
+    assert [row["ENVIRONMENT"] for row in rows] == ["DEV", "PROD"]
+    assert [row["VALUE"] for row in rows] == [10, 12]
+    assert [row["PARAMETER_1"] for row in rows] == ["TotalAmount", "TotalAmount"]
+    assert [row["PARAMETER_2"] for row in rows] == ["TOTAL", "TOTAL"]
+    assert [row["SOURCE_BUCKET"] for row in rows] == ["n/a", "n/a"]
+
+def test_tests_without_values_are_dropped(planner):
+    """Test that a failed table scan drops only the tests depending on it"""
+    planned = [planner.plan_test("check_row_count", make_params())]
+    assert planner.fan_out(planned, {}) == []
+
+def test_batches_pad_statements_to_the_same_width(planner):
+    """Test that statements over different tables are combined with UNION ALL"""
+    planned = [
+        planner.plan_test("check_sum", make_params("AMOUNT")),
+        planner.plan_test("input_check_row_count", make_params()),
+    ]
+    statements = build_statements(planner, planned)
+    sql = planner.build_batch(statements)
+
+    assert sql.count("UNION ALL") == len(statements) - 1
+    assert '2 AS "BATCH_INDEX"' in sql
+    assert 'NULL AS "A1"' in sql
+
+def test_invalid_aggregate_only_drops_its_own_test():
+    """Test that a failing fused statement is split until only the invalid test is left out"""
+    executor = make_executor(InvalidColumnClient())
+    planned = [
+        executor.planner.plan_test("check_row_count", make_params()),
+        executor.planner.plan_test("check_sum", make_params("NOTE")),
+        executor.planner.plan_test("check_sum", make_params("AMOUNT")),
+        executor.planner.plan_test("check_uniqueness", make_params("ID")),
+    ]
+    rows = executor.execute_planned_tests(planned).to_pylist()
+
+    assert sorted({(row["TEST_NAME"], row["PARAMETER_1"]) for row in rows}) == [
+        ("check_row_count", "n/a"), ("check_sum", "AMOUNT"), ("check_uniqueness", "ID"),
+    ]
+    assert len(rows) == 6
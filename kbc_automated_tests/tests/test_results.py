@@ -0,0 +1,37 @@
+"""
+Tests for the Arrow result helpers
+"""
+from decimal import Decimal
+import pyarrow as pa
+import pytest
+from kbc_automated_tests.execution.results import concat_results, conform, from_rows, to_display_frame
+from kbc_automated_tests.queries.query_planner import HEADER_COLUMNS
+
+REQUIRED_COLUMNS = HEADER_COLUMNS + ["ENVIRONMENT", "VALUE"]
+
+def make_row(environment, value):
+    """Build one result row"""
+    row = {column: "n/a" for column in HEADER_COLUMNS}
+    row.update(TABLE_NAME="ORDERS", TEST_NAME="check_sum", ENVIRONMENT=environment, VALUE=value)
+    return row
+
+def test_fetched_results_are_cast_to_the_result_schema():
+    """Test that integer and decimal values share one float64 VALUE column"""
+    fetched = pa.Table.from_pylist([make_row("DEV", 10)])
+    decimals = pa.Table.from_pylist([make_row("PROD", Decimal("12.5"))])
+
+    combined = concat_results([conform(fetched, REQUIRED_COLUMNS), conform(decimals, REQUIRED_COLUMNS)], REQUIRED_COLUMNS)
+    assert combined.schema.field("VALUE").type == pa.float64()
+    assert combined["VALUE"].to_pylist() == [10.0, 12.5]
+
+def test_results_with_other_columns_are_rejected():
+    """Test that results missing a required column are rejected"""
+    with pytest.raises(ValueError):
+        conform(pa.table({"VALUE": [1]}), REQUIRED_COLUMNS)
+
+def test_display_frame_uses_categoricals():
+    """Test that repeated identifying columns are categorical at display"""
+    frame = to_display_frame(from_rows([make_row("DEV", 1), make_row("PROD", Decimal("2"))], REQUIRED_COLUMNS))
+    assert str(frame["TEST_NAME"].dtype) == "category"
+    assert str(frame["ENVIRONMENT"].dtype) == "category"
+    assert frame["VALUE"].tolist() == [1.0, 2.0]
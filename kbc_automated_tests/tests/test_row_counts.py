@@ -0,0 +1,42 @@
+"""
+Tests for the RowCountMetadata class
+"""
+import pytest
+from kbc_automated_tests.execution.row_counts import RowCountMetadata
+
+class FakeSnowflakeClient:
+    """Stand-in for SnowflakeClient returning canned SHOW TABLES rows"""
+
+    def fetch_records(self, query):
+        assert query == "SHOW TABLES IN DATABASE"
+        return [
+            {"schema_name": "out.c-123-sales", "name": "ORDERS", "kind": "TABLE", "rows": 10},
+            {"schema_name": "out.c-sales", "name": "ORDERS", "kind": "TABLE", "rows": 12},
+            {"schema_name": "out.c-sales", "name": "ITEMS", "kind": "TABLE", "rows": None},
+        ]
+
+@pytest.fixture
+def row_counts():
+    """Create row count metadata loaded from the fake client"""
+    row_counts = RowCountMetadata()
+    row_counts.load(FakeSnowflakeClient())
+    return row_counts
+
+def test_counts_are_keyed_by_relation(row_counts):
+    """Test that counts are looked up by quoted table reference"""
+    assert row_counts.get('"out.c-123-sales"."ORDERS"') == 10
+    assert row_counts.get('"out.c-sales"."ORDERS"') == 12
+
+def test_missing_counts_fall_back(row_counts):
+    """Test that tables without a metadata count are counted instead"""
+    assert row_counts.get('"out.c-sales"."ITEMS"') is None
+    assert row_counts.get('"out.c-sales"."MISSING"') is None
+
+def test_counts_disagreeing_with_storage_are_stale(row_counts):
+    """Test that a different Storage API rowsCount marks the count as stale"""
+    row_counts.add_storage_tables([
+        {"id": "out.c-123-sales.ORDERS", "rowsCount": 11},
+        {"id": "out.c-sales.ORDERS", "rowsCount": 12},
+    ])
+    assert row_counts.get('"out.c-123-sales"."ORDERS"') is None
+    assert row_counts.get('"out.c-sales"."ORDERS"') == 12
@@ -0,0 +1,54 @@
+"""
+Tests for preview runs on sampled tables
+"""
+import pytest
+from kbc_automated_tests.queries.sampling import SamplingSpec, is_scalable
+from kbc_automated_tests.tests.fakes import make_executor, make_params
+
+@pytest.fixture
+def executor():
+    """Create a QueryExecutor sampling 2% of every table"""
+    executor = make_executor()
+    executor.set_sampling(SamplingSpec(percent=2, seed=7))
+    return executor
+
+def test_templates_read_full_tables(executor):
+    """Test that tests without an aggregate form are not sampled in a preview run"""
+    executor.execute_tests(make_params(), "check_content_hash")
+
+    assert len(executor.snowflake.queries) == 1
+    assert "SAMPLE" not in executor.snowflake.queries[0]
+
+def test_only_counts_and_sums_are_scaled():
+    """Test which aggregates can be estimated from a sample"""
+    assert is_scalable("COUNT(*)")
+    assert is_scalable('SUM("AMOUNT")')
+    assert not is_scalable('COUNT(DISTINCT "ID")')
+    with pytest.raises(ValueError):
+        SamplingSpec(percent=0)
+
+def test_fused_tests_are_scaled_and_labelled(executor):
+    """Test that sampled sums are scaled up and results are labelled as sampled"""
+    planned = [executor.planner.plan_test("check_sum", make_params("AMOUNT"))]
+    rows = executor.execute_planned_tests(planned).to_pylist()
+
+    assert all("SAMPLE BLOCK (2) SEED (7)" in query for query in executor.snowflake.queries)
+    assert [row["ENVIRONMENT"] for row in rows] == ["DEV (SAMPLE 2%)", "PROD (SAMPLE 2%)"]
+    assert [row["VALUE"] for row in rows] == [50.0, 50.0]
+
+def test_distinct_counts_read_full_tables(executor):
+    """Test that aggregates that cannot be scaled are not sampled in a preview run"""
+    planned = [
+        executor.planner.plan_test("check_sum", make_params("AMOUNT")),
+        executor.planner.plan_test("check_uniqueness", make_params("ID")),
+    ]
+    rows = executor.execute_planned_tests(planned).to_pylist()
+
+    distinct_queries = [query for query in executor.snowflake.queries if "COUNT(DISTINCT" in query]
+    assert distinct_queries and all("SAMPLE" not in query for query in distinct_queries)
+    assert {(row["TEST_NAME"], row["ENVIRONMENT"]): row["VALUE"] for row in rows} == {
+        ("check_sum", "DEV (SAMPLE 2%)"): 50.0,
+        ("check_sum", "PROD (SAMPLE 2%)"): 50.0,
+        ("check_uniqueness", "DEV"): 1.0,
+        ("check_uniqueness", "PROD"): 1.0,
+    }
@@ -0,0 +1,63 @@
+"""
+Tests for the branch-wide schema diff
+"""
+import pandas as pd
+from kbc_automated_tests.execution.schema_diff import (
+    SCHEMA_COLUMNS, diff_schemas, known_columns, missing_reference, schema_results
+)
+from kbc_automated_tests.queries.query_planner import HEADER_COLUMNS
+from kbc_automated_tests.tests.fakes import make_params
+
+def column(schema, table, name, data_type="TEXT", precision=None, nullable="YES"):
+    """Build one INFORMATION_SCHEMA.COLUMNS row"""
+    return dict(zip(SCHEMA_COLUMNS, [schema, table, name, data_type, precision, 0 if precision else None, nullable]))
+
+COLUMNS = pd.DataFrame([
+    column("out.c-123-sales", "ORDERS", "ID"),
+    column("out.c-123-sales", "ORDERS", "AMOUNT", "NUMBER", 38),
+    column("out.c-123-sales", "ORDERS", "CHANNEL"),
+    column("out.c-123-sales", "RETURNS", "ID"),
+    column("out.c-sales", "ORDERS", "ID"),
+    column("out.c-sales", "ORDERS", "AMOUNT", "NUMBER", 38, "NO"),
+    column("out.c-sales", "ORDERS", "NOTE"),
+    column("out.c-sales", "CUSTOMERS", "ID"),
+])
+
+DEV_TABLES = ['"out.c-123-sales"."ORDERS"', '"out.c-123-sales"."RETURNS"']
+
+def test_changes_are_classified():
+    """Test that added, dropped, retyped columns and new tables are found"""
+    changes = diff_schemas(COLUMNS, {"out.c-123-sales": "out.c-sales"}, DEV_TABLES)
+    found = {(row["TABLE_NAME"], row["COLUMN_NAME"], row["CHANGE"]) for row in changes.to_dict("records")}
+
+    assert found == {
+        ("ORDERS", "CHANNEL", "added"),
+        ("ORDERS", "NOTE", "dropped"),
+        ("ORDERS", "AMOUNT", "retyped"),
+        ("RETURNS", "n/a", "table_added"),
+    }
+    retyped = changes[changes["CHANGE"] == "retyped"].iloc[0]
+    assert (retyped["DEV_DEFINITION"], retyped["PROD_DEFINITION"]) == ("NUMBER(38,0)", "NUMBER(38,0) NOT NULL")
+
+def test_changes_use_the_result_format():
+    """Test that every change becomes a DEV and a PROD row with presence values"""
+    changes = diff_schemas(COLUMNS, {"out.c-123-sales": "out.c-sales"}, DEV_TABLES)
+    result = schema_results(changes, HEADER_COLUMNS + ["ENVIRONMENT", "VALUE"])
+
+    assert result.num_rows == 8
+    dropped = [row for row in result.to_pylist() if row["PARAMETER_2"] == "dropped"]
+    assert [(row["ENVIRONMENT"], row["VALUE"]) for row in dropped] == [("DEV", 0.0), ("PROD", 1.0)]
+    assert dropped[0]["PARAMETER_3"] == "n/a"
+
+def test_tests_reading_missing_columns_are_skipped():
+    """Test that only DEV vs PROD tests on missing tables or columns are doomed"""
+    tables = known_columns(COLUMNS)
+    schemas = set(COLUMNS["TABLE_SCHEMA"])
+    placeholders = frozenset({"dev_table", "prod_table", "parameter_1_object"})
+
+    assert missing_reference(make_params("ID"), placeholders, tables, schemas) is None
+    assert "CHANNEL" in missing_reference(make_params("CHANNEL"), placeholders, tables, schemas)
+    # Tests without PARAMETER_1 columns only need the tables
+    assert missing_reference(make_params("CHANNEL"), frozenset({"dev_table", "prod_table"}), tables, schemas) is None
+    returns = dict(make_params(), dev_table='"out.c-123-sales"."RETURNS"', prod_table='"out.c-sales"."RETURNS"')
+    assert "does not exist" in missing_reference(returns, placeholders, tables, schemas)
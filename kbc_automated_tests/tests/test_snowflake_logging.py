@@ -0,0 +1,75 @@
+"""
+Tests for query logging in SnowflakeClient
+"""
+import pyarrow as pa
+import pytest
+from loguru import logger
+from snowflake.connector.errors import ProgrammingError
+from kbc_automated_tests.database.snowflake_client import SnowflakeClient
+from kbc_automated_tests.utils.log_buffer import LogBuffer
+
+class FakeCursor:
+    """Stand-in for a Snowflake cursor returning one Arrow chunk"""
+
+    sfqid = "01b2-query"
+
+    def execute(self, query):
+        self.query = query
+
+    def fetch_arrow_batches(self):
+        yield pa.table({"VALUE": [1, 2]})
+
+@pytest.fixture
+def captured():
+    """Capture INFO and DEBUG messages into a LogBuffer"""
+    buffers = {}
+    sink_ids = []
+    for level in ("INFO", "DEBUG"):
+        buffers[level] = LogBuffer()
+        sink_ids.append(logger.add(buffers[level].write, level=level, format="{message}"))
+    yield buffers
+    for sink_id in sink_ids:
+        logger.remove(sink_id)
+
+class FailingCursor(FakeCursor):
+    """Stand-in for a cursor whose queries fail before returning an ID"""
+
+    def execute(self, query):
+        raise ProgrammingError("SQL compilation error")
+
+def make_client(dump_results=False):
+    """Create a client using the fake cursor"""
+    client = SnowflakeClient(dump_results=dump_results)
+    client._local.cursor = FakeCursor()
+    return client
+
+def test_queries_are_not_logged_at_info(captured):
+    """Test that the SQL and row counts of queries stay out of INFO logs"""
+    table = make_client().execute_arrow("SELECT 1 AS VALUE")
+    assert table.num_rows == 2
+    assert "SELECT 1" not in captured["INFO"].text()
+    assert "SELECT 1" in captured["DEBUG"].text()
+    assert "Query results" not in captured["DEBUG"].text()
+
+def test_result_dumps_are_opt_in(captured):
+    """Test that result dumps are only logged when enabled"""
+    make_client(dump_results=True).execute_arrow("SELECT 1 AS VALUE")
+    assert "Query results" in captured["DEBUG"].text()
+
+def test_log_buffer_keeps_recent_lines():
+    """Test that the buffer keeps a bounded number of lines"""
+    buffer = LogBuffer(max_lines=2)
+    for line in ("a\n", "b\n", "c\n"):
+        buffer.write(line)
+    assert buffer.text() == "b\nc"
+
+def test_failed_query_does_not_report_the_previous_query_id():
+    """Test that a failed query leaves no stale query ID behind"""
+    client = make_client()
+    client.execute_arrow("SELECT 1 AS VALUE")
+    assert client.last_query_id() == "01b2-query"
+
+    client._local.cursor = FailingCursor()
+    with pytest.raises(ProgrammingError):
+        client.execute_arrow("SELECT MISSING")
+    assert client.last_query_id() is None
@@ -0,0 +1,3 @@
+"""
+Utilities for the Keboola Automated Tests Framework
+"""
\ No newline at end of file
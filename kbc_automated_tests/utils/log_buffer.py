@@ -0,0 +1,34 @@
+"""
+Buffered log sink for displaying log lines in the UI
+
+Importing this module does not touch the loguru sinks, the caller adds the
+buffer as a sink itself.
+"""
+import threading
+from collections import deque
+
+class LogBuffer:
+    """Sink collecting formatted log lines for display in batches
+    
+    Writing only appends to a bounded buffer, so it is cheap and safe to call
+    from any thread. The UI renders the buffered lines when it refreshes.
+    """
+    
+    def __init__(self, max_lines: int = 500):
+        """Initialize the buffer
+        
+        Args:
+            max_lines: Number of most recent lines kept
+        """
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        
+    def write(self, message: str) -> None:
+        """Append a formatted log message"""
+        with self._lock:
+            self._lines.append(message.rstrip("\n"))
+            
+    def text(self) -> str:
+        """Get the buffered lines as one string"""
+        with self._lock:
+            return "\n".join(self._lines) 
\ No newline at end of file
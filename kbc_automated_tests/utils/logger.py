@@ -13,13 +13,15 @@ logger.add(
     sys.stderr,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level=LOG_LEVEL,
+    enqueue=True,
 )
 
-# Add file logger
+# Add file logger, written by a background thread so workers never wait on disk
 logger.add(
     LOG_FILE,
     rotation="500 MB",
     retention="10 days",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
     level=LOG_LEVEL,
+    enqueue=True,
 ) 
\ No newline at end of file